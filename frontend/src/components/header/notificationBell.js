@@ -4,7 +4,7 @@ import { useSelector } from 'react-redux';
 import { TopNavLink } from './NavLink';
 import { BellIcon } from '../svgIcons';
 import { NotificationPopout } from '../../views/notifications';
-import { useFetch, useFetchIntervaled } from '../../hooks/UseFetch';
+import { useEventStream } from '../../hooks/UseEventStream';
 import useForceUpdate from '../../hooks/UseForceUpdate';
 import { useInboxQueryAPI } from '../../hooks/UseInboxQueryAPI';
 
@@ -18,15 +18,9 @@ export const NotificationBell = props => {
   const [notificationState] = useInboxQueryAPI(nothing.current, sortByRead.current, forceUpdated);
 
   const [isPopoutFocus, setPopoutFocus] = useState(false);
-  /*TODO Replace this backend with websockets, eventsource or RESTSockets
-    to save batteries and capacity*/
-  const [unreadNotifsStartError, unreadNotifsStartLoading, unreadNotifsStart] = useFetch(
-    `/api/v2/notifications/queries/own/count-unread/`,
-    trigger,
-  );
-  const [unreadNotifsRepeatError, unreadNotifsRepeat] = useFetchIntervaled(
-    `/api/v2/notifications/queries/own/count-unread/`,
-    30000,
+  /* the server pushes the unread count when it changes */
+  const [unreadNotifsError, unreadNotifs] = useEventStream(
+    `/api/v2/notifications/queries/own/stream-unread/`,
     trigger,
   );
 
@@ -36,18 +30,8 @@ export const NotificationBell = props => {
       : { className: `link barlow-condensed blue-dark f4 ttu v-mid pt1` };
   };
 
-  const lightTheBell =
-    (!unreadNotifsStartLoading &&
-      !unreadNotifsStartError &&
-      unreadNotifsStart &&
-      unreadNotifsStart.newMessages) ||
-    (!unreadNotifsRepeatError && unreadNotifsRepeat && unreadNotifsRepeat.newMessages);
-  const liveUnreadCount =
-    (!unreadNotifsRepeatError && unreadNotifsRepeat && unreadNotifsRepeat.unread) ||
-    (!unreadNotifsStartLoading &&
-      !unreadNotifsStartError &&
-      unreadNotifsStart &&
-      unreadNotifsStart.unread);
+  const lightTheBell = !unreadNotifsError && unreadNotifs && unreadNotifs.newMessages;
+  const liveUnreadCount = !unreadNotifsError && unreadNotifs && unreadNotifs.unread;
 
   return (
     <>
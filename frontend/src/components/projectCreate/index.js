@@ -74,6 +74,7 @@ const ProjectCreate = props => {
     projectName: '',
     zoomLevel: 9,
     tempTaskGrid: null,
+    clipToAoi: false,
     arbitraryTasks: false,
   });
 
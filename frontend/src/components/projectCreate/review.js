@@ -15,10 +15,22 @@ const handleCreate = (metadata, updateMetadata, projectName, token, cloneProject
   let projectParams = {
     areaOfInterest: metadata.geom,
     projectName: metadata.projectName,
-    tasks: metadata.taskGrid,
     arbitraryTasks: metadata.arbitraryTasks,
   };
 
+  if (!metadata.arbitraryTasks) {
+    // Plain OSM tile grids are generated by the server, only grids with tasks split in the
+    // browser are uploaded
+    const taskGrid = metadata.taskGrid;
+    const isSplit = taskGrid.features.some(f => f.properties.zoom !== metadata.zoomLevel);
+    if (isSplit || !Number.isInteger(metadata.zoomLevel)) {
+      projectParams.tasks = taskGrid;
+    } else {
+      projectParams.zoom = metadata.zoomLevel;
+      projectParams.clipToAoi = metadata.clipToAoi;
+    }
+  }
+
   if (cloneProjectData.name !== null) {
     projectParams.projectName = '';
     projectParams.cloneFromProjectId = cloneProjectData.id;
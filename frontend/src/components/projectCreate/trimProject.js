@@ -26,7 +26,8 @@ const clipProject = (clip, metadata, map, updateMetadata) => {
   });
 
   const grid = turf.featureCollection(intersect_array);
-  updateMetadata({ ...metadata, tasksNo: grid.features.length, taskGrid: grid });
+  // The server trims the grid the same way when it generates the tasks, see review.js
+  updateMetadata({ ...metadata, tasksNo: grid.features.length, taskGrid: grid, clipToAoi: clip });
 };
 
 export default function TrimProject({ metadata, mapObj, updateMetadata }) {
@@ -1,4 +1,4 @@
-import React, { useLayoutEffect, useState, useCallback } from 'react';
+import React, { useEffect, useLayoutEffect, useState, useCallback } from 'react';
 import { useSelector } from 'react-redux';
 import mapboxgl from 'mapbox-gl';
 import 'mapbox-gl/dist/mapbox-gl.css';
@@ -21,6 +21,25 @@ const licensedFonts = MAPBOX_TOKEN
   ? ['DIN Offc Pro Medium', 'Arial Unicode MS Bold']
   : ['Open Sans Semibold'];
 
+/* Zoom level above which the server returns single projects rather than clusters */
+const MAX_CLUSTERS_ZOOM = 22;
+
+const clamp = (value, min, max) => Math.min(Math.max(value, min), max);
+
+/* Zoom level and EPSG:4326 bbox of the map, clamped to the ranges the clusters endpoint accepts */
+export const getMapView = map => {
+  const bounds = map.getBounds();
+  return {
+    zoom: clamp(Math.floor(map.getZoom()), 0, MAX_CLUSTERS_ZOOM),
+    bbox: [
+      clamp(bounds.getWest(), -180, 180),
+      clamp(bounds.getSouth(), -90, 90),
+      clamp(bounds.getEast(), -180, 180),
+      clamp(bounds.getNorth(), -90, 90),
+    ],
+  };
+};
+
 export const mapboxLayerDefn = (map, mapResults, clickOnProjectID) => {
   map.addImage('mapMarker', markerIcon, { width: 15, height: 15, data: markerIcon });
   map.addSource('projects', {
@@ -28,17 +47,22 @@ export const mapboxLayerDefn = (map, mapResults, clickOnProjectID) => {
     data: mapResults,
     cluster: true,
     clusterRadius: 35,
+    /* features are already clustered by the server, each one counting one or more projects */
+    clusterProperties: { projectCount: ['+', ['get', 'count']] },
   });
 
+  const clusterFilter = ['any', ['has', 'point_count'], ['>', ['get', 'count'], 1]];
+  const projectCount = ['coalesce', ['get', 'projectCount'], ['get', 'count']];
+
   map.addLayer({
     id: 'projectsClusters',
-    filter: ['has', 'point_count'],
+    filter: clusterFilter,
     type: 'circle',
     source: 'projects',
     layout: {},
     paint: {
       'circle-color': 'rgba(104,112,127,0.5)',
-      'circle-radius': ['step', ['get', 'point_count'], 14, 10, 22, 50, 30, 500, 37],
+      'circle-radius': ['step', projectCount, 14, 10, 22, 50, 30, 500, 37],
     },
   });
 
@@ -46,9 +70,9 @@ export const mapboxLayerDefn = (map, mapResults, clickOnProjectID) => {
     id: 'cluster-count',
     type: 'symbol',
     source: 'projects',
-    filter: ['has', 'point_count'],
+    filter: clusterFilter,
     layout: {
-      'text-field': '{point_count_abbreviated}',
+      'text-field': ['to-string', projectCount],
       'text-font': licensedFonts,
       'text-size': 16,
     },
@@ -63,7 +87,7 @@ export const mapboxLayerDefn = (map, mapResults, clickOnProjectID) => {
     id: 'projects-unclustered-points',
     type: 'symbol',
     source: 'projects',
-    filter: ['!', ['has', 'point_count']],
+    filter: ['all', ['!', ['has', 'point_count']], ['==', ['get', 'count'], 1]],
     layout: {
       'icon-image': 'mapMarker',
       'text-field': '#{projectId}',
@@ -97,6 +121,7 @@ export const ProjectsMap = ({
   state: { mapResults },
   fullProjectsQuery,
   setQuery,
+  setMapView,
   className,
 }) => {
   const mapRef = React.createRef();
@@ -141,6 +166,19 @@ export const ProjectsMap = ({
     // eslint-disable-next-line
   }, []);
 
+  useEffect(() => {
+    /* clusters are refetched for the area and zoom level shown after each move */
+    if (map === null || !setMapView) {
+      return;
+    }
+    const onMoveEnd = () => setMapView(getMapView(map));
+    map.on('moveend', onMoveEnd);
+
+    return () => {
+      map.off('moveend', onMoveEnd);
+    };
+  }, [map, setMapView]);
+
   useLayoutEffect(() => {
     /* docs: https://docs.mapbox.com/mapbox-gl-js/example/cluster/ */
 
@@ -0,0 +1,65 @@
+import { useEffect, useState } from 'react';
+import { useSelector } from 'react-redux';
+
+import { API_URL } from '../config';
+
+const DEFAULT_RETRY = 3000;
+
+/* EventSource can't send the Authorization header, so the server sent events
+   are read from a fetch response body instead. Returns the data of the last event. */
+export function useEventStream(endpoint, trigger = true) {
+  const token = useSelector(state => state.auth.get('token'));
+  const [error, setError] = useState(null);
+  const [data, setData] = useState();
+
+  useEffect(() => {
+    if (!trigger || !token) return;
+    const controller = new AbortController();
+    let retry = DEFAULT_RETRY;
+    let timeout;
+
+    const handleEvent = rawEvent => {
+      const dataLines = [];
+      rawEvent.split('\n').forEach(line => {
+        if (line.startsWith('retry:')) retry = parseInt(line.slice(6), 10) || retry;
+        if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+      });
+      if (dataLines.length) setData(JSON.parse(dataLines.join('\n')));
+    };
+
+    const connect = async () => {
+      try {
+        const response = await fetch(new URL(endpoint, API_URL), {
+          headers: { Authorization: `Token ${token}`, Accept: 'text/event-stream' },
+          signal: controller.signal,
+        });
+        if (!response.ok) throw new Error(response.statusText);
+        setError(null);
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+          const { done, value } = await reader.read();
+          if (done) break;
+          buffer += decoder.decode(value, { stream: true });
+          const events = buffer.split('\n\n');
+          buffer = events.pop();
+          events.forEach(handleEvent);
+        }
+      } catch (e) {
+        if (controller.signal.aborted) return;
+        setError(e);
+      }
+      // The server ends streams after a while, reconnect like EventSource would
+      timeout = setTimeout(connect, retry);
+    };
+
+    connect();
+    return () => {
+      controller.abort();
+      clearTimeout(timeout);
+    };
+  }, [endpoint, token, trigger]);
+
+  return [error, data];
+}
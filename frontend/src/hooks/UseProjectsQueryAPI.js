@@ -15,6 +15,9 @@ import { useThrottle } from '../hooks/UseThrottle';
 import { remapParamsToAPI } from '../utils/remapParamsToAPI';
 import { API_URL } from '../config';
 
+/* Clusters are requested for the whole world until the map reports its view */
+const defaultMapView = { zoom: 0, bbox: [-180, -90, 180, 90] };
+
 const projectQueryAllSpecification = {
   difficulty: StringParam,
   organisation: StringParam,
@@ -71,9 +74,18 @@ const dataFetchReducer = (state, action) => {
         isLoading: false,
         isError: false,
         projects: action.payload.results,
-        mapResults: action.payload.mapResults,
         pagination: action.payload.pagination,
       };
+    case 'FETCH_MAP_SUCCESS':
+      return {
+        ...state,
+        mapResults: action.payload,
+      };
+    case 'SET_MAP_VIEW':
+      return {
+        ...state,
+        mapView: action.payload,
+      };
     case 'FETCH_FAILURE':
       return {
         ...state,
@@ -111,9 +123,35 @@ export const useProjectsQueryAPI = (
     projects: initialData.results,
     mapResults: initialData.mapResults,
     pagination: initialData.pagination,
+    mapView: defaultMapView,
     queryParamsState: ExternalQueryParamsState[0],
   });
 
+  /* The map only depends on the filters and its view, so it is fetched apart from the list pages */
+  useEffect(() => {
+    let didCancel = false;
+    const headers = token ? { Authorization: `Token ${token}` } : {};
+    const { page, ...mapParams } = remapParamsToAPI(
+      throttledExternalQueryParamsState,
+      backendToQueryConversion,
+    );
+
+    axios({
+      url: `${API_URL}projects/queries/map-clusters/`,
+      method: 'get',
+      headers: headers,
+      params: { ...mapParams, zoom: state.mapView.zoom, bbox: state.mapView.bbox.join(',') },
+    })
+      .then(
+        mapResult => !didCancel && dispatch({ type: 'FETCH_MAP_SUCCESS', payload: mapResult.data }),
+      )
+      .catch(error => console.log('Map clusters failure', error));
+
+    return () => {
+      didCancel = true;
+    };
+  }, [throttledExternalQueryParamsState, state.mapView, forceUpdate, token]);
+
   useEffect(() => {
     let didCancel = false;
     let cancel;
@@ -1,4 +1,4 @@
-import React, { Suspense } from 'react';
+import React, { Suspense, useCallback } from 'react';
 import { useSelector } from 'react-redux';
 
 import { ProjectNav } from '../components/projects/projectNav';
@@ -40,7 +40,10 @@ export const ProjectsPage = props => {
 
   const [fullProjectsQuery, setProjectQuery] = useExploreProjectsQueryParams();
   const [forceUpdated, forceUpdate] = useForceUpdate();
-  const [state] = useProjectsQueryAPI(initialData, fullProjectsQuery, forceUpdated);
+  const [state, dispatch] = useProjectsQueryAPI(initialData, fullProjectsQuery, forceUpdated);
+  const setMapView = useCallback(view => dispatch({ type: 'SET_MAP_VIEW', payload: view }), [
+    dispatch,
+  ]);
   const [orgAPIState] = useTagAPI([], 'organisations');
 
   const isMapShown = useSelector(state => state.preferences['mapShown']);
@@ -67,6 +70,7 @@ export const ProjectsPage = props => {
             state={state}
             fullProjectsQuery={fullProjectsQuery}
             setQuery={setProjectQuery}
+            setMapView={setMapView}
             className={`dib w-40-l w-100 fl`}
           />
         )}
@@ -91,7 +95,10 @@ export const ManageProjectsPage = props => {
 
   const [fullProjectsQuery, setProjectQuery] = useExploreProjectsQueryParams();
   const [forceUpdated, forceUpdate] = useForceUpdate();
-  const [state] = useProjectsQueryAPI(initialData, fullProjectsQuery, forceUpdated);
+  const [state, dispatch] = useProjectsQueryAPI(initialData, fullProjectsQuery, forceUpdated);
+  const setMapView = useCallback(view => dispatch({ type: 'SET_MAP_VIEW', payload: view }), [
+    dispatch,
+  ]);
   const [orgAPIState] = useTagAPI([], 'organisations');
 
   const isMapShown = useSelector(state => state.preferences['mapShown']);
@@ -134,6 +141,7 @@ export const ManageProjectsPage = props => {
             state={state}
             fullProjectsQuery={fullProjectsQuery}
             setQuery={setProjectQuery}
+            setMapView={setMapView}
             className={`dib w-40-l w-100 fl`}
           />
         )}
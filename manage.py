@@ -1,15 +1,24 @@
+import datetime
 import os
 import subprocess
 import warnings
 import base64
 import json
+import sys
 from flask_migrate import MigrateCommand
-from flask_script import Manager
+from flask_script import Command, Manager, Option
 from dotenv import load_dotenv
 from server import create_app, initialise_counters
 from server.services.users.authentication_service import AuthenticationService
 from server.services.users.user_service import UserService
+from server.services.project_service import ProjectService
 from server.services.stats_service import StatsService
+from server.services.messaging.email_queue_service import EmailQueueService
+from server.services.messaging.message_service import MessageService
+from server.services.messaging.message_retention_service import (
+    MessageRetentionService,
+    PURGE_BATCH_SIZE,
+)
 
 
 # Load configuration from file into environment
@@ -61,6 +70,20 @@ def refresh_levels():
     print(f"Updated {users_updated} user mapper levels")
 
 
+@manager.command
+def refresh_recommendations():
+    print("Started updating user recommendations...")
+    users_updated = UserService.refresh_recommendations()
+    print(f"Updated recommendations of {users_updated} users")
+
+
+@manager.command
+def refresh_project_countries():
+    print("Started updating project countries...")
+    projects_updated = ProjectService.refresh_project_countries()
+    print(f"Updated countries of {projects_updated} projects")
+
+
 @manager.command
 def refresh_project_stats():
     print("Started updating project stats...")
@@ -68,6 +91,119 @@ def refresh_project_stats():
     print("Project stats updated")
 
 
+class ExportHistory(Command):
+    """ Streams the task history of a project to a file or stdout """
+
+    option_list = (
+        Option("-p", "--project_id", dest="project_id", type=int, required=True),
+        Option("-f", "--format", dest="export_format", default="csv"),
+        Option("-s", "--start_date", dest="start_date", help="e.g. 2020-01-31"),
+        Option("-e", "--end_date", dest="end_date", help="e.g. 2020-12-31"),
+        Option("-o", "--output", dest="output", help="File, defaults to stdout"),
+    )
+
+    def run(self, project_id, export_format, start_date, end_date, output):
+        chunks = StatsService.export_task_history(
+            project_id,
+            export_format,
+            StatsService.parse_history_date(start_date),
+            StatsService.parse_history_date(end_date),
+        )
+        out = open(output, "w") if output else sys.stdout
+        try:
+            for chunk in chunks:
+                out.write(chunk)
+        finally:
+            if output:
+                out.close()
+
+
+manager.add_command("export-history", ExportHistory())
+
+
+@manager.option(
+    "-d", "--days", dest="days", type=int, default=1, help="Days of activity covered"
+)
+def send_activity_digests(days):
+    """ Sends each user a digest of the activity on their projects, run nightly """
+    print("Started sending activity digests...")
+    since = datetime.datetime.utcnow() - datetime.timedelta(days=days)
+    digests_sent = MessageService.send_activity_digests(since)
+    print(f"Sent activity digests to {digests_sent} users")
+
+
+@manager.option(
+    "-b",
+    "--batch-size",
+    dest="batch_size",
+    type=int,
+    default=PURGE_BATCH_SIZE,
+    help="Messages deleted per transaction",
+)
+@manager.option(
+    "-p",
+    "--pause",
+    dest="pause",
+    type=float,
+    default=0.1,
+    help="Seconds to wait between batches",
+)
+def purge_messages(batch_size, pause):
+    """ Deletes the messages older than the retention of their type, run nightly """
+    print("Started purging expired messages...")
+    purged = MessageRetentionService.purge_expired_messages(batch_size, pause)
+    print(f"Purged {purged} messages")
+
+
+@manager.option(
+    "-m",
+    "--months",
+    dest="months",
+    type=int,
+    default=3,
+    help="Months ahead to create partitions for",
+)
+def partition_messages(months):
+    """
+    Partitions the messages table by month, and creates the partitions of the coming months.
+    Optional, once run it must be run monthly. Locks messages while the table is converted
+    """
+    print("Started partitioning messages...")
+    created = MessageRetentionService.partition_messages(months)
+    print(f"Created partitions {', '.join(created) or 'none'}")
+
+
+class MailWorker(Command):
+    """ Delivers queued emails, keeping SMTP connections open between batches """
+
+    option_list = (
+        Option(
+            "-i",
+            "--interval",
+            dest="poll_interval",
+            type=float,
+            default=5.0,
+            help="Seconds between polls of an empty queue",
+        ),
+        Option(
+            "--once",
+            dest="once",
+            action="store_true",
+            help="Exit once no queued email is due",
+        ),
+    )
+
+    def run(self, poll_interval, once):
+        stats = EmailQueueService.get_queue_stats()
+        print(
+            f"Starting mail worker, {stats.pending} emails queued, {stats.failed} failed"
+        )
+        EmailQueueService.run_worker(poll_interval, once)
+
+
+manager.add_command("mail-worker", MailWorker())
+
+
 @manager.command
 def build_locales():
     print("building locale strings...")
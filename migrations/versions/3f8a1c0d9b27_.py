@@ -0,0 +1,110 @@
+"""empty message
+
+Revision ID: 3f8a1c0d9b27
+Revises: 949f96e2ea4d
+Create Date: 2026-10-19 12:05:31.918204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import geoalchemy2
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "3f8a1c0d9b27"
+down_revision = "949f96e2ea4d"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "project_search_index",
+        sa.Column("project_id", sa.Integer(), nullable=False),
+        sa.Column("locale", sa.String(length=10), nullable=False),
+        sa.Column("is_default_locale", sa.Boolean(), nullable=False),
+        sa.Column("name", sa.String(length=512), nullable=True),
+        sa.Column("short_description", sa.String(), nullable=True),
+        sa.Column("text_searchable", postgresql.TSVECTOR(), nullable=True),
+        sa.Column("status", sa.Integer(), nullable=False),
+        sa.Column("private", sa.Boolean(), nullable=True),
+        sa.Column("mapper_level", sa.Integer(), nullable=False),
+        sa.Column("priority", sa.Integer(), nullable=True),
+        sa.Column("author_id", sa.BigInteger(), nullable=True),
+        sa.Column("organisation_id", sa.Integer(), nullable=True),
+        sa.Column("organisation_name", sa.String(length=512), nullable=True),
+        sa.Column("organisation_logo", sa.String(), nullable=True),
+        sa.Column("mapping_types", postgresql.ARRAY(sa.Integer()), nullable=True),
+        sa.Column("country", postgresql.ARRAY(sa.String()), nullable=True),
+        sa.Column(
+            "centroid",
+            geoalchemy2.types.Geometry(geometry_type="POINT", srid=4326),
+            nullable=True,
+        ),
+        sa.Column("due_date", sa.DateTime(), nullable=True),
+        sa.Column("last_updated", sa.DateTime(), nullable=True),
+        sa.Column("percent_mapped", sa.Integer(), nullable=True),
+        sa.Column("percent_validated", sa.Integer(), nullable=True),
+        sa.Column("total_contributors", sa.Integer(), nullable=True),
+        sa.Column("active_mappers", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["project_id"], ["projects.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("project_id", "locale"),
+    )
+    op.create_index(
+        "idx_project_search_index_status",
+        "project_search_index",
+        ["status", "locale"],
+        unique=False,
+    )
+    op.create_index(
+        "idx_project_search_index_organisation",
+        "project_search_index",
+        ["organisation_id"],
+        unique=False,
+    )
+    op.create_index(
+        "idx_project_search_index_text",
+        "project_search_index",
+        ["text_searchable"],
+        unique=False,
+        postgresql_using="gin",
+    )
+
+    # Populate the index for all existing projects
+    op.execute(
+        """INSERT INTO project_search_index
+                  (project_id, locale, is_default_locale, name, short_description, text_searchable,
+                   status, private, mapper_level, priority, author_id, organisation_id,
+                   organisation_name, organisation_logo, mapping_types, country, centroid,
+                   due_date, last_updated, percent_mapped, percent_validated, total_contributors,
+                   active_mappers)
+           SELECT p.id, pi.locale, pi.locale = p.default_locale,
+                  coalesce(nullif(pi.name, ''), d.name),
+                  coalesce(nullif(pi.short_description, ''), d.short_description),
+                  pi.text_searchable, p.status, p.private, p.mapper_level, p.priority, p.author_id,
+                  p.organisation_id, o.name, o.logo, p.mapping_types, p.country, p.centroid,
+                  p.due_date, p.last_updated,
+                  CASE WHEN p.total_tasks - p.tasks_bad_imagery > 0
+                       THEN (p.tasks_mapped + p.tasks_validated) * 100 / (p.total_tasks - p.tasks_bad_imagery)
+                       ELSE 0 END,
+                  CASE WHEN p.total_tasks - p.tasks_bad_imagery > 0
+                       THEN p.tasks_validated * 100 / (p.total_tasks - p.tasks_bad_imagery)
+                       ELSE 0 END,
+                  (SELECT count(DISTINCT th.user_id) FROM task_history th WHERE th.project_id = p.id),
+                  (SELECT count(DISTINCT t.locked_by) FROM tasks t
+                    WHERE t.project_id = p.id AND t.task_status IN (1, 3))
+             FROM projects p
+             JOIN project_info pi ON pi.project_id = p.id
+             LEFT JOIN project_info d ON d.project_id = p.id AND d.locale = p.default_locale
+             LEFT JOIN organisations o ON o.id = p.organisation_id"""
+    )
+
+
+def downgrade():
+    op.drop_index("idx_project_search_index_text", table_name="project_search_index")
+    op.drop_index(
+        "idx_project_search_index_organisation", table_name="project_search_index"
+    )
+    op.drop_index("idx_project_search_index_status", table_name="project_search_index")
+    op.drop_table("project_search_index")
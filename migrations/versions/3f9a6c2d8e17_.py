@@ -0,0 +1,25 @@
+"""empty message
+
+Revision ID: 3f9a6c2d8e17
+Revises: b7f4e2a9c613
+Create Date: 2026-10-19 18:05:12.448190
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "3f9a6c2d8e17"
+down_revision = "b7f4e2a9c613"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "idx_messages_inbox", "messages", ["to_user_id", "date", "id"], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index("idx_messages_inbox", table_name="messages")
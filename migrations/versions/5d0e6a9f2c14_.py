@@ -0,0 +1,58 @@
+"""empty message
+
+Revision ID: 5d0e6a9f2c14
+Revises: b72e04c5d1a8
+Create Date: 2026-10-19 14:10:05.774230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5d0e6a9f2c14"
+down_revision = "b72e04c5d1a8"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "project_countries",
+        sa.Column("project_id", sa.Integer(), nullable=False),
+        sa.Column("country_name", sa.String(), nullable=False),
+        sa.Column("country_code", sa.String(length=2), nullable=True),
+        sa.ForeignKeyConstraint(["project_id"], ["projects.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("project_id", "country_name"),
+    )
+    op.create_index(
+        "idx_project_countries_name",
+        "project_countries",
+        ["country_name"],
+        unique=False,
+    )
+    op.create_index(
+        "idx_project_countries_code",
+        "project_countries",
+        ["country_code"],
+        unique=False,
+    )
+    op.execute(
+        """CREATE INDEX idx_project_countries_name_trgm ON project_countries
+           USING gin (country_name gin_trgm_ops)"""
+    )
+
+    # Codes are only known for countries set from now on
+    op.execute(
+        """INSERT INTO project_countries (project_id, country_name)
+           SELECT DISTINCT p.id, c.country_name
+             FROM projects p, unnest(p.country) AS c(country_name)
+            WHERE c.country_name IS NOT NULL AND c.country_name <> ''"""
+    )
+
+
+def downgrade():
+    op.drop_index("idx_project_countries_name_trgm", table_name="project_countries")
+    op.drop_index("idx_project_countries_code", table_name="project_countries")
+    op.drop_index("idx_project_countries_name", table_name="project_countries")
+    op.drop_table("project_countries")
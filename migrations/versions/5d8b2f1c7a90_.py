@@ -0,0 +1,45 @@
+"""empty message
+
+Revision ID: 5d8b2f1c7a90
+Revises: c1a9e7f34b62
+Create Date: 2026-10-19 15:48:37.529184
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "5d8b2f1c7a90"
+down_revision = "c1a9e7f34b62"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "email_outbox",
+        sa.Column("id", sa.BigInteger(), nullable=False),
+        sa.Column("to_address", sa.String(), nullable=False),
+        sa.Column("subject", sa.String(), nullable=False),
+        sa.Column("html_message", sa.String(), nullable=True),
+        sa.Column("text_message", sa.String(), nullable=True),
+        sa.Column("status", sa.Integer(), nullable=False),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("next_attempt_at", sa.DateTime(), nullable=False),
+        sa.Column("last_error", sa.String(), nullable=True),
+        sa.Column("created_date", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "idx_email_outbox_pending",
+        "email_outbox",
+        ["next_attempt_at"],
+        unique=False,
+        postgresql_where=sa.text("status = 0"),
+    )
+
+
+def downgrade():
+    op.drop_index("idx_email_outbox_pending", table_name="email_outbox")
+    op.drop_table("email_outbox")
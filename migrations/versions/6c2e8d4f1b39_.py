@@ -0,0 +1,25 @@
+"""empty message
+
+Revision ID: 6c2e8d4f1b39
+Revises: 3f9a6c2d8e17
+Create Date: 2026-10-19 19:12:37.905214
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "6c2e8d4f1b39"
+down_revision = "3f9a6c2d8e17"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "idx_messages_type_date", "messages", ["message_type", "date"], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index("idx_messages_type_date", table_name="messages")
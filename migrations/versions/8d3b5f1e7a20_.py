@@ -0,0 +1,27 @@
+"""empty message
+
+Revision ID: 8d3b5f1e7a20
+Revises: 6c2e8d4f1b39
+Create Date: 2026-10-19 21:04:51.317206
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8d3b5f1e7a20"
+down_revision = "6c2e8d4f1b39"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "user_recommendations",
+        sa.Column("is_stale", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+
+
+def downgrade():
+    op.drop_column("user_recommendations", "is_stale")
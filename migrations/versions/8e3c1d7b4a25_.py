@@ -0,0 +1,115 @@
+"""empty message
+
+Revision ID: 8e3c1d7b4a25
+Revises: 5d8b2f1c7a90
+Create Date: 2026-10-19 16:31:05.817342
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "8e3c1d7b4a25"
+down_revision = "5d8b2f1c7a90"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # One counter per user, rebuilt from the messages
+    op.execute("DELETE FROM notifications")
+    op.drop_index("idx_notifications_user_id", table_name="notifications")
+    op.create_index(
+        "idx_notifications_user_id", "notifications", ["user_id"], unique=True
+    )
+    op.execute(
+        """INSERT INTO notifications (user_id, unread_count, date)
+           SELECT to_user_id, count(*) FILTER (WHERE NOT coalesce(read, false)),
+                  now() AT TIME ZONE 'utc'
+             FROM messages
+            WHERE to_user_id IS NOT NULL
+            GROUP BY to_user_id"""
+    )
+
+    # Changed counters are published on the tm_unread_counts channel as user_id:unread_count,
+    # for the notification streams to push
+    op.execute(
+        """CREATE OR REPLACE FUNCTION tm_apply_unread_deltas(user_ids bigint[], deltas bigint[])
+           RETURNS void AS $$
+           DECLARE
+               notified integer;
+           BEGIN
+               WITH changed AS (
+                   INSERT INTO notifications (user_id, unread_count, date)
+                   SELECT d.user_id, d.delta, now() AT TIME ZONE 'utc'
+                     FROM unnest(user_ids, deltas) AS d(user_id, delta)
+                    WHERE d.delta <> 0
+                       ON CONFLICT (user_id) DO UPDATE
+                      SET unread_count = greatest(notifications.unread_count
+                                                  + EXCLUDED.unread_count, 0),
+                          date = EXCLUDED.date
+                   RETURNING user_id, unread_count)
+               SELECT count(pg_notify('tm_unread_counts', user_id || ':' || unread_count))
+                 INTO notified
+                 FROM changed;
+           END;
+           $$ LANGUAGE plpgsql"""
+    )
+
+    # Statement level triggers keep the counters in the transaction that changes the messages,
+    # so a broadcast to thousands of users is a single upsert
+    op.execute(
+        """CREATE OR REPLACE FUNCTION tm_update_unread_counts() RETURNS trigger AS $$
+           BEGIN
+               IF TG_OP = 'INSERT' THEN
+                   PERFORM tm_apply_unread_deltas(array_agg(to_user_id), array_agg(delta))
+                      FROM (SELECT to_user_id, count(*) AS delta FROM new_messages
+                             WHERE to_user_id IS NOT NULL AND NOT coalesce(read, false)
+                             GROUP BY to_user_id) d;
+               ELSIF TG_OP = 'DELETE' THEN
+                   PERFORM tm_apply_unread_deltas(array_agg(to_user_id), array_agg(delta))
+                      FROM (SELECT to_user_id, -count(*) AS delta FROM old_messages
+                             WHERE to_user_id IS NOT NULL AND NOT coalesce(read, false)
+                             GROUP BY to_user_id) d;
+               ELSE
+                   PERFORM tm_apply_unread_deltas(array_agg(to_user_id), array_agg(delta))
+                      FROM (SELECT to_user_id, sum(delta) AS delta
+                              FROM (SELECT to_user_id, 1 AS delta FROM new_messages
+                                     WHERE NOT coalesce(read, false)
+                                    UNION ALL
+                                    SELECT to_user_id, -1 FROM old_messages
+                                     WHERE NOT coalesce(read, false)) c
+                             WHERE to_user_id IS NOT NULL
+                             GROUP BY to_user_id) d;
+               END IF;
+               RETURN NULL;
+           END;
+           $$ LANGUAGE plpgsql"""
+    )
+    op.execute(
+        """CREATE TRIGGER tm_messages_unread_insert AFTER INSERT ON messages
+           REFERENCING NEW TABLE AS new_messages
+           FOR EACH STATEMENT EXECUTE PROCEDURE tm_update_unread_counts()"""
+    )
+    op.execute(
+        """CREATE TRIGGER tm_messages_unread_update AFTER UPDATE ON messages
+           REFERENCING OLD TABLE AS old_messages NEW TABLE AS new_messages
+           FOR EACH STATEMENT EXECUTE PROCEDURE tm_update_unread_counts()"""
+    )
+    op.execute(
+        """CREATE TRIGGER tm_messages_unread_delete AFTER DELETE ON messages
+           REFERENCING OLD TABLE AS old_messages
+           FOR EACH STATEMENT EXECUTE PROCEDURE tm_update_unread_counts()"""
+    )
+
+
+def downgrade():
+    op.execute("DROP TRIGGER tm_messages_unread_delete ON messages")
+    op.execute("DROP TRIGGER tm_messages_unread_update ON messages")
+    op.execute("DROP TRIGGER tm_messages_unread_insert ON messages")
+    op.execute("DROP FUNCTION tm_update_unread_counts()")
+    op.execute("DROP FUNCTION tm_apply_unread_deltas(bigint[], bigint[])")
+    op.drop_index("idx_notifications_user_id", table_name="notifications")
+    op.create_index(
+        "idx_notifications_user_id", "notifications", ["user_id"], unique=False
+    )
@@ -0,0 +1,68 @@
+"""empty message
+
+Revision ID: 949f96e2ea4d
+Revises: 84c793a951b2
+Create Date: 2026-10-19 10:40:12.482107
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "949f96e2ea4d"
+down_revision = "84c793a951b2"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "contribution_stats",
+        sa.Column("project_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("tasks_mapped", sa.Integer(), nullable=False),
+        sa.Column("tasks_validated", sa.Integer(), nullable=False),
+        sa.Column("area_mapped", sa.Float(), nullable=False),
+        sa.Column("area_validated", sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(["project_id"], ["projects.id"]),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("project_id", "user_id", "day"),
+    )
+    op.create_index(
+        "idx_contribution_stats_project_day",
+        "contribution_stats",
+        ["project_id", "day"],
+        unique=False,
+    )
+    op.create_index(
+        "idx_contribution_stats_user_day",
+        "contribution_stats",
+        ["user_id", "day"],
+        unique=False,
+    )
+
+    # Backfill the daily totals from the existing task history
+    op.execute(
+        """INSERT INTO contribution_stats
+                  (project_id, user_id, day, tasks_mapped, tasks_validated, area_mapped, area_validated)
+           SELECT th.project_id, th.user_id, th.action_date::date,
+                  count(*) FILTER (WHERE th.action_text = 'MAPPED'),
+                  count(*) FILTER (WHERE th.action_text = 'VALIDATED'),
+                  coalesce(sum(ST_Area(t.geometry, true) / 1000000)
+                           FILTER (WHERE th.action_text = 'MAPPED'), 0),
+                  coalesce(sum(ST_Area(t.geometry, true) / 1000000)
+                           FILTER (WHERE th.action_text = 'VALIDATED'), 0)
+             FROM task_history th
+             JOIN tasks t ON t.id = th.task_id AND t.project_id = th.project_id
+            WHERE th.action = 'STATE_CHANGE'
+              AND th.action_text IN ('MAPPED', 'VALIDATED')
+            GROUP BY th.project_id, th.user_id, th.action_date::date"""
+    )
+
+
+def downgrade():
+    op.drop_index("idx_contribution_stats_user_day", table_name="contribution_stats")
+    op.drop_index("idx_contribution_stats_project_day", table_name="contribution_stats")
+    op.drop_table("contribution_stats")
@@ -0,0 +1,93 @@
+"""empty message
+
+Revision ID: b72e04c5d1a8
+Revises: 3f8a1c0d9b27
+Create Date: 2026-10-19 13:22:47.305516
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "b72e04c5d1a8"
+down_revision = "3f8a1c0d9b27"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # Text search configuration matching the language of a locale, eg pt-BR -> portuguese
+    op.execute(
+        """CREATE OR REPLACE FUNCTION tm_locale_regconfig(locale text) RETURNS regconfig AS $$
+           SELECT CASE split_part(lower(locale), '-', 1)
+                  WHEN 'da' THEN 'danish'
+                  WHEN 'de' THEN 'german'
+                  WHEN 'en' THEN 'english'
+                  WHEN 'es' THEN 'spanish'
+                  WHEN 'fi' THEN 'finnish'
+                  WHEN 'fr' THEN 'french'
+                  WHEN 'hu' THEN 'hungarian'
+                  WHEN 'it' THEN 'italian'
+                  WHEN 'nb' THEN 'norwegian'
+                  WHEN 'nl' THEN 'dutch'
+                  WHEN 'no' THEN 'norwegian'
+                  WHEN 'pt' THEN 'portuguese'
+                  WHEN 'ro' THEN 'romanian'
+                  WHEN 'ru' THEN 'russian'
+                  WHEN 'sv' THEN 'swedish'
+                  WHEN 'tr' THEN 'turkish'
+                  ELSE 'simple'
+                  END::regconfig
+           $$ LANGUAGE sql IMMUTABLE"""
+    )
+
+    op.execute(
+        """UPDATE project_search_index psi
+              SET text_searchable =
+                  setweight(to_tsvector(tm_locale_regconfig(pi.locale),
+                                        coalesce(nullif(pi.name, ''), d.name, '')), 'A') ||
+                  setweight(to_tsvector('simple', p.id::text), 'A') ||
+                  setweight(to_tsvector(tm_locale_regconfig(pi.locale),
+                                        coalesce(nullif(pi.short_description, ''), d.short_description, '')), 'B') ||
+                  setweight(to_tsvector(tm_locale_regconfig(pi.locale),
+                                        coalesce(nullif(pi.description, ''), d.description, '')), 'C')
+             FROM projects p
+             JOIN project_info pi ON pi.project_id = p.id
+             LEFT JOIN project_info d ON d.project_id = p.id AND d.locale = p.default_locale
+            WHERE psi.project_id = p.id AND psi.locale = pi.locale"""
+    )
+
+    # Type-ahead indexes: trigrams for name fragments, text patterns for prefixes
+    op.execute(
+        """CREATE INDEX idx_project_search_index_name_trgm ON project_search_index
+           USING gin (lower(name) gin_trgm_ops)"""
+    )
+    op.execute(
+        """CREATE INDEX idx_project_search_index_name_prefix ON project_search_index
+           (lower(name) text_pattern_ops)"""
+    )
+    op.execute(
+        """CREATE INDEX idx_project_search_index_id_prefix ON project_search_index
+           ((project_id::text) text_pattern_ops)"""
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "idx_project_search_index_id_prefix", table_name="project_search_index"
+    )
+    op.drop_index(
+        "idx_project_search_index_name_prefix", table_name="project_search_index"
+    )
+    op.drop_index(
+        "idx_project_search_index_name_trgm", table_name="project_search_index"
+    )
+    op.execute(
+        """UPDATE project_search_index psi
+              SET text_searchable = pi.text_searchable
+             FROM project_info pi
+            WHERE pi.project_id = psi.project_id AND pi.locale = psi.locale"""
+    )
+    op.execute("DROP FUNCTION tm_locale_regconfig(text)")
@@ -0,0 +1,25 @@
+"""empty message
+
+Revision ID: b7f4e2a9c613
+Revises: 8e3c1d7b4a25
+Create Date: 2026-10-19 17:20:44.102935
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "b7f4e2a9c613"
+down_revision = "8e3c1d7b4a25"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "idx_task_history_action_date", "task_history", ["action_date"], unique=False
+    )
+
+
+def downgrade():
+    op.drop_index("idx_task_history_action_date", table_name="task_history")
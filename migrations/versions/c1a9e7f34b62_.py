@@ -0,0 +1,33 @@
+"""empty message
+
+Revision ID: c1a9e7f34b62
+Revises: 5d0e6a9f2c14
+Create Date: 2026-10-19 15:02:19.640381
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "c1a9e7f34b62"
+down_revision = "5d0e6a9f2c14"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Rows are created by the nightly refresh-recommendations job, or on first view
+    op.create_table(
+        "user_recommendations",
+        sa.Column("user_id", sa.BigInteger(), nullable=False),
+        sa.Column("project_ids", postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.Column("updated_date", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("user_id"),
+    )
+
+
+def downgrade():
+    op.drop_table("user_recommendations")
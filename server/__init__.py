@@ -89,9 +89,25 @@ def create_app(env=None):
     ]  # Required by itsdangeroud, Flask-OAuthlib for creating entropy
     oauth.init_app(app)
 
+    # Progress in the project search index is refreshed once per request, after all its task changes
+    app.after_request(refresh_search_progress)
+
     return app
 
 
+def refresh_search_progress(response):
+    from server.models.postgis.project_search_index import ProjectSearchIndex
+
+    try:
+        ProjectSearchIndex.refresh_scheduled_progress()
+    except Exception as e:
+        # The task changes are committed, the progress catches up on the next change of the project
+        db.session.rollback()
+        current_app.logger.error(f"Unable to refresh search progress: {str(e)}")
+
+    return response
+
+
 def initialise_logger(app):
     """
     Read environment config then initialise a 2MB rotating log.  Prod Log Level can be reduced to help diagnose Prod
@@ -135,6 +151,8 @@ def add_api_endpoints(app):
         ProjectsRestAPI,
         ProjectsAllAPI,
         ProjectsQueriesBboxAPI,
+        ProjectsQueriesMapClustersAPI,
+        ProjectsQueriesAutocompleteAPI,
         ProjectsQueriesOwnerAPI,
         ProjectsQueriesTouchedAPI,
         ProjectsQueriesSummaryAPI,
@@ -146,6 +164,7 @@ def add_api_endpoints(app):
     from server.api.projects.activities import (
         ProjectsActivitiesAPI,
         ProjectsLastActivitiesAPI,
+        ProjectsActivitiesExportAPI,
     )
     from server.api.projects.contributions import (
         ProjectsContributionsAPI,
@@ -155,6 +174,7 @@ def add_api_endpoints(app):
         ProjectsStatisticsAPI,
         ProjectsStatisticsQueriesUsernameAPI,
         ProjectsStatisticsQueriesPopularAPI,
+        ProjectsStatisticsLeaderboardAPI,
     )
     from server.api.projects.teams import ProjectsTeamsAPI
     from server.api.projects.campaigns import ProjectsCampaignsAPI
@@ -175,6 +195,7 @@ def add_api_endpoints(app):
         TasksQueriesXmlAPI,
         TasksQueriesGpxAPI,
         TasksQueriesAoiAPI,
+        TasksQueriesGridAPI,
         TasksQueriesOwnLockedAPI,
         TasksQueriesOwnLockedDetailsAPI,
         TasksQueriesMappedAPI,
@@ -217,6 +238,7 @@ def add_api_endpoints(app):
 
     # Campaigns API endpoint
     from server.api.campaigns.resources import CampaignsRestAPI, CampaignsAllAPI
+    from server.api.campaigns.statistics import CampaignsStatisticsLeaderboardAPI
 
     # Organisations API endpoint
     from server.api.organisations.resources import (
@@ -224,9 +246,12 @@ def add_api_endpoints(app):
         OrganisationsAllAPI,
     )
     from server.api.organisations.campaigns import OrganisationsCampaignsAPI
+    from server.api.organisations.statistics import (
+        OrganisationsStatisticsLeaderboardAPI,
+    )
 
     # Countries API endpoint
-    from server.api.countries.resources import CountriesRestAPI
+    from server.api.countries.resources import CountriesRestAPI, CountriesStatisticsAPI
 
     # Teams API endpoint
     from server.api.teams.resources import TeamsRestAPI, TeamsAllAPI
@@ -237,8 +262,13 @@ def add_api_endpoints(app):
         NotificationsRestAPI,
         NotificationsAllAPI,
         NotificationsQueriesCountUnreadAPI,
+        NotificationsQueriesStreamUnreadAPI,
+    )
+    from server.api.notifications.actions import (
+        NotificationsActionsDeleteMultipleAPI,
+        NotificationsActionsDeleteAllAPI,
+        NotificationsActionsMarkAsReadAllAPI,
     )
-    from server.api.notifications.actions import NotificationsActionsDeleteMultipleAPI
 
     # Users API endpoint
     from server.api.users.resources import (
@@ -273,7 +303,10 @@ def add_api_endpoints(app):
         SystemLanguagesAPI,
         SystemContactAdminRestAPI,
     )
-    from server.api.system.statistics import SystemStatisticsAPI
+    from server.api.system.statistics import (
+        SystemStatisticsAPI,
+        SystemEmailQueueStatisticsAPI,
+    )
     from server.api.system.authentication import (
         SystemAuthenticationEmailAPI,
         SystemAuthenticationLoginAPI,
@@ -297,6 +330,12 @@ def add_api_endpoints(app):
 
     # Projects queries endoints (TODO: Refactor them into the REST endpoints)
     api.add_resource(ProjectsQueriesBboxAPI, format_url("projects/queries/bbox/"))
+    api.add_resource(
+        ProjectsQueriesMapClustersAPI, format_url("projects/queries/map-clusters/")
+    )
+    api.add_resource(
+        ProjectsQueriesAutocompleteAPI, format_url("projects/queries/autocomplete/")
+    )
     api.add_resource(
         ProjectsQueriesOwnerAPI, format_url("projects/queries/myself/owner/")
     )
@@ -331,6 +370,10 @@ def add_api_endpoints(app):
         ProjectsLastActivitiesAPI,
         format_url("projects/<int:project_id>/activities/latest/"),
     )
+    api.add_resource(
+        ProjectsActivitiesExportAPI,
+        format_url("projects/<int:project_id>/history/export/"),
+    )
     api.add_resource(
         ProjectsContributionsAPI, format_url("projects/<int:project_id>/contributions/")
     )
@@ -351,6 +394,11 @@ def add_api_endpoints(app):
         ProjectsStatisticsQueriesPopularAPI, format_url("projects/queries/popular/")
     )
 
+    api.add_resource(
+        ProjectsStatisticsLeaderboardAPI,
+        format_url("projects/<int:project_id>/statistics/leaderboard/"),
+    )
+
     api.add_resource(
         ProjectsTeamsAPI,
         format_url("projects/<int:project_id>/teams/"),
@@ -449,6 +497,7 @@ def add_api_endpoints(app):
     api.add_resource(
         TasksQueriesAoiAPI, format_url("projects/<int:project_id>/tasks/queries/aoi/")
     )
+    api.add_resource(TasksQueriesGridAPI, format_url("projects/tasks/queries/grid/"))
     api.add_resource(
         TasksQueriesOwnLockedAPI, format_url("projects/tasks/queries/own/locked/")
     )
@@ -579,6 +628,7 @@ def add_api_endpoints(app):
 
     # Countries REST endpoints
     api.add_resource(CountriesRestAPI, format_url("countries/"))
+    api.add_resource(CountriesStatisticsAPI, format_url("countries/statistics/"))
 
     # Organisations REST endpoints
     api.add_resource(OrganisationsAllAPI, format_url("organisations/"))
@@ -613,6 +663,10 @@ def add_api_endpoints(app):
         endpoint="assign_campaign_to_organisation",
         methods=["POST", "DELETE"],
     )
+    api.add_resource(
+        OrganisationsStatisticsLeaderboardAPI,
+        format_url("organisations/<int:organisation_id>/statistics/leaderboard/"),
+    )
 
     # Teams REST endpoints
     api.add_resource(TeamsAllAPI, format_url("teams"), methods=["GET"])
@@ -656,6 +710,10 @@ def add_api_endpoints(app):
         format_url("campaigns/<int:campaign_id>/"),
         methods=["GET", "PATCH", "DELETE"],
     )
+    api.add_resource(
+        CampaignsStatisticsLeaderboardAPI,
+        format_url("campaigns/<int:campaign_id>/statistics/leaderboard/"),
+    )
 
     # Notifications REST endpoints
     api.add_resource(
@@ -666,6 +724,10 @@ def add_api_endpoints(app):
         NotificationsQueriesCountUnreadAPI,
         format_url("notifications/queries/own/count-unread/"),
     )
+    api.add_resource(
+        NotificationsQueriesStreamUnreadAPI,
+        format_url("notifications/queries/own/stream-unread/"),
+    )
 
     # Notifications Actions endpoints
     api.add_resource(
@@ -673,6 +735,16 @@ def add_api_endpoints(app):
         format_url("notifications/delete-multiple/"),
         methods=["DELETE"],
     )
+    api.add_resource(
+        NotificationsActionsDeleteAllAPI,
+        format_url("notifications/delete-all/"),
+        methods=["DELETE"],
+    )
+    api.add_resource(
+        NotificationsActionsMarkAsReadAllAPI,
+        format_url("notifications/mark-as-read-all/"),
+        methods=["POST"],
+    )
 
     # Users REST endpoint
     api.add_resource(UsersAllAPI, format_url("users/"))
@@ -738,6 +810,9 @@ def add_api_endpoints(app):
     api.add_resource(SystemHeartbeatAPI, format_url("system/heartbeat/"))
     api.add_resource(SystemLanguagesAPI, format_url("system/languages/"))
     api.add_resource(SystemStatisticsAPI, format_url("system/statistics/"))
+    api.add_resource(
+        SystemEmailQueueStatisticsAPI, format_url("system/statistics/email-queue/")
+    )
     api.add_resource(
         SystemAuthenticationLoginAPI, format_url("system/authentication/login/")
     )
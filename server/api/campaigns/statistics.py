@@ -0,0 +1,45 @@
+from server.api.leaderboards import LeaderboardAPI
+
+
+class CampaignsStatisticsLeaderboardAPI(LeaderboardAPI):
+    scope = "campaign"
+
+    def get(self, campaign_id):
+        """
+        Get the top contributors of all projects of a campaign
+        ---
+        tags:
+          - campaigns
+        produces:
+          - application/json
+        parameters:
+            - name: campaign_id
+              in: path
+              description: Unique campaign ID
+              required: true
+              type: integer
+              default: 1
+            - in: query
+              name: metric
+              description: One of mapped, validated, mapped_area, validated_area
+              type: string
+              default: mapped
+            - in: query
+              name: period
+              description: One of day, week, month, year, all
+              type: string
+              default: month
+            - in: query
+              name: limit
+              description: Number of users returned, up to 100
+              type: integer
+              default: 10
+        responses:
+            200:
+                description: Leaderboard
+            400:
+                description: Invalid request
+            500:
+                description: Internal Server Error
+        """
+        return self.get_leaderboard(campaign_id)
@@ -1,4 +1,5 @@
 from flask_restful import Resource, current_app
+from server.services.stats_service import StatsService
 from server.services.tags_service import TagsService
 
 
@@ -24,3 +25,27 @@ class CountriesRestAPI(Resource):
             error_msg = f"User GET - unhandled error: {str(e)}"
             current_app.logger.critical(error_msg)
             return {"Error": error_msg}, 500
+
+
+class CountriesStatisticsAPI(Resource):
+    def get(self):
+        """
+        Get project and task totals for each country
+        ---
+        tags:
+          - countries
+        produces:
+          - application/json
+        responses:
+            200:
+                description: Country statistics returned
+            500:
+                description: Internal Server Error
+        """
+        try:
+            stats = StatsService.get_country_stats()
+            return stats.to_primitive(), 200
+        except Exception as e:
+            error_msg = f"Countries Statistics GET - unhandled error: {str(e)}"
+            current_app.logger.critical(error_msg)
+            return {"Error": "Unable to fetch country statistics"}, 500
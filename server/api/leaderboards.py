@@ -0,0 +1,29 @@
+from flask_restful import Resource, current_app, request
+from server.services.leaderboard_service import (
+    LeaderboardService,
+    LeaderboardServiceError,
+)
+
+
+class LeaderboardAPI(Resource):
+    """ Base of the leaderboard resources, which only differ by the scope they rank """
+
+    scope = None
+
+    def get_leaderboard(self, scope_id: int):
+        """ Gets the leaderboard of the scope for the metric, period and limit query params """
+        try:
+            leaderboard = LeaderboardService.get_leaderboard(
+                self.scope,
+                scope_id,
+                request.args.get("metric", "mapped"),
+                request.args.get("period", "month"),
+                request.args.get("limit", 10, type=int),
+            )
+            return leaderboard.to_primitive(), 200
+        except LeaderboardServiceError as e:
+            return {"Error": str(e)}, 400
+        except Exception as e:
+            error_msg = f"Leaderboard GET - unhandled error: {str(e)}"
+            current_app.logger.critical(error_msg)
+            return {"Error": "Unable to fetch leaderboard"}, 500
@@ -1,6 +1,9 @@
 from flask_restful import Resource, request, current_app
 
-from server.services.messaging.message_service import MessageService
+from server.services.messaging.message_service import (
+    MessageService,
+    MessageServiceError,
+)
 from server.services.users.authentication_service import token_auth, tm
 
 
@@ -50,3 +53,91 @@ class NotificationsActionsDeleteMultipleAPI(Resource):
             error_msg = f"DeleteMultipleMessages - unhandled error: {str(e)}"
             current_app.logger.critical(error_msg)
             return {"Error": "Unable to delete messages"}, 500
+
+
+class NotificationsActionsDeleteAllAPI(Resource):
+    @tm.pm_only(False)
+    @token_auth.login_required
+    def delete(self):
+        """
+        Delete all messages, or all messages of some types, for logged in user
+        ---
+        tags:
+          - notifications
+        produces:
+          - application/json
+        parameters:
+            - in: header
+              name: Authorization
+              description: Base64 encoded session token
+              required: true
+              type: string
+              default: Token sessionTokenHere==
+            - in: query
+              name: messageType
+              type: string
+              description: Optional comma separated message types to delete; leave blank to delete all
+        responses:
+            200:
+                description: Messages deleted
+            400:
+                description: Invalid message types
+            500:
+                description: Internal Server Error
+        """
+        try:
+            message_type = request.args.get("messageType")
+            deleted = MessageService.delete_all_messages(
+                tm.authenticated_user_id, message_type
+            )
+            return {"Success": f"{deleted} messages deleted"}, 200
+        except MessageServiceError as e:
+            return {"Error": str(e)}, 400
+        except Exception as e:
+            error_msg = f"DeleteAllMessages - unhandled error: {str(e)}"
+            current_app.logger.critical(error_msg)
+            return {"Error": "Unable to delete messages"}, 500
+
+
+class NotificationsActionsMarkAsReadAllAPI(Resource):
+    @tm.pm_only(False)
+    @token_auth.login_required
+    def post(self):
+        """
+        Mark all messages, or all messages of some types, as read for logged in user
+        ---
+        tags:
+          - notifications
+        produces:
+          - application/json
+        parameters:
+            - in: header
+              name: Authorization
+              description: Base64 encoded session token
+              required: true
+              type: string
+              default: Token sessionTokenHere==
+            - in: query
+              name: messageType
+              type: string
+              description: Optional comma separated message types to mark as read; leave blank to mark all
+        responses:
+            200:
+                description: Messages marked as read
+            400:
+                description: Invalid message types
+            500:
+                description: Internal Server Error
+        """
+        try:
+            message_type = request.args.get("messageType")
+            updated = MessageService.mark_all_messages_read(
+                tm.authenticated_user_id, message_type
+            )
+            return {"Success": f"{updated} messages marked as read"}, 200
+        except MessageServiceError as e:
+            return {"Error": str(e)}, 400
+        except Exception as e:
+            error_msg = f"MarkAllMessagesRead - unhandled error: {str(e)}"
+            current_app.logger.critical(error_msg)
+            return {"Error": "Unable to mark messages as read"}, 500
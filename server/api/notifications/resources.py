@@ -1,9 +1,11 @@
+from flask import Response, stream_with_context
 from flask_restful import Resource, request, current_app
 from server.services.messaging.message_service import (
     MessageService,
     NotFound,
     MessageServiceError,
 )
+from server.services.notification_service import NotificationService
 from server.services.users.authentication_service import token_auth, tm
 
 
@@ -152,9 +154,15 @@ class NotificationsAllAPI(Resource):
               name: pageSize
               description: Size of page, defaults to 10
               type: integer
+            - in: query
+              name: cursor
+              description: nextCursor of the previous page, for paging by date without counting messages
+              type: string
         responses:
             200:
                 description: Messages found
+            400:
+                description: Invalid cursor
             404:
                 description: User has no messages
             500:
@@ -170,6 +178,7 @@ class NotificationsAllAPI(Resource):
             from_username = request.args.get("from")
             project = request.args.get("project")
             task_id = request.args.get("taskId", None, int)
+            cursor = request.args.get("cursor")
             user_messages = MessageService.get_all_messages(
                 tm.authenticated_user_id,
                 preferred_locale,
@@ -181,8 +190,11 @@ class NotificationsAllAPI(Resource):
                 from_username,
                 project,
                 task_id,
+                cursor,
             )
             return user_messages.to_primitive(), 200
+        except MessageServiceError as e:
+            return {"Error": str(e)}, 400
         except Exception as e:
             error_msg = f"Messages GET all - unhandled error: {str(e)}"
             current_app.logger.critical(error_msg)
@@ -222,3 +234,40 @@ class NotificationsQueriesCountUnreadAPI(Resource):
             error_msg = f"User GET - unhandled error: {str(e)}"
             current_app.logger.critical(error_msg)
             return {"Error": "Unable to fetch messages count"}, 500
+
+
+class NotificationsQueriesStreamUnreadAPI(Resource):
+    @tm.pm_only(False)
+    @token_auth.login_required
+    def get(self):
+        """
+        Streams the count of unread messages as server sent events
+        ---
+        tags:
+          - notifications
+        produces:
+          - text/event-stream
+        parameters:
+            - in: header
+              name: Authorization
+              description: Base64 encoded session token
+              required: true
+              type: string
+              default: Token sessionTokenHere==
+        responses:
+            200:
+                description: unread events with the current count, then one on each change
+            500:
+                description: Internal Server Error
+        """
+        try:
+            events = NotificationService.stream_unread_count(tm.authenticated_user_id)
+            return Response(
+                stream_with_context(events),
+                mimetype="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+            )
+        except Exception as e:
+            error_msg = f"Unread stream GET - unhandled error: {str(e)}"
+            current_app.logger.critical(error_msg)
+            return {"Error": "Unable to stream messages count"}, 500
@@ -1,5 +1,3 @@
-import threading
-
 from flask_restful import Resource, request, current_app
 from schematics.exceptions import DataError
 
@@ -118,12 +116,11 @@ class ProjectsActionsMessageContributorsAPI(Resource):
             return {"Error": "Unable to send message to mappers"}, 400
 
         try:
-            threading.Thread(
-                target=MessageService.send_message_to_all_contributors,
-                args=(project_id, message_dto),
-            ).start()
+            contributors = MessageService.send_message_to_all_contributors(
+                project_id, message_dto
+            )
 
-            return {"Success": "Messages started"}, 200
+            return {"Success": f"Message sent to {contributors} contributors"}, 200
         except Exception as e:
             error_msg = f"Send message all - unhandled error: {str(e)}"
             current_app.logger.critical(error_msg)
@@ -1,3 +1,4 @@
+from flask import Response, stream_with_context
 from flask_restful import Resource, current_app, request
 from server.services.stats_service import StatsService, NotFound
 
@@ -74,3 +75,73 @@ class ProjectsLastActivitiesAPI(Resource):
             error_msg = f"User GET - unhandled error: {str(e)}"
             current_app.logger.critical(error_msg)
             return {"Error": "Unable to fetch user activity"}, 500
+
+
+class ProjectsActivitiesExportAPI(Resource):
+    def get(self, project_id):
+        """
+        Export the full task history of a project
+        ---
+        tags:
+          - projects
+        produces:
+          - text/csv
+          - application/x-ndjson
+        parameters:
+            - name: project_id
+              in: path
+              description: Unique project ID
+              required: true
+              type: integer
+              default: 1
+            - in: query
+              name: format
+              description: Export format, csv or ndjson
+              type: string
+              default: csv
+            - in: query
+              name: startDate
+              description: Only export actions on or after this date
+              type: string
+            - in: query
+              name: endDate
+              description: Only export actions on or before this date, the whole day when no time is given
+              type: string
+        responses:
+            200:
+                description: Task history export
+            400:
+                description: Invalid request
+            404:
+                description: Project not found
+            500:
+                description: Internal Server Error
+        """
+        try:
+            export_format = request.args.get("format", "csv").lower()
+            start_date = StatsService.parse_history_date(request.args.get("startDate"))
+            end_date = StatsService.parse_history_date(request.args.get("endDate"))
+        except ValueError as e:
+            return {"Error": f"Invalid date: {str(e)}"}, 400
+
+        try:
+            chunks = StatsService.export_task_history(
+                project_id, export_format, start_date, end_date
+            )
+            mimetype = "text/csv" if export_format == "csv" else "application/x-ndjson"
+            return Response(
+                stream_with_context(chunks),
+                mimetype=mimetype,
+                headers={
+                    "Content-Disposition": "attachment; "
+                    + f"filename=HOT-project-{project_id}-history.{export_format}"
+                },
+            )
+        except ValueError as e:
+            return {"Error": str(e)}, 400
+        except NotFound:
+            return {"Error": "Project not found"}, 404
+        except Exception as e:
+            error_msg = f"Project history export - unhandled error: {str(e)}"
+            current_app.logger.critical(error_msg)
+            return {"Error": "Unable to export project history"}, 500
@@ -22,11 +22,11 @@ from server.services.project_service import (
 )
 from server.services.users.user_service import UserService
 from server.services.users.authentication_service import token_auth, tm, verify_token
+from server.models.postgis.utils import InvalidGeoJson, InvalidData
+from server.services.grid.grid_service import GridServiceError
 from server.services.project_admin_service import (
     ProjectAdminService,
     ProjectAdminServiceError,
-    InvalidGeoJson,
-    InvalidData,
 )
 
 
@@ -165,6 +165,13 @@ class ProjectsRestAPI(Resource):
                                         items:
                                             schema:
                                                 $ref: "#/definitions/GeoJsonFeature"
+                        zoom:
+                            type: integer
+                            description: Zoom level of the task grid generated when no tasks are sent
+                            default: 9
+                        clipToAoi:
+                            type: boolean
+                            default: false
                         arbitraryTasks:
                             type: boolean
                             default: false
@@ -191,8 +198,10 @@ class ProjectsRestAPI(Resource):
                 draft_project_dto
             )
             return {"projectId": draft_project_id}, 201
-        except (InvalidGeoJson, InvalidData):
-            return {"Error": "Invalid GeoJson"}, 400
+        except (InvalidGeoJson, InvalidData) as e:
+            return {"Error": f"Invalid GeoJson: {str(e)}"}, 400
+        except GridServiceError as e:
+            return {"Error": str(e)}, 400
         except Exception as e:
             error_msg = f"Project PUT - unhandled error: {str(e)}"
             current_app.logger.critical(error_msg)
@@ -637,10 +646,10 @@ class ProjectsAllAPI(ProjectSearchBase):
 
         try:
             search_dto = self.setup_search_dto()
-            results_dto = ProjectSearchService.search_projects(search_dto)
-            return results_dto.to_primitive(), 200
+            results = ProjectSearchService.search_projects(search_dto)
+            return results, 200
         except NotFound:
-            return {"mapResults": {}, "results": []}, 200
+            return {"results": []}, 200
         except Exception as e:
             error_msg = f"Project GET - unhandled error: {str(e)}"
             current_app.logger.critical(error_msg)
@@ -687,6 +696,12 @@ class ProjectsQueriesBboxAPI(Resource):
               type: boolean
               required: true
               default: false
+            - in: query
+              name: geometry
+              description: AOI output, full, simplified to the bbox scale or centroid only
+              type: string
+              default: full
+              enum: [full, simplified, centroid]
 
         responses:
             200:
@@ -710,6 +725,7 @@ class ProjectsQueriesBboxAPI(Resource):
             )
             if createdByMe:
                 search_dto.project_author = tm.authenticated_user_id
+            search_dto.geometry_mode = request.args.get("geometry", "full")
             search_dto.validate()
         except Exception as e:
             current_app.logger.error(f"Error validating request: {str(e)}")
@@ -727,6 +743,147 @@ class ProjectsQueriesBboxAPI(Resource):
             return {"Error": "Unable to fetch projects"}, 500
 
 
+class ProjectsQueriesMapClustersAPI(ProjectSearchBase):
+    def get(self):
+        """
+        Get clustered counts of the projects matching the search criteria for a map
+        ---
+        tags:
+            - projects
+        produces:
+            - application/json
+        parameters:
+            - in: header
+              name: Authorization
+              description: Base64 encoded session token
+              type: string
+              default: Token sessionTokenHere==
+            - in: header
+              name: Accept-Language
+              description: Language user is requesting
+              type: string
+              required: true
+              default: en
+            - in: query
+              name: zoom
+              description: Zoom level of the map, determines the size of the clusters
+              type: integer
+              required: true
+              default: 0
+            - in: query
+              name: bbox
+              description: comma separated list xmin, ymin, xmax, ymax in EPSG:4326
+              type: string
+              default: -180,-90,180,90
+            - in: query
+              name: mapperLevel
+              type: string
+            - in: query
+              name: mappingTypes
+              type: string
+            - in: query
+              name: organisationName
+              description: Organisation name to search for
+              type: string
+            - in: query
+              name: campaign
+              description: Campaign name to search for
+              type: string
+            - in: query
+              name: textSearch
+              description: Text to search
+              type: string
+            - in: query
+              name: country
+              description: Project country
+              type: string
+            - in: query
+              name: projectStatuses
+              description: Authenticated PMs can search for archived or draft statuses
+              type: string
+        responses:
+            200:
+                description: GeoJSON points with the number of projects in each cluster
+            400:
+                description: Client Error - Invalid Request
+            500:
+                description: Internal Server Error
+        """
+        try:
+            zoom = int(request.args.get("zoom"))
+            bbox = list(
+                map(float, request.args.get("bbox", "-180,-90,180,90").split(","))
+            )
+            search_dto = self.setup_search_dto()
+        except (DataError, TypeError, ValueError) as e:
+            current_app.logger.error(f"Error validating request: {str(e)}")
+            return {"Error": "Unable to fetch project clusters"}, 400
+
+        try:
+            clusters = ProjectSearchService.get_map_clusters(search_dto, zoom, bbox)
+            return clusters, 200
+        except ProjectSearchServiceError as e:
+            return {"Error": str(e)}, 400
+        except Exception as e:
+            error_msg = f"Project Clusters GET - unhandled error: {str(e)}"
+            current_app.logger.critical(error_msg)
+            return {"Error": "Unable to fetch project clusters"}, 500
+
+
+class ProjectsQueriesAutocompleteAPI(Resource):
+    def get(self):
+        """
+        Suggest projects by name or id while the user types a search
+        ---
+        tags:
+            - projects
+        produces:
+            - application/json
+        parameters:
+            - in: header
+              name: Accept-Language
+              description: Language user is requesting
+              type: string
+              required: true
+              default: en
+            - in: query
+              name: q
+              description: Text typed so far, a project name fragment or id prefix
+              type: string
+              required: true
+            - in: query
+              name: limit
+              description: Number of suggestions, up to 20
+              type: integer
+              default: 10
+        responses:
+            200:
+                description: Suggested projects
+            400:
+                description: Client Error - Invalid Request
+            500:
+                description: Internal Server Error
+        """
+        try:
+            limit = int(request.args.get("limit", 10))
+        except ValueError:
+            return {"Error": "Limit must be a number"}, 400
+
+        try:
+            suggestions = ProjectSearchService.autocomplete(
+                request.args.get("q"),
+                request.environ.get("HTTP_ACCEPT_LANGUAGE", "en"),
+                limit,
+            )
+            return suggestions, 200
+        except ProjectSearchServiceError as e:
+            return {"Error": str(e)}, 400
+        except Exception as e:
+            error_msg = f"Project Autocomplete GET - unhandled error: {str(e)}"
+            current_app.logger.critical(error_msg)
+            return {"Error": "Unable to fetch suggestions"}, 500
+
+
 class ProjectsQueriesOwnerAPI(ProjectSearchBase):
     @tm.pm_only()
     @token_auth.login_required
@@ -1,6 +1,7 @@
 from flask_restful import Resource, current_app
 from server.services.stats_service import NotFound, StatsService
 from server.services.project_service import ProjectService
+from server.api.leaderboards import LeaderboardAPI
 
 
 class ProjectsStatisticsQueriesPopularAPI(Resource):
@@ -108,3 +109,47 @@ class ProjectsStatisticsQueriesUsernameAPI(Resource):
             error_msg = f"User GET - unhandled error: {str(e)}"
             current_app.logger.critical(error_msg)
             return {"Error": "Unable to fetch user statistics for project"}, 500
+
+
+class ProjectsStatisticsLeaderboardAPI(LeaderboardAPI):
+    scope = "project"
+
+    def get(self, project_id):
+        """
+        Get the top contributors of a project
+        ---
+        tags:
+          - projects
+        produces:
+          - application/json
+        parameters:
+            - name: project_id
+              in: path
+              description: Unique project ID
+              required: true
+              type: integer
+              default: 1
+            - in: query
+              name: metric
+              description: One of mapped, validated, mapped_area, validated_area
+              type: string
+              default: mapped
+            - in: query
+              name: period
+              description: One of day, week, month, year, all
+              type: string
+              default: month
+            - in: query
+              name: limit
+              description: Number of users returned, up to 100
+              type: integer
+              default: 10
+        responses:
+            200:
+                description: Leaderboard
+            400:
+                description: Invalid request
+            500:
+                description: Internal Server Error
+        """
+        return self.get_leaderboard(project_id)
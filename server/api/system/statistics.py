@@ -1,5 +1,8 @@
 from flask_restful import Resource, current_app
+from server.services.messaging.email_queue_service import EmailQueueService
 from server.services.stats_service import StatsService
+from server.services.users.authentication_service import token_auth, tm
+from server.services.users.user_service import UserService
 
 
 class SystemStatisticsAPI(Resource):
@@ -24,3 +27,43 @@ class SystemStatisticsAPI(Resource):
             error_msg = f"Unhandled error: {str(e)}"
             current_app.logger.critical(error_msg)
             return {"Error": "Unable to fetch summary statistics"}, 500
+
+
+class SystemEmailQueueStatisticsAPI(Resource):
+    @tm.pm_only(False)
+    @token_auth.login_required
+    def get(self):
+        """
+        Get the depth of the outbound email queue
+        ---
+        tags:
+          - system
+        produces:
+          - application/json
+        parameters:
+          - in: header
+            name: Authorization
+            description: Base64 encoded session token
+            required: true
+            type: string
+            default: Token sessionTokenHere==
+        responses:
+            200:
+                description: Pending, due and failed email counts
+            401:
+                description: Unauthorized - Invalid credentials
+            403:
+                description: Forbidden - Only admins can see the email queue
+            500:
+                description: Internal Server Error
+        """
+        try:
+            if not UserService.is_user_an_admin(tm.authenticated_user_id):
+                return {"Error": "Only admins can see the email queue"}, 403
+
+            stats = EmailQueueService.get_queue_stats()
+            return stats.to_primitive(), 200
+        except Exception as e:
+            error_msg = f"Email queue GET - unhandled error: {str(e)}"
+            current_app.logger.critical(error_msg)
+            return {"Error": "Unable to fetch email queue statistics"}, 500
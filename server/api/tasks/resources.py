@@ -1,18 +1,18 @@
 import io
 from distutils.util import strtobool
 
-from flask import send_file, Response
+from flask import send_file, Response, stream_with_context
 from flask_restful import Resource, current_app, request
 from schematics.exceptions import DataError
 
 from server.services.mapping_service import MappingService, NotFound
-from server.models.dtos.grid_dto import GridDTO
+from server.models.dtos.grid_dto import GridDTO, TaskGridDTO
 
 from server.services.users.authentication_service import token_auth, tm, verify_token
 from server.services.validator_service import ValidatorService
 
 from server.services.project_service import ProjectService, ProjectServiceError
-from server.services.grid.grid_service import GridService
+from server.services.grid.grid_service import GridService, GridServiceError
 from server.models.postgis.utils import InvalidGeoJson
 
 
@@ -189,17 +189,18 @@ class TasksQueriesXmlAPI(Resource):
                 else False
             )
 
-            xml = MappingService.generate_osm_xml(project_id, tasks)
-
+            xml_chunks = MappingService.generate_osm_xml(project_id, tasks)
+            headers = {}
             if as_file:
-                return send_file(
-                    io.BytesIO(xml),
-                    mimetype="text.xml",
-                    as_attachment=True,
-                    attachment_filename=f"HOT-project-{project_id}.osm",
-                )
-
-            return Response(xml, mimetype="text/xml", status=200)
+                headers[
+                    "Content-Disposition"
+                ] = f"attachment; filename=HOT-project-{project_id}.osm"
+            return Response(
+                stream_with_context(xml_chunks),
+                mimetype="text/xml",
+                status=200,
+                headers=headers,
+            )
         except NotFound:
             return (
                 {"Error": "Not found; please check the project and task numbers."},
@@ -256,17 +257,18 @@ class TasksQueriesGpxAPI(Resource):
                 else False
             )
 
-            xml = MappingService.generate_gpx(project_id, tasks)
-
+            xml_chunks = MappingService.generate_gpx(project_id, tasks)
+            headers = {}
             if as_file:
-                return send_file(
-                    io.BytesIO(xml),
-                    mimetype="text.xml",
-                    as_attachment=True,
-                    attachment_filename=f"HOT-project-{project_id}.gpx",
-                )
-
-            return Response(xml, mimetype="text/xml", status=200)
+                headers[
+                    "Content-Disposition"
+                ] = f"attachment; filename=HOT-project-{project_id}.gpx"
+            return Response(
+                stream_with_context(xml_chunks),
+                mimetype="text/xml",
+                status=200,
+                headers=headers,
+            )
         except NotFound:
             return (
                 {"Error": "Not found; please check the project and task numbers."},
@@ -353,6 +355,77 @@ class TasksQueriesAoiAPI(Resource):
             return {"Error": "Unable to fetch tiles intersecting AOI"}, 500
 
 
+class TasksQueriesGridAPI(Resource):
+    @tm.pm_only()
+    @token_auth.login_required
+    def post(self):
+        """
+        Generates the task grid of an aoi at the requested zoom level
+        ---
+        tags:
+            - tasks
+        produces:
+            - application/json
+        parameters:
+            - in: header
+              name: Authorization
+              description: Base64 encoded session token
+              required: true
+              type: string
+              default: Token sessionTokenHere==
+            - in: body
+              name: body
+              required: true
+              description: JSON object with the aoi, the zoom level of the tasks and whether to clip them to the aoi
+              schema:
+                  properties:
+                      zoom:
+                        type: integer
+                        default: 18
+                      clipToAoi:
+                        type: boolean
+                        default: false
+                      areaOfInterest:
+                          schema:
+                              properties:
+                                  type:
+                                      type: string
+                                      default: FeatureCollection
+                                  features:
+                                      type: array
+                                      items:
+                                          schema:
+                                              $ref: "#/definitions/GeoJsonFeature"
+        responses:
+            200:
+                description: Task grid generated successfully
+            400:
+                description: Client Error - Invalid Request
+            500:
+                description: Internal Server Error
+        """
+        try:
+            grid_dto = TaskGridDTO(request.get_json())
+            grid_dto.validate()
+        except DataError as e:
+            current_app.logger.error(f"error validating request: {str(e)}")
+            return {"Error": "Unable to generate task grid"}, 400
+
+        try:
+            chunks = GridService.generate_grid(
+                grid_dto.area_of_interest, grid_dto.zoom, grid_dto.clip_to_aoi
+            )
+            return Response(
+                stream_with_context(chunks), mimetype="application/json", status=200
+            )
+        except (InvalidGeoJson, GridServiceError) as e:
+            return {"Error": f"{str(e)}"}, 400
+        except Exception as e:
+            error_msg = f"TasksQueriesGridAPI - unhandled error: {str(e)}"
+            current_app.logger.critical(error_msg)
+            return {"Error": "Unable to generate task grid"}, 500
+
+
 class TasksQueriesOwnLockedAPI(Resource):
     @token_auth.login_required
     def get(self):
@@ -69,6 +69,32 @@ class EnvironmentConfig:
         "smtp_password": os.getenv("TM_SMTP_PASSWORD", None),
     }
 
+    # Delivery of queued emails by the mail worker, see manage.py mail-worker
+    MAIL_WORKER_BATCH_SIZE = int(os.getenv("TM_MAIL_WORKER_BATCH_SIZE", 100))
+    MAIL_WORKER_CONCURRENCY = int(os.getenv("TM_MAIL_WORKER_CONCURRENCY", 4))
+    MAIL_WORKER_MAX_ATTEMPTS = int(os.getenv("TM_MAIL_WORKER_MAX_ATTEMPTS", 10))
+    # Emails sent per second across all connections, 0 for no limit. 14 is the default SES limit
+    MAIL_WORKER_RATE_LIMIT = float(os.getenv("TM_MAIL_WORKER_RATE_LIMIT", 14))
+
+    # Days messages of each type are kept before manage.py purge_messages deletes them, as a
+    # comma separated list of MessageType:days. Types not listed are kept forever
+    MESSAGE_RETENTION_DAYS = os.getenv(
+        "TM_MESSAGE_RETENTION_DAYS", "PROJECT_ACTIVITY_NOTIFICATION:90"
+    )
+
+    # Cache shared by all workers. If no Redis url is set each worker uses its own memory cache
+    CACHE_SETTINGS = {
+        "redis_url": os.getenv("TM_CACHE_REDIS_URL", None),
+        "key_prefix": os.getenv("TM_CACHE_KEY_PREFIX", "tm:"),
+        "default_ttl": int(os.getenv("TM_CACHE_DEFAULT_TTL", 600)),
+    }
+
+    # Countries of projects are looked up in the bundled world boundaries, Nominatim is only asked
+    # about areas they don't cover. Set to false for deployments without internet access
+    COUNTRY_LOOKUP_NOMINATIM_FALLBACK = (
+        os.getenv("TM_COUNTRY_LOOKUP_NOMINATIM_FALLBACK", "true").lower() == "true"
+    )
+
     # Languages offered by the Tasking Manager
     # Please note that there must be exactly the same number of Codes as languages.
     SUPPORTED_LANGUAGES = {
@@ -10,6 +10,14 @@ class GridDTO(Model):
     clip_to_aoi = BooleanType(required=True, serialized_name="clipToAoi")
 
 
+class TaskGridDTO(Model):
+    """ Describes JSON model used for generating task grids on the server """
+
+    area_of_interest = BaseType(required=True, serialized_name="areaOfInterest")
+    zoom = IntType(required=True, min_value=1, max_value=22)
+    clip_to_aoi = BooleanType(default=False, serialized_name="clipToAoi")
+
+
 class SplitTaskDTO(Model):
     """ DTO used to split a task """
 
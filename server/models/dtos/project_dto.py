@@ -106,6 +106,9 @@ class DraftProjectDTO(Model):
     project_name = StringType(required=True, serialized_name="projectName")
     area_of_interest = BaseType(required=True, serialized_name="areaOfInterest")
     tasks = BaseType(required=False)
+    # Without tasks, the task grid is generated on the server at this zoom level
+    zoom = IntType(min_value=1, max_value=22)
+    clip_to_aoi = BooleanType(default=False, serialized_name="clipToAoi")
     has_arbitrary_tasks = BooleanType(required=True, serialized_name="arbitraryTasks")
     user_id = IntType(required=True)
 
@@ -283,48 +286,47 @@ class ProjectSearchDTO(Model):
     mapped_by = IntType(required=False)
     favorited_by = IntType(required=False)
 
+    def get_cache_key(self, with_page: bool = True) -> tuple:
+        """
+        Canonical form of the search criteria, so that equivalent searches share cached results
+        Only criteria affecting the results are part of the key
+        :param with_page: Set to False when the results don't depend on the page, eg for maps
+        """
+
+        def normalise_list(values):
+            return tuple(sorted({str(value).upper() for value in values or []}))
+
+        def normalise_text(value):
+            return " ".join(value.lower().split()) if value else None
+
+        mapper_level = self.mapper_level.upper() if self.mapper_level else None
+        if mapper_level == "ALL":
+            mapper_level = None
+
+        return (
+            self.preferred_locale,
+            mapper_level,
+            normalise_list(self.mapping_types),
+            normalise_list(self.project_statuses),
+            self.organisation_name,
+            self.organisation_id,
+            self.team_id,
+            self.campaign,
+            self.order_by or "priority",
+            (self.order_by_type or "ASC").upper(),
+            normalise_text(self.country),
+            self.page if with_page else None,
+            normalise_text(self.text_search),
+            bool(self.is_project_manager),
+            tuple(sorted(set(self.interests or []))),
+            self.created_by,
+            self.mapped_by,
+            self.favorited_by,
+        )
+
     def __hash__(self):
         """ Make object hashable so we can cache user searches"""
-        hashable_mapping_types = ""
-        if self.mapping_types:
-            for mapping_type in self.mapping_types:
-                hashable_mapping_types += mapping_type
-        hashable_project_statuses = ""
-        if self.project_statuses:
-            for project_status in self.project_statuses:
-                hashable_project_statuses += project_status
-        hashable_teams = ""
-        if self.teams:
-            for team in self.teams:
-                hashable_teams += team
-        hashable_mapping_editors = ""
-        if self.mapping_editors:
-            for mapping_editor in self.mapping_editors:
-                hashable_mapping_editors = hashable_mapping_editors + mapping_editor
-        hashable_validation_editors = ""
-        if self.validation_editors:
-            for validation_editor in self.validation_editors:
-                hashable_validation_editors = (
-                    hashable_validation_editors + validation_editor
-                )
-
-        return hash(
-            (
-                self.preferred_locale,
-                self.mapper_level,
-                hashable_mapping_types,
-                hashable_project_statuses,
-                hashable_teams,
-                self.organisation_name,
-                self.campaign,
-                self.page,
-                self.text_search,
-                self.is_project_manager,
-                hashable_mapping_editors,
-                hashable_validation_editors,
-                self.created_by,
-            )
-        )
+        return hash(self.get_cache_key())
 
 
 class ProjectSearchBBoxDTO(Model):
@@ -332,6 +334,11 @@ class ProjectSearchBBoxDTO(Model):
     input_srid = IntType(required=True, choices=[4326])
     preferred_locale = StringType(required=True, default="en")
     project_author = IntType(required=False, serialized_name="projectAuthor")
+    geometry_mode = StringType(
+        default="full",
+        choices=("full", "simplified", "centroid"),
+        serialized_name="geometryMode",
+    )
 
 
 class ListSearchResultDTO(Model):
@@ -363,13 +370,29 @@ class ProjectSearchResultsDTO(Model):
         """ DTO constructor initialise all arrays to empty"""
         super().__init__()
         self.results = []
-        self.map_results = []
 
-    map_results = BaseType(serialized_name="mapResults")
     results = ListType(ModelType(ListSearchResultDTO))
     pagination = ModelType(Pagination)
 
 
+class ProjectSuggestionDTO(Model):
+    """ Describes one project suggested while typing a search """
+
+    project_id = IntType(required=True, serialized_name="projectId")
+    name = StringType()
+
+
+class ProjectAutocompleteDTO(Model):
+    """ Contains the projects suggested for the typed text """
+
+    def __init__(self):
+        """ DTO constructor initialise all arrays to empty"""
+        super().__init__()
+        self.results = []
+
+    results = ListType(ModelType(ProjectSuggestionDTO))
+
+
 class LockedTasksForUser(Model):
     """ Describes all tasks locked by an individual user"""
 
@@ -1,5 +1,5 @@
 from schematics import Model
-from schematics.types import StringType, IntType, FloatType, BooleanType
+from schematics.types import StringType, IntType, FloatType, BooleanType, DateTimeType
 from schematics.types.compound import ListType, ModelType
 from server.models.dtos.mapping_dto import TaskHistoryDTO, TaskStatusDTO
 
@@ -29,9 +29,11 @@ class ProjectContributionsDTO(Model):
 class Pagination(Model):
     """ Properties for paginating results """
 
-    def __init__(self, paginated_result):
+    def __init__(self, paginated_result=None):
         """ Instantiate from a Flask-SQLAlchemy paginated result"""
         super().__init__()
+        if paginated_result is None:
+            return  # Keyset paginated results fill in has_next and next_cursor
 
         self.has_next = paginated_result.has_next
         self.has_prev = paginated_result.has_prev
@@ -50,6 +52,7 @@ class Pagination(Model):
     prev_num = IntType(serialized_name="prevNum")
     per_page = IntType(serialized_name="perPage")
     total = IntType()
+    next_cursor = StringType(serialized_name="nextCursor", serialize_when_none=False)
 
 
 class ProjectActivityDTO(Model):
@@ -93,6 +96,28 @@ class CampaignStatsDTO(Model):
     projects_created = IntType(serialized_name="projectsCreated")
 
 
+class CountryStatsDTO(Model):
+    """ DTO for the totals of the projects covering a country """
+
+    country_name = StringType(serialized_name="countryName")
+    country_code = StringType(serialized_name="countryCode")
+    total_projects = IntType(serialized_name="totalProjects")
+    published_projects = IntType(serialized_name="publishedProjects")
+    total_tasks = IntType(serialized_name="totalTasks")
+    tasks_mapped = IntType(serialized_name="tasksMapped")
+    tasks_validated = IntType(serialized_name="tasksValidated")
+
+
+class CountriesStatsDTO(Model):
+    """ DTO for the statistics of all countries """
+
+    def __init__(self):
+        super().__init__()
+        self.countries = []
+
+    countries = ListType(ModelType(CountryStatsDTO))
+
+
 class HomePageStatsDTO(Model):
     """ DTO for stats we want to display on the homepage """
 
@@ -116,3 +141,35 @@ class HomePageStatsDTO(Model):
     # avg_completion_time = IntType(serialized_name='averageCompletionTime')
     organisations = ListType(ModelType(OrganizationStatsDTO))
     campaigns = ListType(ModelType(CampaignStatsDTO))
+
+
+class LeaderboardEntryDTO(Model):
+    """ A user ranked on a leaderboard """
+
+    rank = IntType()
+    username = StringType()
+    picture_url = StringType(serialized_name="pictureUrl")
+    value = FloatType()
+
+
+class LeaderboardDTO(Model):
+    """ Top contributors of a project, organisation or campaign """
+
+    def __init__(self):
+        super().__init__()
+        self.entries = []
+
+    scope = StringType()
+    scope_id = IntType(serialized_name="scopeId")
+    metric = StringType()
+    period = StringType()
+    entries = ListType(ModelType(LeaderboardEntryDTO))
+
+
+class EmailQueueStatsDTO(Model):
+    """ Depth of the outbound email queue """
+
+    pending = IntType()
+    due = IntType()
+    failed = IntType()
+    oldest_pending_date = DateTimeType(serialized_name="oldestPendingDate")
@@ -0,0 +1,74 @@
+import datetime
+from sqlalchemy import text
+from server import db
+from server.models.postgis.statuses import TaskStatus
+from server.models.postgis.utils import timestamp
+
+
+class ContributionStats(db.Model):
+    """
+    Daily totals of the tasks a user mapped and validated on a project. Maintained incrementally
+    on every task state change so leaderboards can be read without scanning task_history
+    """
+
+    __tablename__ = "contribution_stats"
+
+    project_id = db.Column(db.Integer, db.ForeignKey("projects.id"), primary_key=True)
+    user_id = db.Column(db.BigInteger, db.ForeignKey("users.id"), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    tasks_mapped = db.Column(db.Integer, default=0, nullable=False)
+    tasks_validated = db.Column(db.Integer, default=0, nullable=False)
+    area_mapped = db.Column(db.Float, default=0, nullable=False)  # In km2
+    area_validated = db.Column(db.Float, default=0, nullable=False)  # In km2
+
+    __table_args__ = (
+        db.Index("idx_contribution_stats_project_day", "project_id", "day"),
+        db.Index("idx_contribution_stats_user_day", "user_id", "day"),
+        {},
+    )
+
+    @staticmethod
+    def record_task_state_change(
+        project_id: int,
+        task_id: int,
+        user_id: int,
+        state: TaskStatus,
+        count: int = 1,
+        day: datetime.date = None,
+    ):
+        """
+        Adds a mapped or validated task to the user totals of the day, use a negative count to revert it
+        Transaction will be saved when task is saved
+        :param day: Day the totals are recorded on, today by default. Reverts use the original day
+        """
+        if state not in [TaskStatus.MAPPED, TaskStatus.VALIDATED]:
+            return  # Only mapped and validated tasks are ranked
+
+        mapped = count if state == TaskStatus.MAPPED else 0
+        validated = count if state == TaskStatus.VALIDATED else 0
+
+        upsert_sql = """INSERT INTO contribution_stats
+                               (project_id, user_id, day, tasks_mapped, tasks_validated,
+                                area_mapped, area_validated)
+                        SELECT t.project_id, :user_id, :day, :mapped, :validated,
+                               ST_Area(t.geometry, true) / 1000000 * :mapped,
+                               ST_Area(t.geometry, true) / 1000000 * :validated
+                          FROM tasks t
+                         WHERE t.id = :task_id AND t.project_id = :project_id
+                        ON CONFLICT (project_id, user_id, day) DO UPDATE
+                           SET tasks_mapped = contribution_stats.tasks_mapped + EXCLUDED.tasks_mapped,
+                               tasks_validated = contribution_stats.tasks_validated + EXCLUDED.tasks_validated,
+                               area_mapped = contribution_stats.area_mapped + EXCLUDED.area_mapped,
+                               area_validated = contribution_stats.area_validated + EXCLUDED.area_validated"""
+
+        db.session.execute(
+            text(upsert_sql),
+            dict(
+                project_id=project_id,
+                task_id=task_id,
+                user_id=user_id,
+                day=day or timestamp().date(),
+                mapped=mapped,
+                validated=validated,
+            ),
+        )
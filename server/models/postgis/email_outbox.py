@@ -0,0 +1,164 @@
+from sqlalchemy import text
+from server import db
+from server.models.dtos.stats_dto import EmailQueueStatsDTO
+from server.models.postgis.statuses import EmailStatus
+from server.models.postgis.utils import timestamp
+
+# Lengthy relay errors are truncated, the start holds the SMTP code and reason
+MAX_ERROR_LENGTH = 1000
+
+# Claims the next due emails. SKIP LOCKED lets several workers claim batches side by side, and
+# pushing next_attempt_at forward hides the claimed emails until the lease runs out, so emails of
+# a worker that dies mid batch are picked up again
+CLAIM_BATCH_SQL = """
+    UPDATE email_outbox o
+       SET attempts = o.attempts + 1, next_attempt_at = :lease_until
+      FROM (SELECT id FROM email_outbox
+             WHERE status = :pending AND next_attempt_at <= :now
+             ORDER BY next_attempt_at
+             LIMIT :batch_size
+               FOR UPDATE SKIP LOCKED) claimed
+     WHERE o.id = claimed.id
+ RETURNING o.id, o.to_address, o.subject, o.html_message, o.text_message, o.attempts"""
+
+# Queues one email per user with an email address, [USERNAME] in the templates is replaced by theirs.
+# In the html part the username is escaped the same way the templates escape their values
+ENQUEUE_FOR_USERS_SQL = """
+    INSERT INTO email_outbox (to_address, subject, html_message, text_message, status, attempts,
+                              next_attempt_at, created_date)
+    SELECT u.email_address, :subject,
+           replace(:html_message, '[USERNAME]',
+                   replace(replace(replace(replace(replace(u.username, '&', '&amp;'),
+                           '<', '&lt;'), '>', '&gt;'), '"', '&#34;'), '''', '&#39;')),
+           replace(:text_message, '[USERNAME]', u.username),
+           :pending, 0, :now, :now
+      FROM users u
+     WHERE u.id = ANY(:user_ids) AND coalesce(u.email_address, '') <> ''"""
+
+QUEUE_STATS_SQL = """
+    SELECT count(*) FILTER (WHERE status = :pending) AS pending,
+           count(*) FILTER (WHERE status = :pending AND next_attempt_at <= :now) AS due,
+           count(*) FILTER (WHERE status = :failed) AS failed,
+           min(created_date) FILTER (WHERE status = :pending) AS oldest_pending_date
+      FROM email_outbox"""
+
+
+class EmailOutbox(db.Model):
+    """
+    Emails waiting to be delivered by the mail worker. Requests only queue emails, so a slow SMTP
+    relay never holds them up, and emails survive restarts until they are sent
+    """
+
+    __tablename__ = "email_outbox"
+
+    id = db.Column(db.BigInteger, primary_key=True)
+    to_address = db.Column(db.String, nullable=False)
+    subject = db.Column(db.String, nullable=False)
+    html_message = db.Column(db.String)
+    text_message = db.Column(db.String)
+    status = db.Column(db.Integer, default=EmailStatus.PENDING.value, nullable=False)
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    next_attempt_at = db.Column(db.DateTime, default=timestamp, nullable=False)
+    last_error = db.Column(db.String)
+    created_date = db.Column(db.DateTime, default=timestamp, nullable=False)
+
+    __table_args__ = (
+        db.Index(
+            "idx_email_outbox_pending",
+            "next_attempt_at",
+            postgresql_where=text(f"status = {EmailStatus.PENDING.value}"),
+        ),
+        {},
+    )
+
+    def create(self):
+        """ Queues the email """
+        db.session.add(self)
+        db.session.commit()
+
+    @staticmethod
+    def enqueue_for_users(
+        user_ids: list, subject: str, html_message: str, text_message: str
+    ) -> int:
+        """
+        Queues the same email to many users in a single statement
+        Transaction will be saved by the caller
+        :returns: Number of emails queued, users without an email address are skipped
+        """
+        if not user_ids:
+            return 0
+
+        now = timestamp()
+        result = db.session.execute(
+            text(ENQUEUE_FOR_USERS_SQL),
+            dict(
+                user_ids=user_ids,
+                subject=subject,
+                html_message=html_message,
+                text_message=text_message,
+                pending=EmailStatus.PENDING.value,
+                now=now,
+            ),
+        )
+        return result.rowcount
+
+    @staticmethod
+    def claim_batch(batch_size: int, lease_until) -> list:
+        """
+        Claims the next emails that are due, oldest first
+        Transaction must be committed by the caller for the claim to be visible to other workers
+        """
+        return db.session.execute(
+            text(CLAIM_BATCH_SQL),
+            dict(
+                pending=EmailStatus.PENDING.value,
+                now=timestamp(),
+                lease_until=lease_until,
+                batch_size=batch_size,
+            ),
+        ).fetchall()
+
+    @staticmethod
+    def remove_sent(email_ids: list):
+        """ Removes delivered emails from the queue, transaction will be saved by the caller """
+        if not email_ids:
+            return
+
+        EmailOutbox.query.filter(EmailOutbox.id.in_(email_ids)).delete(
+            synchronize_session=False
+        )
+
+    @staticmethod
+    def record_failure(email_id: int, error: str, retry_at=None):
+        """
+        Records a failed delivery, the email is retried at retry_at or given up on when it's None
+        Transaction will be saved by the caller
+        """
+        values = {EmailOutbox.last_error: error[:MAX_ERROR_LENGTH]}
+        if retry_at is None:
+            values[EmailOutbox.status] = EmailStatus.FAILED.value
+        else:
+            values[EmailOutbox.next_attempt_at] = retry_at
+
+        EmailOutbox.query.filter(EmailOutbox.id == email_id).update(
+            values, synchronize_session=False
+        )
+
+    @staticmethod
+    def get_queue_stats() -> EmailQueueStatsDTO:
+        """ Gets the depth of the queue """
+        row = db.session.execute(
+            text(QUEUE_STATS_SQL),
+            dict(
+                pending=EmailStatus.PENDING.value,
+                failed=EmailStatus.FAILED.value,
+                now=timestamp(),
+            ),
+        ).fetchone()
+
+        stats_dto = EmailQueueStatsDTO()
+        stats_dto.pending = row.pending
+        stats_dto.due = row.due
+        stats_dto.failed = row.failed
+        stats_dto.oldest_pending_date = row.oldest_pending_date
+        return stats_dto
@@ -11,6 +11,139 @@ from server.models.postgis.project import Project
 from server.models.postgis.utils import timestamp
 from server.models.postgis.utils import NotFound
 
+# Users who mapped or validated a task of the project
+CONTRIBUTORS_SQL = """
+    SELECT mapped_by as contributors from tasks
+     where project_id = :project_id and mapped_by is not null
+     UNION
+    SELECT validated_by from tasks
+     where tasks.project_id = :project_id and validated_by is not null"""
+
+# Users mentioned in a comment on a task, along with the other users who changed its state
+TASK_COMMENT_RECIPIENTS_SQL = """
+    SELECT u.id, u.username = ANY(:usernames) AS mentioned
+      FROM users u
+     WHERE u.username = ANY(:usernames)
+        OR u.id IN (SELECT th.user_id FROM task_history th
+                     WHERE th.project_id = :project_id AND th.task_id = :task_id
+                       AND th.action = 'STATE_CHANGE' AND th.user_id <> :from_user_id)"""
+
+# Projects each user mapped, validated or favorited that had activity since the given date, with
+# the most recent contributors of each project. Users who turned off project notifications are left out
+ACTIVITY_DIGEST_SQL = """
+    WITH interested AS (
+        SELECT u.id AS user_id, unnest(u.projects_mapped) AS project_id
+          FROM users u
+         WHERE u.projects_notifications
+        UNION
+        SELECT pf.user_id, pf.project_id
+          FROM project_favorites pf
+          JOIN users u ON u.id = pf.user_id
+         WHERE u.projects_notifications),
+    recent AS (
+        SELECT th.project_id, th.user_id,
+               row_number() OVER (PARTITION BY th.project_id
+                                  ORDER BY max(th.action_date) DESC) AS recency
+          FROM task_history th
+         WHERE th.action_date >= :since AND th.user_id IS NOT NULL
+         GROUP BY th.project_id, th.user_id),
+    contributors AS (
+        SELECT r.project_id,
+               array_agg(u.id ORDER BY r.recency) AS user_ids,
+               array_agg(u.username ORDER BY r.recency) AS usernames
+          FROM recent r
+          JOIN users u ON u.id = r.user_id
+         WHERE r.recency <= :max_contributors
+         GROUP BY r.project_id)
+    SELECT i.user_id, i.project_id, c.user_ids, c.usernames
+      FROM interested i
+      JOIN contributors c ON c.project_id = i.project_id
+     ORDER BY i.user_id, i.project_id"""
+
+BROADCAST_SQL = f"""
+    INSERT INTO messages (message, subject, from_user_id, to_user_id, project_id, message_type,
+                          date, read)
+    SELECT :message, :subject, :from_user_id, c.contributors, :project_id, :message_type,
+           :date, false
+      FROM ({CONTRIBUTORS_SQL}) c
+ RETURNING to_user_id"""
+
+# Deletes a batch of the messages of a type older than the given date. Locked rows are skipped, so
+# the purge never waits for users working on their inbox
+PURGE_BATCH_SQL = """
+    DELETE FROM messages
+     WHERE id IN (SELECT id FROM messages
+                   WHERE message_type = :message_type AND date < :before
+                   LIMIT :batch_size
+                     FOR UPDATE SKIP LOCKED)"""
+
+IS_PARTITIONED_SQL = """
+    SELECT EXISTS (SELECT 1 FROM pg_partitioned_table pt
+                     JOIN pg_class c ON c.oid = pt.partrelid
+                    WHERE c.relname = 'messages' AND c.relnamespace = 'public'::regnamespace)"""
+
+# Turns messages into a table partitioned by month of date. The existing table becomes the
+# partition of all dates before :first_month, and a default partition catches dates without one.
+# Indexes, foreign keys and the unread count triggers move to the partitioned table
+PARTITION_MESSAGES_SQL = [
+    "LOCK TABLE messages IN ACCESS EXCLUSIVE MODE",
+    "UPDATE messages SET date = now() AT TIME ZONE 'utc' WHERE date IS NULL",
+    "ALTER TABLE messages ALTER COLUMN date SET NOT NULL",
+    "ALTER TABLE messages RENAME TO messages_legacy",
+    "DROP TRIGGER tm_messages_unread_insert ON messages_legacy",
+    "DROP TRIGGER tm_messages_unread_update ON messages_legacy",
+    "DROP TRIGGER tm_messages_unread_delete ON messages_legacy",
+    """DO $$
+       DECLARE
+           name text;
+       BEGIN
+           FOR name IN SELECT conname FROM pg_constraint
+                        WHERE conrelid = 'messages_legacy'::regclass AND contype = 'f' LOOP
+               EXECUTE format('ALTER TABLE messages_legacy DROP CONSTRAINT %I', name);
+           END LOOP;
+           FOR name IN SELECT indexname FROM pg_indexes
+                        WHERE schemaname = 'public' AND tablename = 'messages_legacy' LOOP
+               EXECUTE format('ALTER INDEX %I RENAME TO %I', name, left(name, 52) || '_legacy');
+           END LOOP;
+       END $$""",
+    """CREATE TABLE messages (LIKE messages_legacy INCLUDING DEFAULTS)
+       PARTITION BY RANGE (date)""",
+    "ALTER SEQUENCE messages_id_seq OWNED BY messages.id",
+    "ALTER TABLE messages ADD CONSTRAINT messages_pkey PRIMARY KEY (id, date)",
+    """ALTER TABLE messages ATTACH PARTITION messages_legacy
+       FOR VALUES FROM (MINVALUE) TO ('{first_month}')""",
+    "CREATE TABLE messages_default PARTITION OF messages DEFAULT",
+    "CREATE INDEX ix_messages_to_user_id ON messages (to_user_id)",
+    "CREATE INDEX ix_messages_project_id ON messages (project_id)",
+    "CREATE INDEX ix_messages_task_id ON messages (task_id)",
+    "CREATE INDEX ix_messages_message_type ON messages (message_type)",
+    "CREATE INDEX idx_messages_inbox ON messages (to_user_id, date, id)",
+    "CREATE INDEX idx_messages_type_date ON messages (message_type, date)",
+    """ALTER TABLE messages
+         ADD CONSTRAINT messages_from_user_id_fkey FOREIGN KEY (from_user_id) REFERENCES users (id),
+         ADD CONSTRAINT messages_to_user_id_fkey FOREIGN KEY (to_user_id) REFERENCES users (id),
+         ADD CONSTRAINT messages_project_id_fkey FOREIGN KEY (project_id) REFERENCES projects (id),
+         ADD CONSTRAINT messages_tasks FOREIGN KEY (task_id, project_id)
+             REFERENCES tasks (id, project_id)""",
+    """CREATE TRIGGER tm_messages_unread_insert AFTER INSERT ON messages
+       REFERENCING NEW TABLE AS new_messages
+       FOR EACH STATEMENT EXECUTE PROCEDURE tm_update_unread_counts()""",
+    """CREATE TRIGGER tm_messages_unread_update AFTER UPDATE ON messages
+       REFERENCING OLD TABLE AS old_messages NEW TABLE AS new_messages
+       FOR EACH STATEMENT EXECUTE PROCEDURE tm_update_unread_counts()""",
+    """CREATE TRIGGER tm_messages_unread_delete AFTER DELETE ON messages
+       REFERENCING OLD TABLE AS old_messages
+       FOR EACH STATEMENT EXECUTE PROCEDURE tm_update_unread_counts()""",
+]
+
+# Monthly partitions are named messages_y<year>m<month>
+MONTHLY_PARTITIONS_SQL = """
+    SELECT c.relname AS name
+      FROM pg_inherits i
+      JOIN pg_class c ON c.oid = i.inhrelid
+     WHERE i.inhparent = 'messages'::regclass AND c.relname ~ '^messages_y[0-9]{4}m[0-9]{2}$'
+     ORDER BY c.relname"""
+
 
 class MessageType(Enum):
     """ Describes the various kinds of messages a user might receive """
@@ -38,6 +171,8 @@ class Message(db.Model):
         db.ForeignKeyConstraint(
             ["task_id", "project_id"], ["tasks.id", "tasks.project_id"]
         ),
+        db.Index("idx_messages_inbox", "to_user_id", "date", "id"),
+        db.Index("idx_messages_type_date", "message_type", "date"),
     )
 
     id = db.Column(db.Integer, primary_key=True)
@@ -99,6 +234,20 @@ class Message(db.Model):
         current_app.logger.debug("Adding message to session")
         db.session.add(self)
 
+    @staticmethod
+    def add_messages(messages: list):
+        """
+        Inserts many messages with a single statement
+        DO NOT COMMIT HERE AS MESSAGES ARE PART OF LARGER TRANSACTIONS
+        :param messages: dicts of the message columns
+        """
+        if not messages:
+            return
+
+        date = timestamp()
+        rows = [dict(message, date=date, read=False) for message in messages]
+        db.session.execute(Message.__table__.insert().values(rows))
+
     def save(self):
         """ Save """
         db.session.add(self)
@@ -107,13 +256,59 @@ class Message(db.Model):
     @staticmethod
     def get_all_contributors(project_id: int):
         """ Get all contributors to a project """
-        query = """SELECT mapped_by as contributors from tasks where project_id = :project_id and mapped_by is not null
-                   UNION
-                   SELECT validated_by from tasks where tasks.project_id = :project_id and validated_by is not null"""
-
-        contributors = db.engine.execute(text(query), project_id=project_id)
+        contributors = db.engine.execute(text(CONTRIBUTORS_SQL), project_id=project_id)
         return contributors
 
+    @staticmethod
+    def get_task_comment_recipients(
+        project_id: int, task_id: int, from_user_id: int, usernames: list
+    ) -> list:
+        """
+        Resolves the users to notify of a comment on a task in one query, each user once
+        :returns: (user id, mentioned) pairs, mentioned is False for users who worked on the task
+        """
+        result = db.session.execute(
+            text(TASK_COMMENT_RECIPIENTS_SQL),
+            dict(
+                project_id=project_id,
+                task_id=task_id,
+                from_user_id=from_user_id,
+                usernames=usernames,
+            ),
+        )
+        return [(row.id, row.mentioned) for row in result]
+
+    @staticmethod
+    def get_activity_digests(since, max_contributors: int):
+        """
+        Gets the recent activity on the projects of every user in one query, ordered by user
+        :returns: rows of user_id, project_id and the ids and usernames of the latest contributors
+        """
+        return db.session.execute(
+            text(ACTIVITY_DIGEST_SQL),
+            dict(since=since, max_contributors=max_contributors),
+        )
+
+    @staticmethod
+    def broadcast_to_contributors(project_id: int, dto: MessageDTO) -> list:
+        """
+        Inserts a broadcast message for every contributor of the project in one statement
+        Transaction will be saved by the caller
+        :returns: IDs of the users messaged
+        """
+        rows = db.session.execute(
+            text(BROADCAST_SQL),
+            dict(
+                message=dto.message,
+                subject=dto.subject,
+                from_user_id=dto.from_user_id,
+                project_id=project_id,
+                message_type=MessageType.BROADCAST.value,
+                date=timestamp(),
+            ),
+        ).fetchall()
+        return [row.to_user_id for row in rows]
+
     def mark_as_read(self):
         """ Mark the message in scope as Read """
         self.read = True
@@ -148,6 +343,97 @@ class Message(db.Model):
         ).delete(synchronize_session=False)
         db.session.commit()
 
+    @staticmethod
+    def mark_all_messages_read(user_id: int, message_types: list = None) -> int:
+        """
+        Marks the unread messages to the user as read in a single statement
+        :param message_types: Only mark messages of these types, all messages if not supplied
+        :returns: Number of messages marked as read
+        """
+        query = Message.query.filter(
+            Message.to_user_id == user_id, Message.read.isnot(True)
+        )
+        if message_types:
+            query = query.filter(Message.message_type.in_(message_types))
+
+        updated = query.update({Message.read: True}, synchronize_session=False)
+        db.session.commit()
+        return updated
+
+    @staticmethod
+    def delete_all_messages(user_id: int, message_types: list = None) -> int:
+        """
+        Deletes the messages to the user in a single statement
+        :param message_types: Only delete messages of these types, all messages if not supplied
+        :returns: Number of messages deleted
+        """
+        query = Message.query.filter(Message.to_user_id == user_id)
+        if message_types:
+            query = query.filter(Message.message_type.in_(message_types))
+
+        deleted = query.delete(synchronize_session=False)
+        db.session.commit()
+        return deleted
+
+    @staticmethod
+    def purge_batch(message_type: int, before, batch_size: int) -> int:
+        """
+        Deletes up to batch_size messages of the type dated before the given date
+        Transaction will be saved by the caller, committing each batch keeps the locks short
+        :returns: Number of messages deleted
+        """
+        result = db.session.execute(
+            text(PURGE_BATCH_SQL),
+            dict(message_type=message_type, before=before, batch_size=batch_size),
+        )
+        return result.rowcount
+
+    @staticmethod
+    def is_partitioned() -> bool:
+        """ Tells whether messages has been partitioned by month """
+        return db.session.execute(text(IS_PARTITIONED_SQL)).scalar()
+
+    @staticmethod
+    def partition_by_month(first_month):
+        """
+        Partitions messages by month, the existing messages stay in one partition of the dates
+        before first_month. Transaction will be saved by the caller
+        """
+        # Postgres 11 only takes literals as partition bounds, not parameters
+        for statement in PARTITION_MESSAGES_SQL:
+            db.session.execute(
+                text(statement.format(first_month=first_month.isoformat()))
+            )
+
+    @staticmethod
+    def get_monthly_partitions() -> list:
+        """ Gets the names of the monthly partitions, oldest first """
+        rows = db.session.execute(text(MONTHLY_PARTITIONS_SQL))
+        return [row.name for row in rows]
+
+    @staticmethod
+    def create_monthly_partition(name: str, month_start, month_end):
+        """ Creates the partition of a month, transaction will be saved by the caller """
+        db.session.execute(
+            text(
+                f"CREATE TABLE {name} PARTITION OF messages FOR VALUES "
+                f"FROM ('{month_start.isoformat()}') TO ('{month_end.isoformat()}')"
+            )
+        )
+
+    @staticmethod
+    def drop_partition_if_empty(name: str) -> bool:
+        """
+        Drops a monthly partition the purge emptied, which returns its space at once
+        Transaction will be saved by the caller
+        :returns: True if the partition was dropped
+        """
+        if db.session.execute(text(f"SELECT EXISTS (SELECT 1 FROM {name})")).scalar():
+            return False
+
+        db.session.execute(text(f"DROP TABLE {name}"))
+        return True
+
     def delete(self):
         """ Deletes the current model from the DB """
         db.session.delete(self)
@@ -1,5 +1,4 @@
 from server import db
-from flask import current_app
 from server.models.postgis.user import User
 from server.models.postgis.utils import timestamp
 from server.models.dtos.notification_dto import NotificationDTO
@@ -10,10 +9,14 @@ class Notification(db.Model):
 
     __tablename__ = "notifications"
 
-    __table_args__ = (db.ForeignKeyConstraint(["user_id"], ["users.id"]),)
+    # The counters are maintained by triggers on the messages table, see migration 8e3c1d7b4a25
+    __table_args__ = (
+        db.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        db.Index("idx_notifications_user_id", "user_id", unique=True),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.BigInteger, db.ForeignKey("users.id"), index=True)
+    user_id = db.Column(db.BigInteger, db.ForeignKey("users.id"))
     unread_count = db.Column(db.Integer)
     date = db.Column(db.DateTime, default=timestamp)
 
@@ -29,15 +32,12 @@ class Notification(db.Model):
 
         return dto
 
-    def update_notification_count(self):
-        current_app.logger.debug("Updating notification count")
-        db.session.add(self)
-        db.session.commit()
-
     @staticmethod
-    def get_unread_message_count(user_id: int) -> NotificationDTO:
+    def get_unread_message_count(user_id: int) -> int:
         """ Get count of unread messages for user """
-        notifications = Notification.query.filter(
-            Notification.user_id == user_id
-        ).first()
-        return notifications.unread_count
+        unread_count = (
+            db.session.query(Notification.unread_count)
+            .filter(Notification.user_id == user_id)
+            .scalar()
+        )
+        return unread_count or 0
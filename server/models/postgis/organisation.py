@@ -10,6 +10,8 @@ from server.models.postgis.statuses import UserRole
 
 from server.models.postgis.user import User
 from server.models.postgis.campaign import Campaign, campaign_organisations
+from server.models.postgis.project_search_index import ProjectSearchIndex
+from server.services.cache_service import CacheService
 from server.models.postgis.utils import NotFound
 
 
@@ -114,7 +116,13 @@ class Organisation(db.Model):
 
                 self.managers.append(new_manager)
 
+        # Keep the organisation shown on the project search results in sync
+        ProjectSearchIndex.query.filter_by(organisation_id=self.id).update(
+            dict(organisation_name=self.name, organisation_logo=self.logo),
+            synchronize_session=False,
+        )
         db.session.commit()
+        CacheService.bump_search_version()
 
     def delete(self):
         """ Deletes the current model from the DB """
@@ -1,5 +1,7 @@
 import json
 import re
+import threading
+from time import monotonic, sleep
 from typing import Optional
 from cachetools import TTLCache, cached
 
@@ -8,14 +10,12 @@ from flask import current_app
 from geoalchemy2 import Geometry
 import sqlalchemy
 from sqlalchemy.sql.expression import cast
-from sqlalchemy import text, desc, func
+from sqlalchemy import text, desc
 from shapely.geometry import shape
 from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import joinedload, selectinload
 from sqlalchemy.orm.session import make_transient
 from geoalchemy2.shape import to_shape
-from shapely.ops import transform
-from functools import partial
-import pyproj
 import requests
 
 from server import db
@@ -35,6 +35,8 @@ from server.models.postgis.custom_editors import CustomEditor
 from server.models.postgis.priority_area import PriorityArea, project_priority_areas
 from server.models.postgis.project_info import ProjectInfo
 from server.models.postgis.project_chat import ProjectChat
+from server.models.postgis.project_country import ProjectCountry
+from server.models.postgis.project_search_index import ProjectSearchIndex
 from server.models.postgis.statuses import (
     ProjectStatus,
     ProjectPriority,
@@ -59,6 +61,9 @@ from server.models.postgis.utils import (
     ST_X,
     ST_Y,
 )
+from server.services.cache_service import CacheService
+from server.services.country_lookup_service import CountryLookupService
+from server.services.geometry_service import GeometryService
 from server.services.grid.grid_service import GridService
 from server.models.postgis.interests import Interest, projects_interests
 
@@ -80,6 +85,22 @@ project_allowed_users = db.Table(
 )
 
 
+# Everything the project DTO needs from PostGIS, fetched in a single round trip
+DTO_GEOMETRIES_SQL = """
+    SELECT ST_AsGeoJSON(p.geometry) AS aoi,
+           ARRAY(SELECT ST_AsGeoJSON(pa.geometry)
+                   FROM project_priority_areas ppa
+                   JOIN priority_areas pa ON pa.id = ppa.priority_area_id
+                  WHERE ppa.project_id = p.id
+                  ORDER BY pa.id) AS priority_areas,
+           (SELECT count(DISTINCT t.locked_by)
+              FROM tasks t
+             WHERE t.project_id = p.id
+               AND t.task_status = ANY(:locked_statuses)) AS active_mappers
+      FROM projects p
+     WHERE p.id = :project_id"""
+
+
 class ProjectTeams(db.Model):
     __tablename__ = "project_teams"
     team_id = db.Column(db.Integer, db.ForeignKey("teams.id"), primary_key=True)
@@ -111,6 +132,11 @@ class ProjectTeams(db.Model):
 # cache mapper counts for 30 seconds
 active_mappers_cache = TTLCache(maxsize=1024, ttl=30)
 
+# Nominatim's usage policy allows a single request per second
+NOMINATIM_REQUEST_INTERVAL = 1
+_nominatim_lock = threading.Lock()
+_nominatim_last_request = -NOMINATIM_REQUEST_INTERVAL
+
 
 class Project(db.Model):
     """ Describes a HOT Mapping Project """
@@ -261,8 +287,24 @@ class Project(db.Model):
         self.save()
 
     def set_country_info(self):
-        """ Sets the default country based on centroid"""
+        """
+        Sets the countries of the project from the bundled world boundaries, starting with the
+        country of the centroid. Nominatim is only asked for areas the boundaries don't cover
+        """
+        countries = CountryLookupService.get_countries(to_shape(self.geometry))
+        if countries:
+            self.country = [country.name for country in countries]
+            country_codes = {country.name: country.code for country in countries}
+        elif current_app.config["COUNTRY_LOOKUP_NOMINATIM_FALLBACK"]:
+            self.country, country_codes = self._get_nominatim_country()
+        else:
+            self.country, country_codes = [], {}
+
+        ProjectCountry.sync(self.id, self.country, country_codes)
+        self.save()
 
+    def _get_nominatim_country(self):
+        """ Reverse geocodes the centroid with Nominatim, returns the country and its code """
         lat, lng = (
             db.session.query(
                 cast(ST_Y(Project.centroid), sqlalchemy.String),
@@ -271,28 +313,66 @@ class Project(db.Model):
             .filter(Project.id == self.id)
             .one()
         )
-        url = "https://nominatim.openstreetmap.org/reverse?format=jsonv2&lat={0}&lon={1}".format(
-            lat, lng
+        url = (
+            "https://nominatim.openstreetmap.org/reverse?format=jsonv2&accept-language=en"
+            "&lat={0}&lon={1}".format(lat, lng)
         )
-        country_info = requests.get(url)
-        country_info_json = country_info.content.decode("utf8").replace("'", '"')
-        # Load the JSON to a Python list & dump it back out as formatted JSON
-        data = json.loads(country_info_json)
-        if data["address"].get("country") is not None:
-            self.country = [data["address"]["country"]]
-        else:
-            self.country = [data["address"]["county"]]
-
-        self.save()
+        global _nominatim_last_request
+        try:
+            with _nominatim_lock:
+                wait = (
+                    _nominatim_last_request + NOMINATIM_REQUEST_INTERVAL - monotonic()
+                )
+                if wait > 0:
+                    sleep(wait)
+                _nominatim_last_request = monotonic()
+                country_info = requests.get(url, timeout=10)
+            # English names such as Côte d'Ivoire have quotes, so the JSON is parsed as it is
+            data = country_info.json()
+        except (requests.RequestException, ValueError) as e:
+            current_app.logger.error(f"Unable to reverse geocode project: {str(e)}")
+            return [], {}
+
+        address = data.get("address", {})
+        country = address.get("country") or address.get("county")
+        if country is None:
+            return [], {}
+
+        # Countries the bundled boundaries know are named the same whichever source found them
+        code = address.get("country_code")
+        country = (code and CountryLookupService.get_country_name(code)) or country
+        return [country], {country: code}
 
     def create(self):
         """ Creates and saves the current model to the DB """
         db.session.add(self)
+        self.refresh_search_index()
         db.session.commit()
+        CacheService.bump_project_version(self.id)
+        CacheService.bump_search_version()
 
     def save(self):
         """ Save changes to db"""
+        self.refresh_search_index()
         db.session.commit()
+        CacheService.bump_project_version(self.id)
+        CacheService.bump_search_version()
+
+    def create_tasks(self, task_rows: list):
+        """
+        Bulk loads the validated task rows into the project, replacing ORM task creation
+        Transaction will be saved when project is saved
+        """
+        db.session.add(self)
+        db.session.flush()  # Project needs an id before tasks can reference it
+        Task.bulk_create(self.id, task_rows)
+        self.total_tasks = len(task_rows)
+
+    def refresh_search_index(self):
+        """ Flushes pending changes and rebuilds the search index rows and countries of the project """
+        db.session.flush()
+        ProjectSearchIndex.refresh(self.id)
+        ProjectCountry.sync(self.id, self.country)
 
     @staticmethod
     def clone(project_id: int, author_id: int):
@@ -369,7 +449,9 @@ class Project(db.Model):
         cloned_project.changeset_comment = " ".join(changeset_comments)
 
         db.session.add(cloned_project)
+        cloned_project.refresh_search_index()
         db.session.commit()
+        CacheService.bump_search_version()
 
         return cloned_project
 
@@ -487,12 +569,16 @@ class Project(db.Model):
             if self.custom_editor:
                 self.custom_editor.delete()
 
+        self.refresh_search_index()
         db.session.commit()
+        CacheService.bump_project_version(self.id)
+        CacheService.bump_search_version()
 
     def delete(self):
         """ Deletes the current model from the DB """
         db.session.delete(self)
         db.session.commit()
+        CacheService.bump_search_version()
 
     def is_favorited(self, user_id: int) -> bool:
         user = User.query.get(user_id)
@@ -505,6 +591,7 @@ class Project(db.Model):
         user = User.query.get(user_id)
         self.favorited.append(user)
         db.session.commit()
+        CacheService.bump_search_version()
 
     def unfavorite(self, user_id: int):
         user = User.query.get(user_id)
@@ -512,6 +599,7 @@ class Project(db.Model):
             raise ValueError("Project not been favorited by user")
         self.favorited.remove(user)
         db.session.commit()
+        CacheService.bump_search_version()
 
     def set_as_featured(self):
         if self.featured is True:
@@ -607,10 +695,9 @@ class Project(db.Model):
         """ Create Project Stats model for postgis project object"""
         project_stats = ProjectStatsDTO()
         project_stats.project_id = self.id
-        project_area_sql = "select ST_Area(geometry, true)/1000000 as area from public.projects where id = :id"
-        project_area_result = db.engine.execute(text(project_area_sql), id=self.id)
-
-        project_stats.area = project_area_result.fetchone()["area"]
+        project_stats.area = (
+            GeometryService.get_geodesic_area(to_shape(self.geometry)) / 1000000
+        )
         project_stats.total_mappers = (
             db.session.query(User).filter(User.projects_mapped.any(self.id)).count()
         )
@@ -711,19 +798,9 @@ class Project(db.Model):
         else:
             summary.priority = "LOW"
         summary.author = User().get_by_id(self.author_id).username
-        polygon = to_shape(self.geometry)
-        polygon_aea = transform(
-            partial(
-                pyproj.transform,
-                pyproj.Proj(init="EPSG:4326"),
-                pyproj.Proj(
-                    proj="aea", lat_1=polygon.bounds[1], lat_2=polygon.bounds[3]
-                ),
-            ),
-            polygon,
+        summary.area = (
+            GeometryService.get_geodesic_area(to_shape(self.geometry)) / 1000000
         )
-        area = polygon_aea.area / 1000000
-        summary.area = area
         summary.country_tag = self.country
         summary.changeset_comment = self.changeset_comment
         summary.created = self.created
@@ -856,6 +933,45 @@ class Project(db.Model):
             .count()
         )
 
+    @staticmethod
+    def get_for_dto(project_id: int):
+        """
+        Gets a project with the relations its DTO needs eagerly loaded, in one query for the
+        project and its single relations and one per collection, whatever their size
+        :return: Project if found otherwise None
+        """
+        return (
+            Project.query.options(
+                joinedload(Project.author),
+                joinedload(Project.organisation),
+                joinedload(Project.custom_editor),
+                selectinload(Project.teams).joinedload(ProjectTeams.team),
+                selectinload(Project.allowed_users),
+                selectinload(Project.campaign),
+            )
+            .filter(Project.id == project_id)
+            .one_or_none()
+        )
+
+    def _get_dto_geometries(self):
+        """
+        Gets the AOI and priority areas as GeoJSON and the number of active mappers in one query
+        :return: Tuple of AOI, list of priority areas and active mappers count
+        """
+        row = db.session.execute(
+            text(DTO_GEOMETRIES_SQL),
+            dict(
+                project_id=self.id,
+                locked_statuses=[
+                    TaskStatus.LOCKED_FOR_MAPPING.value,
+                    TaskStatus.LOCKED_FOR_VALIDATION.value,
+                ],
+            ),
+        ).fetchone()
+
+        priority_areas = [geojson.loads(area) for area in row.priority_areas]
+        return geojson.loads(row.aoi), priority_areas, row.active_mappers
+
     def _get_project_and_base_dto(self):
         """ Populates a project DTO with properties common to all roles """
         base_dto = ProjectDTO()
@@ -863,7 +979,8 @@ class Project(db.Model):
         base_dto.project_status = ProjectStatus(self.status).name
         base_dto.default_locale = self.default_locale
         base_dto.project_priority = ProjectPriority(self.priority).name
-        base_dto.area_of_interest = self.get_aoi_geometry_as_geojson()
+        aoi, priority_areas, active_mappers = self._get_dto_geometries()
+        base_dto.area_of_interest = aoi
         base_dto.aoi_bbox = shape(base_dto.area_of_interest).bounds
         base_dto.restrict_mapping_level_to_project = (
             self.restrict_mapping_level_to_project
@@ -887,8 +1004,8 @@ class Project(db.Model):
         base_dto.license_id = self.license_id
         base_dto.created = self.created
         base_dto.last_updated = self.last_updated
-        base_dto.author = User().get_by_id(self.author_id).username
-        base_dto.active_mappers = Project.get_active_mappers(self.id)
+        base_dto.author = self.author.username
+        base_dto.active_mappers = active_mappers
         base_dto.task_creation_mode = TaskCreationMode(self.task_creation_mode).name
         base_dto.percent_mapped = Project.calculate_tasks_percent(
             "mapped",
@@ -957,12 +1074,8 @@ class Project(db.Model):
 
             base_dto.validation_editors = validation_editors
 
-        if self.priority_areas:
-            geojson_areas = []
-            for priority_area in self.priority_areas:
-                geojson_areas.append(priority_area.get_as_geojson())
-
-            base_dto.priority_areas = geojson_areas
+        if priority_areas:
+            base_dto.priority_areas = priority_areas
 
         return self, base_dto
 
@@ -1001,7 +1114,11 @@ class Project(db.Model):
 
     @staticmethod
     def get_all_countries():
-        query = db.session.query(func.unnest(Project.country)).distinct()
+        query = (
+            db.session.query(ProjectCountry.country_name)
+            .distinct()
+            .order_by(ProjectCountry.country_name)
+        )
         tags_dto = TagsDTO()
         tags_dto.tags = [r[0] for r in query]
         return tags_dto
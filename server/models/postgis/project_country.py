@@ -0,0 +1,56 @@
+from sqlalchemy import text
+from server import db
+
+
+class ProjectCountry(db.Model):
+    """
+    Countries covered by a project, kept in sync with Project.country so that country filters and
+    listings use indexes instead of unnesting the country array of every project.
+    The migrations also create a trigram index on the name for partial matches
+    """
+
+    __tablename__ = "project_countries"
+
+    project_id = db.Column(
+        db.Integer, db.ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True
+    )
+    country_name = db.Column(db.String, primary_key=True)
+    country_code = db.Column(db.String(2))  # ISO 3166-1 alpha-2, when known
+
+    __table_args__ = (
+        db.Index("idx_project_countries_name", "country_name"),
+        db.Index("idx_project_countries_code", "country_code"),
+        {},
+    )
+
+    @staticmethod
+    def sync(project_id: int, countries: list, country_codes: dict = None):
+        """
+        Replaces the countries of a project, keeping the codes already known for them
+        Transaction will be saved when project is saved
+        :param countries: Names of the countries, as in Project.country
+        :param country_codes: Optional ISO codes of the countries keyed by name
+        """
+        countries = [country for country in countries or [] if country]
+        country_codes = country_codes or {}
+
+        ProjectCountry.query.filter(
+            ProjectCountry.project_id == project_id,
+            ProjectCountry.country_name.notin_(countries),
+        ).delete(synchronize_session=False)
+
+        upsert_sql = """INSERT INTO project_countries (project_id, country_name, country_code)
+                        VALUES (:project_id, :country_name, :country_code)
+                        ON CONFLICT (project_id, country_name) DO UPDATE
+                           SET country_code = coalesce(EXCLUDED.country_code,
+                                                       project_countries.country_code)"""
+        for country in countries:
+            code = country_codes.get(country)
+            db.session.execute(
+                text(upsert_sql),
+                dict(
+                    project_id=project_id,
+                    country_name=country,
+                    country_code=code.upper() if code else None,
+                ),
+            )
@@ -1,9 +1,22 @@
 from flask import current_app
+from sqlalchemy import text
 from sqlalchemy.dialects.postgresql import TSVECTOR
-from typing import List
+from typing import Dict, List
 from server import db
 from server.models.dtos.project_dto import ProjectInfoDTO
 
+# Name of each project in the requested locale, the default locale of the project filling in
+# missing and empty translations as get_dto_for_locale does
+PROJECT_TITLES_SQL = """
+    SELECT p.id, coalesce(nullif(requested.name, ''), fallback.name) AS name
+      FROM projects p
+      LEFT JOIN project_info requested
+        ON requested.project_id = p.id AND requested.locale = :locale
+      LEFT JOIN project_info fallback
+        ON fallback.project_id = p.id AND fallback.locale = p.default_locale
+     WHERE p.id = ANY(:project_ids)
+"""
+
 
 class ProjectInfo(db.Model):
     """ Contains all project info localized into supported languages """
@@ -91,6 +104,22 @@ class ProjectInfo(db.Model):
         # Pass thru default_locale in case of partial translation
         return project_info.get_dto(default_locale)
 
+    @staticmethod
+    def get_titles(project_ids: List[int], locale: str) -> Dict[int, str]:
+        """
+        Gets the names of many projects in one query, keyed by project id
+        :param project_ids: Projects in scope
+        :param locale: locale requested by user
+        """
+        if not project_ids:
+            return {}
+
+        rows = db.session.execute(
+            text(PROJECT_TITLES_SQL),
+            dict(project_ids=list(set(project_ids)), locale=locale),
+        )
+        return {row.id: row.name for row in rows}
+
     def get_dto(self, default_locale=ProjectInfoDTO()) -> ProjectInfoDTO:
         """
         Get DTO for current ProjectInfo
@@ -0,0 +1,165 @@
+from flask import g, has_request_context
+from geoalchemy2 import Geometry
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import ARRAY, TSVECTOR
+from server import db
+from server.services.cache_service import CacheService
+
+# Columns derived from the state of the tasks of a project, shared by full and progress refreshes
+PROGRESS_COLUMNS_SQL = """
+    CASE WHEN p.total_tasks - p.tasks_bad_imagery > 0
+         THEN (p.tasks_mapped + p.tasks_validated) * 100 / (p.total_tasks - p.tasks_bad_imagery)
+         ELSE 0 END,
+    CASE WHEN p.total_tasks - p.tasks_bad_imagery > 0
+         THEN p.tasks_validated * 100 / (p.total_tasks - p.tasks_bad_imagery)
+         ELSE 0 END,
+    (SELECT count(DISTINCT th.user_id) FROM task_history th WHERE th.project_id = p.id),
+    (SELECT count(DISTINCT t.locked_by) FROM tasks t
+      WHERE t.project_id = p.id AND t.task_status IN (1, 3))"""
+
+# Weighted document in the text search configuration of the locale, the project id is indexed as is
+# so that projects can be searched by id. tm_locale_regconfig is created by the migrations
+TEXT_SEARCHABLE_SQL = """
+    setweight(to_tsvector(tm_locale_regconfig(pi.locale),
+                          coalesce(nullif(pi.name, ''), d.name, '')), 'A') ||
+    setweight(to_tsvector('simple', p.id::text), 'A') ||
+    setweight(to_tsvector(tm_locale_regconfig(pi.locale),
+                          coalesce(nullif(pi.short_description, ''), d.short_description, '')), 'B') ||
+    setweight(to_tsvector(tm_locale_regconfig(pi.locale),
+                          coalesce(nullif(pi.description, ''), d.description, '')), 'C')"""
+
+POPULATE_SQL = f"""
+    INSERT INTO project_search_index
+           (project_id, locale, is_default_locale, name, short_description, text_searchable,
+            status, private, mapper_level, priority, author_id, organisation_id,
+            organisation_name, organisation_logo, mapping_types, country, centroid,
+            due_date, last_updated, percent_mapped, percent_validated, total_contributors,
+            active_mappers)
+    SELECT p.id, pi.locale, pi.locale = p.default_locale,
+           coalesce(nullif(pi.name, ''), d.name),
+           coalesce(nullif(pi.short_description, ''), d.short_description),
+           {TEXT_SEARCHABLE_SQL}, p.status, p.private, p.mapper_level, p.priority, p.author_id,
+           p.organisation_id, o.name, o.logo, p.mapping_types, p.country, p.centroid,
+           p.due_date, p.last_updated, {PROGRESS_COLUMNS_SQL}
+      FROM projects p
+      JOIN project_info pi ON pi.project_id = p.id
+      LEFT JOIN project_info d ON d.project_id = p.id AND d.locale = p.default_locale
+      LEFT JOIN organisations o ON o.id = p.organisation_id
+     WHERE p.id = :project_id"""
+
+# Search results only change once the progress of a project moves to another bucket of this size
+PROGRESS_BUCKET_SIZE = 10
+
+# The index rows joined in as previous are read before the update, so the progress can be compared
+REFRESH_PROGRESS_SQL = f"""
+    UPDATE project_search_index psi
+       SET (percent_mapped, percent_validated, total_contributors, active_mappers) =
+           (SELECT {PROGRESS_COLUMNS_SQL}),
+           last_updated = p.last_updated
+      FROM projects p, project_search_index previous
+     WHERE p.id = psi.project_id AND psi.project_id = :project_id
+       AND previous.project_id = psi.project_id AND previous.locale = psi.locale
+ RETURNING previous.percent_mapped / :bucket_size IS DISTINCT FROM psi.percent_mapped / :bucket_size
+           OR previous.percent_validated / :bucket_size
+              IS DISTINCT FROM psi.percent_validated / :bucket_size AS bucket_changed"""
+
+
+class ProjectSearchIndex(db.Model):
+    """
+    Denormalized copy of everything a project card in the search results needs, one row per
+    project and locale, so that a page of search results is a single indexed query.
+    Besides the indexes declared below, the migrations create trigram and prefix indexes on the
+    lowercased name and on the project id as text, used by autocompletion
+    """
+
+    __tablename__ = "project_search_index"
+
+    project_id = db.Column(
+        db.Integer, db.ForeignKey("projects.id", ondelete="CASCADE"), primary_key=True
+    )
+    locale = db.Column(db.String(10), primary_key=True)
+    is_default_locale = db.Column(db.Boolean, nullable=False, default=False)
+    name = db.Column(db.String(512))
+    short_description = db.Column(db.String)
+    text_searchable = db.Column(TSVECTOR)
+    status = db.Column(db.Integer, nullable=False)
+    private = db.Column(db.Boolean)
+    mapper_level = db.Column(db.Integer, nullable=False)
+    priority = db.Column(db.Integer)
+    author_id = db.Column(db.BigInteger)
+    organisation_id = db.Column(db.Integer)
+    organisation_name = db.Column(db.String(512))
+    organisation_logo = db.Column(db.String)
+    mapping_types = db.Column(ARRAY(db.Integer))
+    country = db.Column(ARRAY(db.String))
+    centroid = db.Column(Geometry("POINT", srid=4326))
+    due_date = db.Column(db.DateTime)
+    last_updated = db.Column(db.DateTime)
+    percent_mapped = db.Column(db.Integer, default=0)
+    percent_validated = db.Column(db.Integer, default=0)
+    total_contributors = db.Column(db.Integer, default=0)
+    active_mappers = db.Column(db.Integer, default=0)
+
+    __table_args__ = (
+        db.Index("idx_project_search_index_status", "status", "locale"),
+        db.Index("idx_project_search_index_organisation", "organisation_id"),
+        db.Index(
+            "idx_project_search_index_text", "text_searchable", postgresql_using="gin",
+        ),
+        {},
+    )
+
+    @staticmethod
+    def refresh(project_id: int):
+        """
+        Rebuilds the index rows of a project, pending changes must be flushed beforehand
+        Transaction will be saved when project is saved
+        """
+        ProjectSearchIndex.query.filter_by(project_id=project_id).delete()
+        db.session.execute(text(POPULATE_SQL), dict(project_id=project_id))
+
+    @staticmethod
+    def refresh_progress(project_id: int) -> bool:
+        """
+        Updates the task derived columns of the index rows of a project
+        :returns: True if the progress moved to another bucket, changing search results
+        """
+        rows = db.session.execute(
+            text(REFRESH_PROGRESS_SQL),
+            dict(project_id=project_id, bucket_size=PROGRESS_BUCKET_SIZE),
+        )
+        return any(row.bucket_changed for row in rows)
+
+    @staticmethod
+    def schedule_progress_refresh(project_id: int) -> bool:
+        """
+        Marks the progress of a project as changed. Within a request the progress is refreshed
+        once when the request ends, however many tasks it changed, otherwise right away
+        Transaction will be saved by the caller
+        :returns: True if cached searches must be invalidated once the transaction is saved
+        """
+        if has_request_context():
+            g.setdefault("stale_search_progress", set()).add(project_id)
+            return False
+
+        return ProjectSearchIndex.refresh_progress(project_id)
+
+    @staticmethod
+    def refresh_scheduled_progress() -> list:
+        """
+        Refreshes the progress of the projects changed by the request, and invalidates cached
+        searches if a progress bucket changed
+        :returns: Ids of the refreshed projects
+        """
+        project_ids = sorted(g.pop("stale_search_progress", set()))
+        bucket_changed = False
+        for project_id in project_ids:
+            bucket_changed = (
+                ProjectSearchIndex.refresh_progress(project_id) or bucket_changed
+            )
+        if project_ids:
+            db.session.commit()
+        if bucket_changed:
+            CacheService.bump_search_version()
+
+        return project_ids
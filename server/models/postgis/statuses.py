@@ -128,3 +128,10 @@ class TeamMemberFunctions(Enum):
     EDITOR = 0
     MANAGER = 1
     MEMBER = 2
+
+
+class EmailStatus(Enum):
+    """ Describes the delivery state of a queued email, sent emails are removed from the queue """
+
+    PENDING = 0
+    FAILED = 1
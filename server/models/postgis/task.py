@@ -1,6 +1,8 @@
 import bleach
+import csv
 import datetime
 import geojson
+import io
 import json
 from enum import Enum
 from flask import current_app
@@ -9,6 +11,7 @@ from sqlalchemy import text, desc, cast, func
 from sqlalchemy.orm.exc import NoResultFound, MultipleResultsFound
 from sqlalchemy.orm.session import make_transient
 from geoalchemy2 import Geometry
+from shapely.geometry import shape
 from server import db
 from typing import List
 from server.models.dtos.mapping_dto import TaskDTO, TaskHistoryDTO
@@ -31,6 +34,37 @@ from server.models.postgis.utils import (
     NotFound,
 )
 from server.models.postgis.task_annotation import TaskAnnotation
+from server.models.postgis.project_search_index import ProjectSearchIndex
+from server.services.cache_service import CacheService
+
+# Invalid features reported back when a task collection is rejected
+MAX_REPORTED_TASK_ERRORS = 10
+
+# Tasks are bulk loaded through COPY into a staging table, geometries as hex WKB
+CREATE_TASK_STAGING_SQL = """
+    DROP TABLE IF EXISTS pg_temp.task_staging;
+    CREATE TEMP TABLE task_staging (id integer, x integer, y integer, zoom integer,
+                                    is_square boolean, extra_properties text, geometry text)
+    ON COMMIT DROP"""
+
+COPY_TASK_STAGING_SQL = "COPY task_staging FROM STDIN WITH (FORMAT csv)"
+
+INSERT_STAGED_TASKS_SQL = """
+    INSERT INTO tasks (id, project_id, x, y, zoom, is_square, extra_properties, geometry,
+                       task_status)
+    SELECT id, :project_id, x, y, zoom, is_square, extra_properties,
+           ST_Multi(ST_Force2D(ST_SetSRID(ST_GeomFromWKB(decode(geometry, 'hex')), 4326))),
+           :task_status
+      FROM task_staging"""
+
+# Points of the outer rings of task geometries, in drawing order, used by the GPX and OSM XML exports
+TASK_POINTS_SQL = """
+    SELECT t.id AS task_id, (dp.path)[1] AS polygon, ST_X(dp.geom) AS lon, ST_Y(dp.geom) AS lat
+      FROM tasks t, ST_DumpPoints(t.geometry) dp
+     WHERE t.project_id = :project_id AND (dp.path)[2] = 1 {task_filter}
+     ORDER BY t.id, (dp.path)[1], (dp.path)[3]"""
+
+TASK_POINTS_BATCH_SIZE = 5000
 
 
 class TaskAction(Enum):
@@ -203,6 +237,7 @@ class TaskHistory(db.Model):
             [task_id, project_id], ["tasks.id", "tasks.project_id"], name="fk_tasks"
         ),
         db.Index("idx_task_history_composite", "task_id", "project_id"),
+        db.Index("idx_task_history_action_date", "action_date"),
         {},
     )
 
@@ -512,16 +547,31 @@ class Task(db.Model):
     def create(self):
         """ Creates and saves the current model to the DB """
         db.session.add(self)
+        db.session.flush()
+        search_changed = ProjectSearchIndex.schedule_progress_refresh(self.project_id)
         db.session.commit()
+        CacheService.bump_project_version(self.project_id)
+        if search_changed:
+            CacheService.bump_search_version()
 
     def update(self):
         """ Updates the DB with the current state of the Task """
+        db.session.flush()
+        search_changed = ProjectSearchIndex.schedule_progress_refresh(self.project_id)
         db.session.commit()
+        CacheService.bump_project_version(self.project_id)
+        if search_changed:
+            CacheService.bump_search_version()
 
     def delete(self):
         """ Deletes the current model from the DB """
         db.session.delete(self)
+        db.session.flush()
+        search_changed = ProjectSearchIndex.schedule_progress_refresh(self.project_id)
         db.session.commit()
+        CacheService.bump_project_version(self.project_id)
+        if search_changed:
+            CacheService.bump_search_version()
 
     @classmethod
     def from_geojson_feature(cls, task_id, task_feature):
@@ -565,6 +615,96 @@ class Task(db.Model):
 
         return task
 
+    @staticmethod
+    def rows_from_feature_collection(feature_collection) -> list:
+        """
+        Validates the features of a task collection in a single pass and converts them to rows
+        for bulk_create, task ids being the position of the features
+        :param feature_collection: GeoJSON feature collection of mapping tasks
+        :raises InvalidGeoJson listing the first invalid features
+        :return: list of (id, x, y, zoom, is_square, extra_properties, hex WKB geometry) tuples
+        """
+        if (
+            not isinstance(feature_collection, dict)
+            or feature_collection.get("type") != "FeatureCollection"
+            or not isinstance(feature_collection.get("features"), list)
+        ):
+            raise InvalidGeoJson("Tasks: Invalid GeoJson must be FeatureCollection")
+
+        rows = []
+        errors = []
+        invalid_features = 0
+        for task_id, feature in enumerate(feature_collection["features"], start=1):
+            try:
+                rows.append(Task._row_from_feature(task_id, feature))
+            except (InvalidData, InvalidGeoJson) as e:
+                invalid_features += 1
+                if len(errors) < MAX_REPORTED_TASK_ERRORS:
+                    errors.append(f"Task {task_id}: {str(e)}")
+
+        if invalid_features:
+            raise InvalidGeoJson(
+                f"Tasks: {invalid_features} invalid features - {'; '.join(errors)}"
+            )
+
+        return rows
+
+    @staticmethod
+    def _row_from_feature(task_id: int, feature) -> tuple:
+        """ Validates a task feature the way from_geojson_feature does and converts it to a row """
+        if not isinstance(feature, dict) or feature.get("type") != "Feature":
+            raise InvalidGeoJson("Invalid GeoJson should be a feature")
+
+        geometry = feature.get("geometry")
+        if not isinstance(geometry, dict) or geometry.get("type") != "MultiPolygon":
+            raise InvalidGeoJson("Geometry must be a MultiPolygon")
+
+        try:
+            for polygon in geometry["coordinates"]:
+                for ring in polygon:
+                    if len(ring) < 4 or ring[0] != ring[-1]:
+                        raise InvalidGeoJson(
+                            "Invalid MultiPolygon - rings must have 4 or more positions "
+                            "with the same first and last position"
+                        )
+            wkb = shape(geometry).wkb_hex
+        except InvalidGeoJson:
+            raise
+        except Exception as e:
+            raise InvalidGeoJson(f"Invalid MultiPolygon - {str(e)}")
+
+        properties = feature.get("properties") or {}
+        try:
+            x, y, zoom = properties["x"], properties["y"], properties["zoom"]
+            is_square = properties["isSquare"]
+        except KeyError as e:
+            raise InvalidData(f"Expected property not found: {str(e)}")
+
+        extra_properties = None
+        if "extra_properties" in properties:
+            extra_properties = json.dumps(properties["extra_properties"])
+
+        return (task_id, x, y, zoom, is_square, extra_properties, wkb)
+
+    @staticmethod
+    def bulk_create(project_id: int, task_rows: list):
+        """
+        Loads rows from rows_from_feature_collection through COPY into a staging table, then
+        inserts them into tasks in a single statement. Transaction will be saved when project is saved
+        """
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(task_rows)
+        buffer.seek(0)
+
+        db.session.execute(text(CREATE_TASK_STAGING_SQL))
+        # COPY is only exposed by the DBAPI cursor, which shares the transaction of the session
+        cursor = db.session.connection().connection.cursor()
+        cursor.copy_expert(COPY_TASK_STAGING_SQL, buffer)
+        db.session.execute(
+            text(INSERT_STAGED_TASKS_SQL),
+            dict(project_id=project_id, task_status=TaskStatus.READY.value),
+        )
+
     @staticmethod
     def get(task_id: int, project_id: int):
         """
@@ -584,6 +724,29 @@ class Task(db.Model):
             Task.project_id == project_id, Task.id.in_(task_ids)
         ).all()
 
+    @staticmethod
+    def get_exterior_points(project_id: int, task_ids: List[int] = None):
+        """
+        Streams the points of the outer rings of the tasks from a server side cursor, so exports
+        never hold the geometries of a whole project in memory
+        :param task_ids: Optional, all tasks of the project if not supplied
+        :return: Generator of (task_id, polygon, lon, lat) rows ordered by task and polygon
+        """
+        task_filter = "AND t.id = ANY(:task_ids)" if task_ids else ""
+        sql = text(TASK_POINTS_SQL.format(task_filter=task_filter))
+        result = db.session.execute(
+            sql.execution_options(stream_results=True),
+            dict(project_id=project_id, task_ids=task_ids),
+        )
+        try:
+            while True:
+                rows = result.fetchmany(TASK_POINTS_BATCH_SIZE)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            result.close()
+
     @staticmethod
     def get_all_tasks(project_id: int):
         """ Get all tasks for a given project """
@@ -952,8 +1115,15 @@ class Task(db.Model):
                        and th.action_text = 'MAPPED'
                      group by u.username, u.mapping_level, u.date_registered, u.last_validation_date"""
 
-        results = db.engine.execute(text(sql), project_id=project_id)
-        if results.rowcount == 0:
+        results = CacheService.get_or_set_for_project(
+            "mapped-tasks-by-user",
+            project_id,
+            lambda: [
+                tuple(row)
+                for row in db.engine.execute(text(sql), project_id=project_id)
+            ],
+        )
+        if len(results) == 0:
             raise NotFound()
 
         mapped_tasks_dto = MappedTasks()
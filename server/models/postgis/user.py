@@ -22,6 +22,7 @@ from server.models.postgis.statuses import (
 )
 from server.models.postgis.utils import NotFound, timestamp
 from server.models.postgis.interests import Interest, users_interests
+from server.models.postgis.user_recommendations import UserRecommendations
 
 
 class User(db.Model):
@@ -213,19 +214,20 @@ class User(db.Model):
         return dto
 
     @staticmethod
-    def upsert_mapped_projects(user_id: int, project_id: int):
-        """ Adds projects to mapped_projects if it doesn't exist """
+    def upsert_mapped_projects(user_id: int, project_id: int) -> bool:
+        """ Adds projects to mapped_projects if it doesn't exist, returns True when added """
         sql = "select * from users where id = :user_id and projects_mapped @> '{{:project_id}}'"
         result = db.engine.execute(text(sql), user_id=user_id, project_id=project_id)
 
         if result.rowcount > 0:
-            return  # User has previously mapped this project so return
+            return False  # User has previously mapped this project so return
 
         sql = """update users
                     set projects_mapped = array_append(projects_mapped, :project_id)
                   where id = :user_id"""
 
         db.engine.execute(text(sql), project_id=project_id, user_id=user_id)
+        return True
 
     @staticmethod
     def get_mapped_projects(
@@ -293,6 +295,7 @@ class User(db.Model):
     def set_mapping_level(self, level: MappingLevel):
         """ Sets the supplied level on the user """
         self.mapping_level = level.value
+        UserRecommendations.mark_stale(self.id)
         db.session.commit()
 
     def accept_license_terms(self, license_id: int):
@@ -390,6 +393,7 @@ class User(db.Model):
         self.interests = []
         objs = [Interest.get_by_id(i) for i in interests_ids]
         self.interests.extend(objs)
+        UserRecommendations.mark_stale(self.id)
         db.session.commit()
 
 
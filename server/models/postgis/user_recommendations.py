@@ -0,0 +1,110 @@
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import ARRAY
+from server import db
+from server.models.postgis.statuses import ProjectStatus
+from server.models.postgis.utils import timestamp
+
+# Projects kept for each user, ordered from the most relevant
+MAX_RECOMMENDED_PROJECTS = 20
+
+# Published projects within the mapper level of each user and which they have not contributed to,
+# scored by shared campaigns with the projects they contributed to, matching interests and country
+REFRESH_SQL = """
+    WITH target_users AS (
+        SELECT id, mapping_level, country, projects_mapped
+          FROM users
+         WHERE id = ANY(:user_ids)
+    ),
+    contributed AS (
+        SELECT u.id AS user_id, unnest(u.projects_mapped) AS project_id FROM target_users u
+        UNION
+        SELECT p.author_id, p.id FROM projects p WHERE p.author_id = ANY(:user_ids)
+    ),
+    user_campaigns AS (
+        SELECT DISTINCT c.user_id, cp.campaign_id
+          FROM contributed c
+          JOIN campaign_projects cp ON cp.project_id = c.project_id
+    ),
+    candidates AS (
+        SELECT u.id AS user_id, p.id AS project_id, p.last_updated,
+               3 * (SELECT count(*) FROM campaign_projects cp
+                      JOIN user_campaigns uc ON uc.campaign_id = cp.campaign_id
+                     WHERE uc.user_id = u.id AND cp.project_id = p.id) +
+               2 * (SELECT count(*) FROM projects_interests pi
+                      JOIN users_interests ui ON ui.interest_id = pi.interest_id
+                     WHERE ui.user_id = u.id AND pi.project_id = p.id) +
+               2 * (SELECT count(*) FROM project_countries pc
+                     WHERE pc.project_id = p.id AND pc.country_name = u.country) AS score
+          FROM target_users u
+          JOIN projects p ON p.status = :published
+                         AND p.private IS NOT TRUE
+                         AND p.mapper_level <= u.mapping_level
+         WHERE NOT EXISTS (SELECT 1 FROM contributed c
+                            WHERE c.user_id = u.id AND c.project_id = p.id)
+    ),
+    ranked AS (
+        SELECT user_id, project_id,
+               row_number() OVER (PARTITION BY user_id
+                                  ORDER BY score DESC, last_updated DESC, project_id) AS rank
+          FROM candidates
+    )
+    INSERT INTO user_recommendations (user_id, project_ids, updated_date, is_stale)
+    SELECT u.id,
+           coalesce(array_agg(r.project_id ORDER BY r.rank)
+                    FILTER (WHERE r.project_id IS NOT NULL), '{}'),
+           :updated_date,
+           false
+      FROM target_users u
+      LEFT JOIN ranked r ON r.user_id = u.id AND r.rank <= :limit
+     GROUP BY u.id
+    ON CONFLICT (user_id) DO UPDATE
+       SET project_ids = EXCLUDED.project_ids,
+           updated_date = EXCLUDED.updated_date,
+           is_stale = false"""
+
+
+class UserRecommendations(db.Model):
+    """
+    Precomputed list of the projects recommended to a user, refreshed nightly for every user and
+    whose list is stale, so reading recommendations is a primary key lookup. Activity of the user
+    that changes the recommendations only marks the list as stale, it's rebuilt on next view
+    """
+
+    __tablename__ = "user_recommendations"
+
+    user_id = db.Column(
+        db.BigInteger, db.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    project_ids = db.Column(ARRAY(db.Integer), nullable=False, default=[])
+    updated_date = db.Column(db.DateTime, nullable=False, default=timestamp)
+    is_stale = db.Column(db.Boolean, nullable=False, default=False)
+
+    @staticmethod
+    def get(user_id: int):
+        return UserRecommendations.query.get(user_id)
+
+    @staticmethod
+    def mark_stale(user_id: int):
+        """
+        Marks the recommendations of the user for rebuilding on next view
+        Transaction will be saved by the caller
+        """
+        UserRecommendations.query.filter_by(user_id=user_id).update(
+            {UserRecommendations.is_stale: True}, synchronize_session=False
+        )
+
+    @staticmethod
+    def refresh(user_ids: list):
+        """
+        Recomputes the recommendations of the users
+        Transaction will be saved by the caller
+        """
+        db.session.execute(
+            text(REFRESH_SQL),
+            dict(
+                user_ids=list(user_ids),
+                published=ProjectStatus.PUBLISHED.value,
+                limit=MAX_RECOMMENDED_PROJECTS,
+                updated_date=timestamp(),
+            ),
+        )
@@ -0,0 +1,211 @@
+import pickle
+import threading
+
+import redis
+from cachetools import TTLCache
+from flask import current_app
+
+
+class CacheBackend:
+    """ Interface every cache backend has to implement """
+
+    def get(self, key: str):
+        raise NotImplementedError()
+
+    def set(self, key: str, value, ttl: int = None):
+        raise NotImplementedError()
+
+    def delete(self, *keys: str):
+        raise NotImplementedError()
+
+    def incr(self, key: str) -> int:
+        raise NotImplementedError()
+
+    def get_counter(self, key: str) -> int:
+        raise NotImplementedError()
+
+
+class MemoryCacheBackend(CacheBackend):
+    """
+    In process cache, used when no shared backend is configured and in tests.
+    Counters are kept apart from cached values so that they are never evicted, as an evicted
+    version counter would make stale entries valid again.
+    """
+
+    def __init__(self, maxsize=4096, ttl=600):
+        self._lock = threading.Lock()
+        self._values = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._counters = {}
+
+    def get(self, key: str):
+        with self._lock:
+            return self._values.get(key)
+
+    def set(self, key: str, value, ttl: int = None):
+        # TTLCache has a single ttl for all entries, per entry ttl is only honoured by shared backends
+        with self._lock:
+            self._values[key] = value
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._values.pop(key, None)
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + 1
+            return self._counters[key]
+
+    def get_counter(self, key: str) -> int:
+        with self._lock:
+            return self._counters.get(key, 0)
+
+
+class RedisCacheBackend(CacheBackend):
+    """ Cache shared by all workers, backed by Redis """
+
+    def __init__(self, url: str, prefix="tm:", ttl=600):
+        self._client = redis.Redis.from_url(url)
+        self._prefix = prefix
+        self._ttl = ttl
+
+    def _key(self, key: str) -> str:
+        return f"{self._prefix}{key}"
+
+    def get(self, key: str):
+        value = self._client.get(self._key(key))
+        if value is None:
+            return None
+
+        return pickle.loads(value)
+
+    def set(self, key: str, value, ttl: int = None):
+        self._client.set(
+            self._key(key),
+            pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+            ex=ttl or self._ttl,
+        )
+
+    def delete(self, *keys: str):
+        if keys:
+            self._client.delete(*[self._key(key) for key in keys])
+
+    def incr(self, key: str) -> int:
+        return self._client.incr(self._key(key))
+
+    def get_counter(self, key: str) -> int:
+        value = self._client.get(self._key(key))
+        return int(value) if value is not None else 0
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+SEARCH_VERSION_KEY = "project-search-version"
+
+
+class CacheService:
+    @staticmethod
+    def get_backend() -> CacheBackend:
+        """ Returns the configured cache backend, creating it on first use """
+        global _backend
+
+        if _backend is None:
+            with _backend_lock:
+                if _backend is None:
+                    _backend = CacheService._create_backend()
+
+        return _backend
+
+    @staticmethod
+    def set_backend(backend: CacheBackend):
+        """ Replaces the cache backend, eg with a MemoryCacheBackend in tests """
+        global _backend
+        _backend = backend
+
+    @staticmethod
+    def _create_backend() -> CacheBackend:
+        settings = current_app.config["CACHE_SETTINGS"]
+
+        if settings["redis_url"]:
+            current_app.logger.debug("Using Redis cache backend")
+            return RedisCacheBackend(
+                settings["redis_url"], settings["key_prefix"], settings["default_ttl"]
+            )
+
+        return MemoryCacheBackend(ttl=settings["default_ttl"])
+
+    @staticmethod
+    def get_project_version(project_id: int) -> int:
+        """ Gets the version of the state of the tasks of a project """
+        return CacheService.get_backend().get_counter(f"project-version:{project_id}")
+
+    @staticmethod
+    def bump_project_version(project_id: int):
+        """
+        Invalidates every cached value keyed by the project version. Cached project searches are
+        only invalidated by bump_search_version, as most task changes don't affect them
+        """
+        try:
+            CacheService.get_backend().incr(f"project-version:{project_id}")
+        except Exception as e:
+            # The change itself is already committed, so don't fail the request because of the cache
+            current_app.logger.error(f"Unable to bump project version: {str(e)}")
+
+    @staticmethod
+    def get_search_version() -> int:
+        """ Gets the version of the projects as seen by project searches """
+        return CacheService.get_backend().get_counter(SEARCH_VERSION_KEY)
+
+    @staticmethod
+    def bump_search_version():
+        """ Invalidates every cached project search """
+        try:
+            CacheService.get_backend().incr(SEARCH_VERSION_KEY)
+        except Exception as e:
+            current_app.logger.error(f"Unable to bump search version: {str(e)}")
+
+    @staticmethod
+    def get(key: str):
+        """ Gets a cached value, None if missing """
+        return CacheService.get_backend().get(key)
+
+    @staticmethod
+    def set(key: str, value, ttl: int = None):
+        """ Caches a value, result must be picklable """
+        CacheService.get_backend().set(key, value, ttl)
+
+    @staticmethod
+    def get_project_key(name: str, project_id: int) -> str:
+        """ Gets the key of a value cached against the current project version """
+        version = CacheService.get_project_version(project_id)
+        return f"{name}:{project_id}:{version}"
+
+    @staticmethod
+    def get_or_set(key: str, creator, ttl: int = None):
+        """
+        Gets a cached value, creating it if needed
+        :param key: Key of the cached value, callers are responsible for versioning it
+        :param creator: Callable computing the value, result must be picklable
+        :param ttl: Optional time to live in seconds
+        """
+        backend = CacheService.get_backend()
+
+        value = backend.get(key)
+        if value is None:
+            value = creator()
+            backend.set(key, value, ttl)
+
+        return value
+
+    @staticmethod
+    def get_or_set_for_project(name: str, project_id: int, creator, ttl: int = None):
+        """
+        Gets a value cached against the current project version, creating it if needed
+        :param name: Name of the cached value
+        :param project_id: Project the value depends on
+        :param creator: Callable computing the value, result must be picklable
+        :param ttl: Optional time to live in seconds
+        """
+        key = CacheService.get_project_key(name, project_id)
+        return CacheService.get_or_set(key, creator, ttl)
@@ -0,0 +1,136 @@
+import glob
+import json
+import os
+import threading
+from typing import List, Optional
+
+from shapely.geometry import MultiPolygon, shape
+from shapely.prepared import prep
+from shapely.strtree import STRtree
+
+from server.services.geometry_service import GeometryService
+
+# Country boundaries bundled with the repository, one file per continent
+WORLD_BOUNDARIES_DIR = os.path.normpath(
+    os.path.join(os.path.dirname(__file__), "..", "..", "scripts", "world")
+)
+
+
+class Country:
+    """ A country of the bundled world boundaries """
+
+    def __init__(self, name: str, code: str, geometry):
+        # Named as Nominatim names the country in English
+        self.name = name
+        # Lower case ISO 3166-1 alpha-2 code
+        self.code = code
+        self.geometry = geometry
+
+
+class CountryIndex:
+    """
+    Spatial index of the polygons of every country. Polygons are indexed one by one, rather than
+    whole countries, so that the bounding boxes of far flung islands don't cover half the globe
+    """
+
+    def __init__(self, countries: List[Country]):
+        self.countries = {country.code: country for country in countries}
+        self.polygons = []
+        self._countries = {}
+        self._prepared = {}
+        for country in countries:
+            for polygon in getattr(country.geometry, "geoms", [country.geometry]):
+                self.polygons.append(polygon)
+                self._countries[id(polygon)] = country
+                self._prepared[id(polygon)] = prep(polygon)
+        self._tree = STRtree(self.polygons)
+
+    def query(self, geometry, predicate: str) -> list:
+        """ Gets the (polygon, country) pairs for which the predicate holds against the geometry """
+        return [
+            (polygon, self._countries[id(polygon)])
+            for polygon in GeometryService.query_tree(
+                self._tree, self.polygons, geometry
+            )
+            if getattr(self._prepared[id(polygon)], predicate)(geometry)
+        ]
+
+
+_index = None
+_index_lock = threading.Lock()
+
+
+class CountryLookupService:
+    @staticmethod
+    def get_index() -> CountryIndex:
+        """ Loads the world boundaries on first use, they are then shared by the whole process """
+        global _index
+
+        if _index is None:
+            with _index_lock:
+                if _index is None:
+                    _index = CountryIndex(CountryLookupService._load_countries())
+
+        return _index
+
+    @staticmethod
+    def _load_countries() -> List[Country]:
+        """ Loads the countries, joining the features of those spanning two continents """
+        polygons = {}
+        names = {}
+        for path in sorted(glob.glob(os.path.join(WORLD_BOUNDARIES_DIR, "*.json"))):
+            with open(path, encoding="utf-8") as boundaries_file:
+                boundaries = json.load(boundaries_file)
+
+            for features in boundaries.values():
+                for feature in features:
+                    geometry = shape(feature["geometry"])
+                    if not geometry.is_valid:
+                        geometry = geometry.buffer(0)
+
+                    code = feature["properties"]["ISO2"].lower()
+                    names[code] = feature["properties"]["NAME"]
+                    polygons.setdefault(code, []).extend(
+                        getattr(geometry, "geoms", [geometry])
+                    )
+
+        return [
+            Country(names[code], code, MultiPolygon(polygons[code])) for code in names
+        ]
+
+    @staticmethod
+    def get_country_name(code: str) -> Optional[str]:
+        """ Gets the name of the country with the ISO 3166-1 alpha-2 code, if it is bundled """
+        country = CountryLookupService.get_index().countries.get(code.lower())
+        return country.name if country else None
+
+    @staticmethod
+    def get_country_at(point) -> Optional[Country]:
+        """ Gets the country a EPSG:4326 point lies in, None if it is not on bundled land """
+        matches = CountryLookupService.get_index().query(point, "contains")
+        return matches[0][1] if matches else None
+
+    @staticmethod
+    def get_countries(aoi) -> List[Country]:
+        """
+        Gets the countries a EPSG:4326 AOI intersects. The country of the centroid comes first,
+        followed by the others from the largest share of the AOI to the smallest
+        """
+        index = CountryLookupService.get_index()
+
+        # Most AOIs lie within a single country, which is answered without any intersection
+        within = index.query(aoi, "contains")
+        if within:
+            return [within[0][1]]
+
+        shares = {}
+        for polygon, country in index.query(aoi, "intersects"):
+            shares[country] = shares.get(country, 0) + polygon.intersection(aoi).area
+        if not shares:
+            return []
+
+        centroid_country = CountryLookupService.get_country_at(aoi.centroid)
+        return sorted(
+            shares,
+            key=lambda country: (country is not centroid_country, -shares[country]),
+        )
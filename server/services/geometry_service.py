@@ -0,0 +1,96 @@
+from functools import lru_cache
+
+from pyproj import Geod, Transformer
+from shapely.ops import transform
+from shapely.strtree import STRtree
+
+# Ellipsoid used by EPSG:4326, geodesic areas are computed on it
+WGS84_GEOD = Geod(ellps="WGS84")
+
+
+class GeometryService:
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def get_transformer(from_srid: int, to_srid: int) -> Transformer:
+        """
+        Gets a transformer between two EPSG coordinate systems. Creating one parses the CRS
+        definitions, so they are created once per process and reused
+        """
+        return Transformer.from_crs(
+            f"EPSG:{from_srid}", f"EPSG:{to_srid}", always_xy=True
+        )
+
+    @staticmethod
+    def transform_coordinates(xs, ys, from_srid: int, to_srid: int) -> tuple:
+        """
+        Reprojects sequences of coordinates in a single call
+        :param xs: x coordinates (longitudes for EPSG:4326)
+        :param ys: y coordinates (latitudes for EPSG:4326)
+        :return: tuple of the transformed x and y coordinates
+        """
+        if from_srid == to_srid:
+            return xs, ys
+
+        transformer = GeometryService.get_transformer(from_srid, to_srid)
+        return transformer.transform(xs, ys)
+
+    @staticmethod
+    def transform_geometry(geometry, from_srid: int, to_srid: int):
+        """
+        Reprojects a shapely geometry in process, without a round trip to PostGIS.
+        Shapely passes the coordinates of each ring at once, so every ring is one transform call
+        """
+        if from_srid == to_srid:
+            return geometry
+
+        transformer = GeometryService.get_transformer(from_srid, to_srid)
+        return transform(transformer.transform, geometry)
+
+    @staticmethod
+    def get_web_mercator_area(geometry) -> float:
+        """ Gets the area of a EPSG:4326 geometry in EPSG:3857 square metres """
+        return GeometryService.transform_geometry(geometry, 4326, 3857).area
+
+    @staticmethod
+    def get_geodesic_area(geometry) -> float:
+        """
+        Gets the area of a EPSG:4326 polygon or multipolygon in square metres on the WGS84
+        ellipsoid, matching PostGIS ST_Area(geometry, true)
+        """
+        polygons = geometry.geoms if hasattr(geometry, "geoms") else [geometry]
+
+        area = 0.0
+        for polygon in polygons:
+            # Geod returns a signed area depending on the winding of each ring, so shells are
+            # added and holes subtracted whichever way they are wound
+            area += abs(GeometryService._get_ring_area(polygon.exterior))
+            for interior in polygon.interiors:
+                area -= abs(GeometryService._get_ring_area(interior))
+
+        return area
+
+    @staticmethod
+    def _get_ring_area(ring) -> float:
+        lons, lats = ring.coords.xy
+        ring_area, _ = WGS84_GEOD.polygon_area_perimeter(lons, lats)
+        return ring_area
+
+    @staticmethod
+    def strip_z(geometry):
+        """ Drops the Z dimension of a geometry, as it can't be persisted """
+        if not geometry.has_z:
+            return geometry
+
+        return transform(lambda x, y, z=None: (x, y), geometry)
+
+    @staticmethod
+    def query_tree(tree: STRtree, geometries: list, geometry) -> list:
+        """
+        Gets the indexed geometries whose bounding box intersects the geometry. STRtree returns the
+        geometries up to Shapely 1.8 and their positions from Shapely 2.0
+        :param geometries: the list of geometries the tree was built from
+        """
+        return [
+            item if hasattr(item, "geom_type") else geometries[item]
+            for item in tree.query(geometry)
+        ]
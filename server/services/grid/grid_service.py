@@ -1,11 +1,25 @@
 import geojson
 import json
+import numpy as np
 from shapely.geometry import MultiPolygon, mapping
 from shapely.ops import cascaded_union
+from shapely.prepared import prep
+from shapely.strtree import STRtree
 import shapely.geometry
+import shapely.wkt
 from flask import current_app
 from server.models.dtos.grid_dto import GridDTO
 from server.models.postgis.utils import InvalidGeoJson
+from server.services.geometry_service import GeometryService
+
+# Generated grids are trimmed in chunks of this many squares
+TRIM_CHUNK_SIZE = 5000
+
+# OSM tile grid in EPSG:3857, tile columns and rows are counted from the bottom left corner
+MAX_RESOLUTION = 156543.0339
+AXIS_OFFSET = MAX_RESOLUTION * 256 / 2
+MAX_MERCATOR_LATITUDE = 85.0511287798
+MAX_GRID_SQUARES = 500000
 
 
 class GridServiceError(Exception):
@@ -36,26 +50,193 @@ class GridService:
         )
 
         aoi_multi_polygon = shapely.geometry.shape(aoi_multi_polygon_geojson)
+        intersecting_features = GridService._trim_features(
+            grid["features"], aoi_multi_polygon, clip_to_aoi
+        )
+        return geojson.FeatureCollection(intersecting_features)
+
+    @staticmethod
+    def generate_grid(area_of_interest: dict, zoom: int, clip_to_aoi: bool):
+        """
+        Generates the OSM tile grid of the aoi at the requested zoom level. Only the tiles covering
+        the bounding box of each aoi polygon are generated, then trimmed to the aoi
+        :param area_of_interest: geojson feature collection of the aoi
+        :param zoom: OSM tile zoom level of the task squares
+        :param clip_to_aoi: clip squares partially intersecting the aoi to its outline
+        :raises InvalidGeoJson, GridServiceError
+        :return: Generator of text chunks of the geojson feature collection
+        """
+        aoi_multi_polygon = shapely.geometry.shape(
+            GridService.merge_to_multi_polygon(area_of_interest, dissolve=True)
+        )
+        tile_keys = GridService._get_covering_tile_keys(aoi_multi_polygon, zoom)
+        return GridService._stream_grid(
+            GridService._trim_squares(tile_keys, zoom, aoi_multi_polygon, clip_to_aoi)
+        )
+
+    @staticmethod
+    def generate_tasks(
+        area_of_interest: dict, zoom: int, clip_to_aoi: bool
+    ) -> geojson.FeatureCollection:
+        """
+        Generates the task grid of the aoi as generate_grid does, to create the tasks of a project
+        :raises InvalidGeoJson, GridServiceError
+        """
+        aoi_multi_polygon = shapely.geometry.shape(
+            GridService.merge_to_multi_polygon(area_of_interest, dissolve=True)
+        )
+        tile_keys = GridService._get_covering_tile_keys(aoi_multi_polygon, zoom)
+        features = []
+        for squares in GridService._trim_squares(
+            tile_keys, zoom, aoi_multi_polygon, clip_to_aoi
+        ):
+            features.extend(squares)
+        return geojson.FeatureCollection(features)
+
+    @staticmethod
+    def _get_covering_tile_keys(aoi_multi_polygon: MultiPolygon, zoom: int):
+        """
+        Gets the tiles covering the bounding boxes of the aoi polygons, as sorted x * 2^zoom + y keys
+        :raises GridServiceError if the grid would be too large
+        """
+        tiles_per_side = 2 ** zoom
+        step = AXIS_OFFSET / 2 ** (zoom - 1)
+
+        bounds = np.array([polygon.bounds for polygon in aoi_multi_polygon.geoms])
+        latitudes = bounds[:, [1, 3]].clip(
+            -MAX_MERCATOR_LATITUDE, MAX_MERCATOR_LATITUDE
+        )
+        xs, ys = GeometryService.transform_coordinates(
+            bounds[:, [0, 2]].ravel(), latitudes.ravel(), 4326, 3857
+        )
+        xs = (np.asarray(xs).reshape(-1, 2) + AXIS_OFFSET) / step
+        ys = (np.asarray(ys).reshape(-1, 2) + AXIS_OFFSET) / step
+        x_ranges = np.stack([np.floor(xs[:, 0]), np.ceil(xs[:, 1])], axis=1)
+        y_ranges = np.stack([np.floor(ys[:, 0]), np.ceil(ys[:, 1])], axis=1)
+        x_ranges = x_ranges.clip(0, tiles_per_side).astype(np.int64)
+        y_ranges = y_ranges.clip(0, tiles_per_side).astype(np.int64)
+
+        squares = int(
+            np.sum(
+                (x_ranges[:, 1] - x_ranges[:, 0]) * (y_ranges[:, 1] - y_ranges[:, 0])
+            )
+        )
+        if squares > MAX_GRID_SQUARES:
+            raise GridServiceError(
+                f"Grid would have more than {MAX_GRID_SQUARES} squares, use a lower zoom level"
+            )
+
+        keys = [
+            (
+                np.arange(x_min, x_max)[:, np.newaxis] * tiles_per_side
+                + np.arange(y_min, y_max)
+            ).ravel()
+            for (x_min, x_max), (y_min, y_max) in zip(x_ranges, y_ranges)
+        ]
+        # Bounding boxes of the polygons may overlap, so tiles are deduplicated
+        return np.unique(np.concatenate(keys))
+
+    @staticmethod
+    def _make_squares(tile_keys, zoom: int) -> list:
+        """ Creates the features of the task squares of the tiles, in EPSG:4326 """
+        tiles_per_side = 2 ** zoom
+        step = AXIS_OFFSET / 2 ** (zoom - 1)
+        tile_xs, tile_ys = np.divmod(tile_keys, tiles_per_side)
+
+        # Bottom left and top right corners are transformed in one call
+        corners_x = np.concatenate([tile_xs, tile_xs + 1]) * step - AXIS_OFFSET
+        corners_y = np.concatenate([tile_ys, tile_ys + 1]) * step - AXIS_OFFSET
+        lons, lats = GeometryService.transform_coordinates(
+            corners_x, corners_y, 3857, 4326
+        )
+        lons = np.asarray(lons).reshape(2, -1).T.tolist()
+        lats = np.asarray(lats).reshape(2, -1).T.tolist()
+
+        features = []
+        for x, y, (min_lon, max_lon), (min_lat, max_lat) in zip(
+            tile_xs.tolist(), tile_ys.tolist(), lons, lats
+        ):
+            ring = [
+                [min_lon, min_lat],
+                [max_lon, min_lat],
+                [max_lon, max_lat],
+                [min_lon, max_lat],
+                [min_lon, min_lat],
+            ]
+            features.append(
+                {
+                    "type": "Feature",
+                    "geometry": {"type": "MultiPolygon", "coordinates": [[ring]]},
+                    "properties": {"x": x, "y": y, "zoom": zoom, "isSquare": True},
+                }
+            )
+        return features
+
+    @staticmethod
+    def _trim_squares(tile_keys, zoom, aoi_multi_polygon, clip_to_aoi):
+        """ Generates the squares of the tiles trimmed to the aoi, a chunk at a time """
+        for start in range(0, len(tile_keys), TRIM_CHUNK_SIZE):
+            end = start + TRIM_CHUNK_SIZE
+            squares = GridService._make_squares(tile_keys[start:end], zoom)
+            yield GridService._trim_features(squares, aoi_multi_polygon, clip_to_aoi)
+
+    @staticmethod
+    def _stream_grid(trimmed_squares):
+        yield '{"type": "FeatureCollection", "features": ['
+        separator = ""
+        for squares in trimmed_squares:
+            if not squares:
+                continue
+            yield separator + ", ".join(json.dumps(f) for f in squares)
+            separator = ", "
+        yield "]}"
+
+    @staticmethod
+    def _trim_features(
+        features: list, aoi_multi_polygon: MultiPolygon, clip_to_aoi: bool
+    ) -> list:
+        """
+        Keeps the grid squares intersecting with the aoi, clipping them if requested. Squares are
+        first matched against the bounding boxes of the aoi polygons, so squares fully outside or
+        fully inside a polygon never reach the costly intersection
+        :return: list of the trimmed features
+        """
+        polygons = list(aoi_multi_polygon.geoms)
+        tree = STRtree(polygons)
+        prepared_polygons = {id(polygon): prep(polygon) for polygon in polygons}
+
         intersecting_features = []
-        for feature in grid["features"]:
+        for feature in features:
             # create a shapely shape for the tile
             tile = shapely.geometry.shape(feature["geometry"])
-            if aoi_multi_polygon.contains(tile):
+            candidates = [
+                polygon
+                for polygon in GeometryService.query_tree(tree, polygons, tile)
+                if prepared_polygons[id(polygon)].intersects(tile)
+            ]
+            if not candidates:
+                continue  # tile is completely outside aoi
+
+            if any(prepared_polygons[id(c)].contains(tile) for c in candidates):
                 # tile is completely within aoi, use as is
                 intersecting_features.append(feature)
+                continue
+
+            if len(candidates) == 1:
+                intersection = candidates[0].intersection(tile)
             else:
                 intersection = aoi_multi_polygon.intersection(tile)
-                if intersection.is_empty or intersection.geom_type not in [
-                    "Polygon",
-                    "MultiPolygon",
-                ]:
-                    continue  # this intersections which are not polygons or which are completely outside aoi
-                # tile is partially intersecting the aoi
-                clipped_feature = GridService._update_feature(
-                    clip_to_aoi, feature, intersection
-                )
-                intersecting_features.append(clipped_feature)
-        return geojson.FeatureCollection(intersecting_features)
+            if intersection.is_empty or intersection.geom_type not in [
+                "Polygon",
+                "MultiPolygon",
+            ]:
+                continue  # this intersections which are not polygons or which are completely outside aoi
+            # tile is partially intersecting the aoi
+            clipped_feature = GridService._update_feature(
+                clip_to_aoi, feature, intersection
+            )
+            intersecting_features.append(clipped_feature)
+        return intersecting_features
 
     @staticmethod
     def tasks_from_aoi_features(feature_collection: str) -> geojson.FeatureCollection:
@@ -73,11 +254,8 @@ class GridService:
                 feature.geometry = MultiPolygon([feature.geometry])
             # put the geometry back to geojson
 
-            if feature.geometry.has_z:
-                # Strip Z dimension, as can't persist geometry otherwise.  Most likely exists in KML data
-                feature.geometry = shapely.ops.transform(
-                    GridService._to_2d, feature.geometry
-                )
+            # Strip Z dimension, as can't persist geometry otherwise.  Most likely exists in KML data
+            feature.geometry = GeometryService.strip_z(feature.geometry)
 
             feature.geometry = shapely.geometry.mapping(feature.geometry)
 
@@ -200,23 +378,9 @@ class GridService:
 
         geometry = MultiPolygon(rings)
 
-        # Downsample 3D -> 2D
-        if geometry.has_z:
-            geometry = shapely.ops.transform(GridService._to_2d, geometry)
-        wkt2d = geometry.wkt
-        geom2d = shapely.wkt.loads(wkt2d)
-
-        return geom2d
-
-    def _to_2d(x: tuple, y: tuple, z: tuple = None) -> tuple:
-        """
-        Helper method that can be used to strip out the z-coords from a shapely geometry
-        :param x: tuple containing tuple of x coords
-        :param y: tuple containing tuple of y coords
-        :param z: tuple containing tuple of z coords
-        :return: tuple of containing tuple of x coords and tuple of y coords
-        """
-        return tuple(filter(None, [x, y]))
+        # Downsample 3D -> 2D, the WKT round trip rounds the coordinates as before
+        geometry = GeometryService.strip_z(geometry)
+        return shapely.wkt.loads(geometry.wkt)
 
     @staticmethod
     def _dissolve(geoms: MultiPolygon) -> MultiPolygon:
@@ -1,15 +1,22 @@
 import geojson
-from shapely.geometry import Polygon, MultiPolygon, LineString, shape as shapely_shape
+import json
+from shapely.geometry import (
+    Polygon,
+    MultiPolygon,
+    LineString,
+    mapping,
+    shape as shapely_shape,
+)
 from shapely.ops import split
 from server import db
 from flask import current_app
 from geoalchemy2 import shape
 from server.models.dtos.grid_dto import SplitTaskDTO
 from server.models.dtos.mapping_dto import TaskDTOs
-from server.models.postgis.utils import ST_Transform
 from server.models.postgis.task import Task, TaskStatus, TaskAction
 from server.models.postgis.project import Project
 from server.models.postgis.utils import NotFound, InvalidGeoJson
+from server.services.geometry_service import GeometryService
 
 
 class SplitServiceError(Exception):
@@ -84,14 +91,13 @@ class SplitService:
             [Polygon([(xmin, ymin), (xmax, ymin), (xmax, ymax), (xmin, ymax)])]
         )
 
-        # use the database to transform the geometry from 3857 to 4326
-        transformed_geometry = ST_Transform(shape.from_shape(multipolygon, 3857), 4326)
-
-        # use DB to get the geometry as geojson
-        return geojson.loads(
-            db.engine.execute(transformed_geometry.ST_AsGeoJSON()).scalar()
+        # transform the geometry from 3857 to 4326
+        transformed_geometry = GeometryService.transform_geometry(
+            multipolygon, 3857, 4326
         )
 
+        return geojson.loads(json.dumps(mapping(transformed_geometry)))
+
     @staticmethod
     def _create_split_tasks_from_geometry(task) -> list:
         """
@@ -100,11 +106,7 @@ class SplitService:
         :return: list of {geojson.Feature}
         """
         # Load the task's geometry and calculate its centroid and bbox
-        query = db.session.query(
-            Task.id, Task.geometry.ST_AsGeoJSON().label("geometry")
-        ).filter(Task.id == task.id, Task.project_id == task.project_id)
-        task_geojson = geojson.loads(query[0].geometry)
-        geometry = shapely_shape(task_geojson)
+        geometry = shape.to_shape(task.geometry)
         centroid = geometry.centroid
         minx, miny, maxx, maxy = geometry.bounds
 
@@ -125,11 +127,8 @@ class SplitService:
         split_features = []
         for split_geometry in split_geometries:
             feature = geojson.Feature()
-            # Tasks expect multipolygons. Convert and use the database to get as GeoJSON
-            multipolygon_geometry = shape.from_shape(split_geometry, 4326)
-            feature.geometry = geojson.loads(
-                db.engine.execute(multipolygon_geometry.ST_AsGeoJSON()).scalar()
-            )
+            # Tasks expect multipolygons
+            feature.geometry = geojson.loads(json.dumps(mapping(split_geometry)))
             feature.properties["x"] = None
             feature.properties["y"] = None
             feature.properties["zoom"] = None
@@ -0,0 +1,111 @@
+import datetime
+from cachetools import TTLCache, cached
+from flask import current_app
+from sqlalchemy import func, desc
+
+from server import db
+from server.models.dtos.stats_dto import LeaderboardDTO, LeaderboardEntryDTO
+from server.models.postgis.campaign import campaign_projects
+from server.models.postgis.contribution_stats import ContributionStats
+from server.models.postgis.project import Project
+from server.models.postgis.user import User
+from server.models.postgis.utils import timestamp
+
+leaderboard_cache = TTLCache(maxsize=512, ttl=60)
+
+LEADERBOARD_METRICS = {
+    "mapped": ContributionStats.tasks_mapped,
+    "validated": ContributionStats.tasks_validated,
+    "mapped_area": ContributionStats.area_mapped,
+    "validated_area": ContributionStats.area_validated,
+}
+
+# Number of days each period covers, None meaning all time
+LEADERBOARD_PERIODS = {"day": 1, "week": 7, "month": 30, "year": 365, "all": None}
+
+MAX_LEADERBOARD_SIZE = 100
+
+
+class LeaderboardServiceError(Exception):
+    """ Custom Exception to notify callers an error occurred when handling leaderboards """
+
+    def __init__(self, message):
+        if current_app:
+            current_app.logger.error(message)
+
+
+class LeaderboardService:
+    @staticmethod
+    @cached(leaderboard_cache)
+    def get_leaderboard(
+        scope: str,
+        scope_id: int,
+        metric: str = "mapped",
+        period: str = "month",
+        limit: int = 10,
+    ) -> LeaderboardDTO:
+        """
+        Ranks contributors of a project, organisation or campaign from the precomputed daily totals
+        :param scope: One of project, organisation or campaign
+        :param scope_id: ID of the project, organisation or campaign
+        :param metric: One of mapped, validated, mapped_area, validated_area
+        :param period: One of day, week, month, year, all
+        :param limit: Number of users returned
+        :raises LeaderboardServiceError
+        """
+        if metric not in LEADERBOARD_METRICS:
+            raise LeaderboardServiceError(f"Unknown leaderboard metric {metric}")
+        if period not in LEADERBOARD_PERIODS:
+            raise LeaderboardServiceError(f"Unknown leaderboard period {period}")
+        if limit < 1 or limit > MAX_LEADERBOARD_SIZE:
+            raise LeaderboardServiceError(
+                f"Leaderboard size must be between 1 and {MAX_LEADERBOARD_SIZE}"
+            )
+
+        total = func.sum(LEADERBOARD_METRICS[metric]).label("total")
+        query = (
+            db.session.query(User.username, User.picture_url, total)
+            .select_from(ContributionStats)
+            .join(User, User.id == ContributionStats.user_id)
+        )
+
+        if scope == "project":
+            query = query.filter(ContributionStats.project_id == scope_id)
+        elif scope == "organisation":
+            query = query.join(Project, Project.id == ContributionStats.project_id)
+            query = query.filter(Project.organisation_id == scope_id)
+        elif scope == "campaign":
+            query = query.join(
+                campaign_projects,
+                campaign_projects.c.project_id == ContributionStats.project_id,
+            ).filter(campaign_projects.c.campaign_id == scope_id)
+        else:
+            raise LeaderboardServiceError(f"Unknown leaderboard scope {scope}")
+
+        days = LEADERBOARD_PERIODS[period]
+        if days:
+            since = timestamp().date() - datetime.timedelta(days=days)
+            query = query.filter(ContributionStats.day > since)
+
+        results = (
+            query.group_by(User.id, User.username, User.picture_url)
+            .having(total > 0)
+            .order_by(desc("total"), User.username)
+            .limit(limit)
+            .all()
+        )
+
+        leaderboard_dto = LeaderboardDTO()
+        leaderboard_dto.scope = scope
+        leaderboard_dto.scope_id = scope_id
+        leaderboard_dto.metric = metric
+        leaderboard_dto.period = period
+        for rank, row in enumerate(results, start=1):
+            entry = LeaderboardEntryDTO()
+            entry.rank = rank
+            entry.username = row.username
+            entry.picture_url = row.picture_url
+            entry.value = row.total
+            leaderboard_dto.entries.append(entry)
+
+        return leaderboard_dto
@@ -1,9 +1,8 @@
 import datetime
 import os
-import xml.etree.ElementTree as ET
+from itertools import groupby
 
 from flask import current_app
-from geoalchemy2 import shape
 
 from server.models.dtos.mapping_dto import (
     TaskDTO,
@@ -15,10 +14,16 @@ from server.models.dtos.mapping_dto import (
 from server.models.postgis.statuses import MappingNotAllowed
 from server.models.postgis.task import Task, TaskStatus, TaskHistory, TaskAction
 from server.models.postgis.utils import NotFound, UserLicenseError
+from server.services.cache_service import CacheService
 from server.services.messaging.message_service import MessageService
 from server.services.project_service import ProjectService
 from server.services.stats_service import StatsService
 
+# Exports are streamed in chunks of about 64KB, and finished exports up to 20MB are cached
+EXPORT_CHUNK_SIZE = 64 * 1024
+MAX_CACHED_EXPORT_SIZE = 20 * 1024 * 1024
+EXPORT_CACHE_TTL = 3600
+
 
 class MappingServiceError(Exception):
     """ Custom Exception to notify callers an error occurred when handling mapping """
@@ -123,7 +128,11 @@ class MappingService:
             mapped_task.project_id, mapped_task.task_id, True
         )
         StatsService.update_stats_after_task_state_change(
-            mapped_task.project_id, mapped_task.user_id, last_state, new_state
+            mapped_task.project_id,
+            mapped_task.user_id,
+            last_state,
+            new_state,
+            task_id=task.id,
         )
 
         if mapped_task.comment:
@@ -197,115 +206,143 @@ class MappingService:
         Creates a GPX file for supplied tasks.  Timestamp is for unit testing only.
         You can use the following URL to test locally:
         http://www.openstreetmap.org/edit?editor=id&#map=11/31.50362930069913/34.628906243797054&comment=CHANGSET_COMMENT&gpx=http://localhost:5000/api/v2/projects/{project_id}/tasks/queries/gpx%3Ftasks=2
+        :raises NotFound
+        :return: Generator of utf-8 encoded chunks of the file
         """
+        task_ids = MappingService._parse_task_ids(task_ids_str)
+        cache_key = MappingService._get_export_cache_key("gpx", project_id, task_ids)
+        cached_export = CacheService.get(cache_key)
+        if cached_export is not None:
+            return iter([cached_export])
 
+        MappingService._check_tasks_exist(project_id, task_ids)
         if timestamp is None:
             timestamp = datetime.datetime.utcnow()
 
-        root = ET.Element(
-            "gpx",
-            attrib=dict(
-                xmlns="http://www.topografix.com/GPX/1/1",
-                version="1.1",
-                creator="HOT Tasking Manager",
-            ),
+        return MappingService._stream_export(
+            MappingService._generate_gpx_parts(project_id, task_ids, timestamp),
+            cache_key,
         )
 
-        # Create GPX Metadata element
-        metadata = ET.Element("metadata")
-        link = ET.SubElement(
-            metadata,
-            "link",
-            attrib=dict(href="https://github.com/hotosm/tasking-manager"),
+    @staticmethod
+    def _generate_gpx_parts(project_id: int, task_ids, timestamp):
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+        yield (
+            '<gpx xmlns="http://www.topografix.com/GPX/1/1" version="1.1" creator="HOT Tasking Manager">'
+            '<metadata><link href="https://github.com/hotosm/tasking-manager">'
+            f"<text>HOT Tasking Manager</text></link><time>{timestamp.isoformat()}</time></metadata>"
+            f"<trk><name>Task for project {project_id}. Do not edit outside of this area!</name>"
         )
-        ET.SubElement(link, "text").text = "HOT Tasking Manager"
-        ET.SubElement(metadata, "time").text = timestamp.isoformat()
-        root.append(metadata)
-
-        # Create trk element
-        trk = ET.Element("trk")
-        root.append(trk)
-        ET.SubElement(
-            trk, "name"
-        ).text = f"Task for project {project_id}. Do not edit outside of this area!"
-
-        # Construct trkseg elements
-        if task_ids_str is not None:
-            task_ids = map(int, task_ids_str.split(","))
-            tasks = Task.get_tasks(project_id, task_ids)
-            if not tasks or len(tasks) == 0:
-                raise NotFound()
-        else:
-            tasks = Task.get_all_tasks(project_id)
-            if not tasks or len(tasks) == 0:
-                raise NotFound()
-
-        for task in tasks:
-            task_geom = shape.to_shape(task.geometry)
-            for poly in task_geom:
-                trkseg = ET.SubElement(trk, "trkseg")
-                for point in poly.exterior.coords:
-                    ET.SubElement(
-                        trkseg,
-                        "trkpt",
-                        attrib=dict(lon=str(point[0]), lat=str(point[1])),
-                    )
-
-                    # Append wpt elements to end of doc
-                    wpt = ET.Element(
-                        "wpt", attrib=dict(lon=str(point[0]), lat=str(point[1]))
-                    )
-                    root.append(wpt)
-
-        xml_gpx = ET.tostring(root, encoding="utf8")
-        return xml_gpx
+
+        # Each outer ring is a track segment
+        segment = None
+        for point in Task.get_exterior_points(project_id, task_ids):
+            if (point.task_id, point.polygon) != segment:
+                yield "<trkseg>" if segment is None else "</trkseg><trkseg>"
+                segment = (point.task_id, point.polygon)
+            yield f'<trkpt lon="{point.lon!r}" lat="{point.lat!r}" />'
+        if segment is not None:
+            yield "</trkseg>"
+        yield "</trk>"
+
+        # Waypoints follow the track, so the points are streamed a second time
+        for point in Task.get_exterior_points(project_id, task_ids):
+            yield f'<wpt lon="{point.lon!r}" lat="{point.lat!r}" />'
+        yield "</gpx>"
 
     @staticmethod
-    def generate_osm_xml(project_id: int, task_ids_str: str) -> str:
+    def generate_osm_xml(project_id: int, task_ids_str: str):
         """ Generate xml response suitable for loading into JOSM.  A sample output file is in
-            /server/helpers/testfiles/osm-sample.xml """
-        # Note XML created with upload No to ensure it will be rejected by OSM if uploaded by mistake
-        root = ET.Element(
-            "osm",
-            attrib=dict(version="0.6", upload="never", creator="HOT Tasking Manager"),
+            /server/helpers/testfiles/osm-sample.xml
+            :raises NotFound
+            :return: Generator of utf-8 encoded chunks of the file """
+        task_ids = MappingService._parse_task_ids(task_ids_str)
+        cache_key = MappingService._get_export_cache_key("osm", project_id, task_ids)
+        cached_export = CacheService.get(cache_key)
+        if cached_export is not None:
+            return iter([cached_export])
+
+        MappingService._check_tasks_exist(project_id, task_ids)
+        return MappingService._stream_export(
+            MappingService._generate_osm_xml_parts(project_id, task_ids), cache_key
         )
 
-        if task_ids_str:
-            task_ids = map(int, task_ids_str.split(","))
-            tasks = Task.get_tasks(project_id, task_ids)
-            if not tasks or len(tasks) == 0:
-                raise NotFound()
-        else:
-            tasks = Task.get_all_tasks(project_id)
-            if not tasks or len(tasks) == 0:
-                raise NotFound()
+    @staticmethod
+    def _generate_osm_xml_parts(project_id: int, task_ids):
+        # Note XML created with upload No to ensure it will be rejected by OSM if uploaded by mistake
+        yield '<?xml version="1.0" encoding="UTF-8"?>\n'
+        yield '<osm version="0.6" upload="never" creator="HOT Tasking Manager">'
 
         fake_id = -1  # We use fake-ids to ensure XML will not be validated by OSM
-        for task in tasks:
-            task_geom = shape.to_shape(task.geometry)
-            way = ET.SubElement(
-                root,
-                "way",
-                attrib=dict(id=str((task.id * -1)), action="modify", visible="true"),
-            )
-            for poly in task_geom:
-                for point in poly.exterior.coords:
-                    ET.SubElement(
-                        root,
-                        "node",
-                        attrib=dict(
-                            action="modify",
-                            visible="true",
-                            id=str(fake_id),
-                            lon=str(point[0]),
-                            lat=str(point[1]),
-                        ),
-                    )
-                    ET.SubElement(way, "nd", attrib=dict(ref=str(fake_id)))
-                    fake_id -= 1
-
-        xml_gpx = ET.tostring(root, encoding="utf8")
-        return xml_gpx
+        for task_id, points in groupby(
+            Task.get_exterior_points(project_id, task_ids), key=lambda p: p.task_id
+        ):
+            # The way refers to the nodes that follow it, points of a single task are held at once
+            points = list(points)
+            node_ids = range(fake_id, fake_id - len(points), -1)
+            yield f'<way id="{task_id * -1}" action="modify" visible="true">'
+            yield "".join(f'<nd ref="{node_id}" />' for node_id in node_ids)
+            yield "</way>"
+            for node_id, point in zip(node_ids, points):
+                yield (
+                    f'<node action="modify" visible="true" id="{node_id}" '
+                    f'lon="{point.lon!r}" lat="{point.lat!r}" />'
+                )
+            fake_id -= len(points)
+        yield "</osm>"
+
+    @staticmethod
+    def _parse_task_ids(task_ids_str: str) -> list:
+        if not task_ids_str:
+            return None
+
+        return sorted(set(map(int, task_ids_str.split(","))))
+
+    @staticmethod
+    def _get_export_cache_key(export_format: str, project_id: int, task_ids) -> str:
+        """ Exports are cached against the project version, so any task change invalidates them """
+        tasks_key = ",".join(map(str, task_ids)) if task_ids else "all"
+        return CacheService.get_project_key(f"{export_format}:{tasks_key}", project_id)
+
+    @staticmethod
+    def _check_tasks_exist(project_id: int, task_ids):
+        """ Raises NotFound before streaming starts, as errors can't be returned mid stream """
+        query = Task.query.with_entities(Task.id).filter(Task.project_id == project_id)
+        if task_ids:
+            query = query.filter(Task.id.in_(task_ids))
+        if query.first() is None:
+            raise NotFound()
+
+    @staticmethod
+    def _stream_export(parts, cache_key: str):
+        """
+        Joins the parts of an export into chunks of about EXPORT_CHUNK_SIZE bytes. The finished
+        export is cached, unless larger than MAX_CACHED_EXPORT_SIZE
+        """
+        chunks = []
+        exported_size = 0
+        buffer = []
+        buffer_size = 0
+        for part in parts:
+            buffer.append(part)
+            buffer_size += len(part)
+            if buffer_size < EXPORT_CHUNK_SIZE:
+                continue
+
+            chunk = "".join(buffer).encode("utf-8")
+            buffer, buffer_size = [], 0
+            exported_size += len(chunk)
+            if exported_size <= MAX_CACHED_EXPORT_SIZE:
+                chunks.append(chunk)
+            yield chunk
+
+        chunk = "".join(buffer).encode("utf-8")
+        exported_size += len(chunk)
+        yield chunk
+
+        if exported_size <= MAX_CACHED_EXPORT_SIZE:
+            chunks.append(chunk)
+            CacheService.set(cache_key, b"".join(chunks), EXPORT_CACHE_TTL)
 
     @staticmethod
     def undo_mapping(
@@ -324,7 +361,12 @@ class MappingService:
         last_action = TaskHistory.get_last_action(project_id, task_id)
 
         StatsService.update_stats_after_task_state_change(
-            project_id, last_action.user_id, current_state, undo_state, "undo"
+            project_id,
+            last_action.user_id,
+            current_state,
+            undo_state,
+            "undo",
+            task_id=task_id,
         )
 
         task.unlock_task(
@@ -0,0 +1,309 @@
+import datetime
+import logging
+import math
+import smtplib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from typing import Optional
+
+from flask import current_app
+
+from server import db
+from server.models.dtos.stats_dto import EmailQueueStatsDTO
+from server.models.postgis.email_outbox import EmailOutbox
+from server.models.postgis.utils import timestamp
+
+# Socket timeouts a single email can run into at worst: the send on a dropped connection, the new
+# connection and the send on it
+SMTP_TIMEOUTS_PER_EMAIL = 3
+
+# Added to the worst case time of a batch before its claim runs out
+CLAIM_LEASE_MARGIN = 60
+
+# Failed deliveries are retried after 30s, 1m, 2m... up to every 6 hours
+RETRY_BASE_DELAY = 30
+MAX_RETRY_DELAY = 6 * 60 * 60
+
+SMTP_TIMEOUT = 30
+
+
+class TokenBucket:
+    """
+    Rate limiter shared by the sending threads. Tokens refill at a steady rate up to the capacity,
+    so short bursts go out at once while the average rate stays within the limit of the relay
+    """
+
+    def __init__(self, rate: float, capacity: float = None, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, sleep=time.sleep):
+        """
+        Takes a token, waiting for it to refill if the bucket is empty. Tokens are reserved ahead,
+        so threads waiting together are spread out rather than woken at once
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate
+
+        if wait > 0:
+            sleep(wait)
+
+
+class SMTPConnectionPool:
+    """
+    SMTP connections kept open between messages, one per sending thread as an smtplib connection
+    can't be shared. Relays close idle connections, so a dropped connection is reopened once
+    """
+
+    def __init__(self, smtp_settings: dict, rate_limiter: TokenBucket = None):
+        self.smtp_settings = smtp_settings
+        self.rate_limiter = rate_limiter
+        self._connections = {}
+        self._lock = threading.Lock()
+
+    def send(self, from_address: str, to_address: str, message: str):
+        """ Sends a message on the connection of the calling thread, raises smtplib errors """
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+
+        connection = self._connections.get(threading.get_ident())
+        if connection is not None:
+            try:
+                connection.sendmail(from_address, to_address, message)
+                return
+            except OSError as e:
+                if not self._is_connection_error(e):
+                    raise
+                self._discard()
+
+        connection = self._connect()
+        try:
+            connection.sendmail(from_address, to_address, message)
+        except OSError as e:
+            if self._is_connection_error(e):
+                self._discard()
+            raise
+
+    def close(self):
+        """ Closes every open connection, they are reopened on demand """
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+
+        for connection in connections:
+            try:
+                connection.quit()
+            except (smtplib.SMTPException, OSError):
+                pass  # The relay may already have dropped it
+
+    def _connect(self) -> smtplib.SMTP:
+        connection = smtplib.SMTP(
+            self.smtp_settings["host"],
+            port=int(self.smtp_settings["smtp_port"]),
+            timeout=SMTP_TIMEOUT,
+        )
+        try:
+            connection.ehlo()
+            if connection.has_extn("starttls"):
+                connection.starttls()
+                connection.ehlo()
+            if self.smtp_settings.get("smtp_user"):
+                connection.login(
+                    self.smtp_settings["smtp_user"],
+                    self.smtp_settings["smtp_password"],
+                )
+        except OSError:
+            connection.close()
+            raise
+
+        with self._lock:
+            self._connections[threading.get_ident()] = connection
+        return connection
+
+    def _discard(self):
+        with self._lock:
+            connection = self._connections.pop(threading.get_ident(), None)
+        if connection is not None:
+            connection.close()
+
+    @staticmethod
+    def _is_connection_error(error: OSError) -> bool:
+        """ SMTP errors are OSErrors too, but only a lost connection makes it unusable """
+        return isinstance(error, smtplib.SMTPServerDisconnected) or not isinstance(
+            error, smtplib.SMTPException
+        )
+
+
+class EmailQueueService:
+    @staticmethod
+    def get_queue_stats() -> EmailQueueStatsDTO:
+        """ Gets the depth of the outbound email queue """
+        return EmailOutbox.get_queue_stats()
+
+    @staticmethod
+    def run_worker(poll_interval: float = 5.0, once: bool = False):
+        """
+        Delivers queued emails until stopped, polling the queue when it is empty
+        :param poll_interval: Seconds to wait between polls of an empty queue
+        :param once: Return once the queue holds no due emails
+        """
+        batch_size = current_app.config["MAIL_WORKER_BATCH_SIZE"]
+        concurrency = current_app.config["MAIL_WORKER_CONCURRENCY"]
+        rate_limit = current_app.config["MAIL_WORKER_RATE_LIMIT"]
+        pool = SMTPConnectionPool(
+            current_app.config["SMTP_SETTINGS"],
+            TokenBucket(rate_limit) if rate_limit > 0 else None,
+        )
+        lease_seconds = EmailQueueService.get_claim_lease(
+            batch_size, concurrency, rate_limit
+        )
+
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                while True:
+                    processed = EmailQueueService.process_batch(
+                        executor, pool, batch_size, lease_seconds
+                    )
+                    if processed == batch_size:
+                        continue  # There may be more due emails waiting
+
+                    if once:
+                        break
+
+                    # Don't hold on to relay connections while the queue is idle
+                    if processed == 0:
+                        pool.close()
+                    time.sleep(poll_interval)
+        finally:
+            pool.close()
+
+    @staticmethod
+    def get_claim_lease(batch_size: int, concurrency: int, rate_limit: float) -> int:
+        """
+        Gets the seconds a claimed batch stays hidden from other workers. It covers the worst case
+        of every email of a connection running into the SMTP timeouts, plus the wait for the rate
+        limit, so other workers never send a batch that is still being sent
+        """
+        emails_per_connection = math.ceil(batch_size / concurrency)
+        worst_case = emails_per_connection * SMTP_TIMEOUTS_PER_EMAIL * SMTP_TIMEOUT
+        if rate_limit > 0:
+            worst_case += batch_size / rate_limit
+
+        return math.ceil(worst_case) + CLAIM_LEASE_MARGIN
+
+    @staticmethod
+    def process_batch(
+        executor, pool: SMTPConnectionPool, batch_size: int, lease_seconds: int
+    ) -> int:
+        """ Claims and sends a batch of due emails, returns the number of emails processed """
+        lease_until = timestamp() + datetime.timedelta(seconds=lease_seconds)
+        emails = EmailOutbox.claim_batch(batch_size, lease_until)
+        db.session.commit()
+        if not emails:
+            return 0
+
+        from_address = current_app.config["EMAIL_FROM_ADDRESS"]
+        if current_app.config["LOG_LEVEL"] == logging.DEBUG:
+            for email in emails:
+                current_app.logger.debug(
+                    EmailQueueService.build_message(from_address, email)
+                )
+            errors = [None] * len(emails)
+        else:
+            errors = list(
+                executor.map(
+                    lambda email: EmailQueueService._deliver(pool, from_address, email),
+                    emails,
+                )
+            )
+
+        sent = [email.id for email, error in zip(emails, errors) if error is None]
+        EmailOutbox.remove_sent(sent)
+        for email, error in zip(emails, errors):
+            if error is None:
+                continue
+
+            retry_at = EmailQueueService.get_retry_date(
+                email.attempts, current_app.config["MAIL_WORKER_MAX_ATTEMPTS"], error
+            )
+            EmailOutbox.record_failure(email.id, str(error), retry_at)
+            if retry_at is None:
+                current_app.logger.error(
+                    f"Giving up on email {email.id} to {email.to_address}: {str(error)}"
+                )
+        db.session.commit()
+
+        current_app.logger.info(
+            f"Sent {len(sent)} of {len(emails)} queued emails, "
+            f"{len(emails) - len(sent)} failed"
+        )
+        return len(emails)
+
+    @staticmethod
+    def get_retry_date(
+        attempts: int,
+        max_attempts: int,
+        error: Exception,
+        now: datetime.datetime = None,
+    ) -> Optional[datetime.datetime]:
+        """
+        Gets when a failed email is tried again, None when it should not be retried because the
+        relay rejected it permanently or it ran out of attempts
+        """
+        if EmailQueueService._is_permanent_error(error):
+            return None
+        if attempts >= max_attempts:
+            return None
+
+        delay = min(RETRY_BASE_DELAY * 2 ** (attempts - 1), MAX_RETRY_DELAY)
+        return (now or timestamp()) + datetime.timedelta(seconds=delay)
+
+    @staticmethod
+    def build_message(from_address: str, email) -> str:
+        """ Builds the multipart message of a queued email """
+        msg = MIMEMultipart("alternative")
+        msg["Subject"] = email.subject
+        msg["From"] = from_address
+        msg["To"] = email.to_address
+
+        # Record the MIME types of both parts - text/plain and text/html.
+        msg.attach(MIMEText(email.text_message or "", "plain"))
+        msg.attach(MIMEText(email.html_message or "", "html"))
+        return msg.as_string()
+
+    @staticmethod
+    def _deliver(pool: SMTPConnectionPool, from_address: str, email):
+        """ Sends a queued email, returns the error if it failed """
+        try:
+            pool.send(
+                from_address,
+                email.to_address,
+                EmailQueueService.build_message(from_address, email),
+            )
+        except OSError as e:
+            return e
+
+        return None
+
+    @staticmethod
+    def _is_permanent_error(error: Exception) -> bool:
+        """ 5xx replies are permanent, anything else may succeed later """
+        if isinstance(error, smtplib.SMTPRecipientsRefused):
+            return all(code >= 500 for code, _ in error.recipients.values())
+        if isinstance(error, smtplib.SMTPResponseException):
+            return error.smtp_code >= 500
+
+        return False
@@ -0,0 +1,142 @@
+import datetime
+import time
+
+from flask import current_app
+
+from server import db
+from server.models.postgis.message import Message, MessageType
+from server.models.postgis.utils import timestamp
+
+# Messages deleted per transaction by the purge, small enough to keep locks and WAL bursts short
+PURGE_BATCH_SIZE = 5000
+
+
+class MessageRetentionServiceError(Exception):
+    """ Custom Exception to notify callers an error occurred when applying message retention """
+
+    def __init__(self, message):
+        if current_app:
+            current_app.logger.error(message)
+
+
+class MessageRetentionService:
+    @staticmethod
+    def get_retention_policies() -> dict:
+        """
+        Gets the days messages of each type are kept, from MESSAGE_RETENTION_DAYS
+        :raises: MessageRetentionServiceError if a policy is not a known type and positive days
+        """
+        policies = {}
+        for policy in current_app.config["MESSAGE_RETENTION_DAYS"].split(","):
+            if not policy.strip():
+                continue
+
+            try:
+                type_name, days = policy.split(":")
+                days = int(days)
+            except ValueError:
+                raise MessageRetentionServiceError(
+                    f"Invalid policy {policy.strip()} in MESSAGE_RETENTION_DAYS, "
+                    "expected MessageType:days"
+                )
+
+            if days <= 0:
+                raise MessageRetentionServiceError(
+                    f"Days to keep {type_name.strip()} messages must be positive"
+                )
+
+            try:
+                policies[MessageType[type_name.strip()]] = days
+            except KeyError:
+                raise MessageRetentionServiceError(
+                    f"Unknown message type {type_name.strip()} in MESSAGE_RETENTION_DAYS"
+                )
+
+        return policies
+
+    @staticmethod
+    def purge_expired_messages(
+        batch_size: int = PURGE_BATCH_SIZE, pause: float = 0
+    ) -> int:
+        """
+        Deletes the messages older than the retention of their type, a batch per transaction so
+        inboxes are never locked for long. Monthly partitions left empty are dropped
+        :param pause: Seconds to wait between batches, giving vacuum and replicas time to keep up
+        :returns: Number of messages deleted
+        """
+        policies = MessageRetentionService.get_retention_policies()
+        now = timestamp()
+        purged = 0
+        for message_type, days in policies.items():
+            before = now - datetime.timedelta(days=days)
+            while True:
+                deleted = Message.purge_batch(message_type.value, before, batch_size)
+                db.session.commit()
+                purged += deleted
+                if deleted < batch_size:
+                    break
+
+                time.sleep(pause)
+
+            current_app.logger.info(
+                f"Purged {message_type.name} messages from before {before:%Y-%m-%d}"
+            )
+
+        if Message.is_partitioned():
+            MessageRetentionService.drop_empty_partitions(now)
+
+        return purged
+
+    @staticmethod
+    def drop_empty_partitions(now: datetime.datetime) -> list:
+        """ Drops the empty monthly partitions of past months, returns their names """
+        current_partition = MessageRetentionService.get_partition_name(now)
+        dropped = []
+        for name in Message.get_monthly_partitions():
+            if name >= current_partition:
+                break
+
+            if Message.drop_partition_if_empty(name):
+                dropped.append(name)
+        db.session.commit()
+
+        return dropped
+
+    @staticmethod
+    def partition_messages(months_ahead: int = 3) -> list:
+        """
+        Partitions messages by month the first time it is run, and creates the partitions of the
+        coming months. Run it monthly so new messages never land in the default partition
+        :returns: Names of the partitions created
+        """
+        next_month = MessageRetentionService.add_months(timestamp(), 1)
+        if not Message.is_partitioned():
+            # The current month stays in the partition of the existing messages
+            Message.partition_by_month(next_month)
+            current_app.logger.info("Partitioned messages by month")
+
+        existing = set(Message.get_monthly_partitions())
+        created = []
+        for offset in range(months_ahead):
+            month_start = MessageRetentionService.add_months(next_month, offset)
+            name = MessageRetentionService.get_partition_name(month_start)
+            if name in existing:
+                continue
+
+            Message.create_monthly_partition(
+                name, month_start, MessageRetentionService.add_months(month_start, 1)
+            )
+            created.append(name)
+        db.session.commit()
+
+        return created
+
+    @staticmethod
+    def get_partition_name(date: datetime.datetime) -> str:
+        return f"messages_y{date.year:04d}m{date.month:02d}"
+
+    @staticmethod
+    def add_months(date: datetime.datetime, months: int) -> datetime.date:
+        """ Gets the first day of the month the given number of months after the date """
+        month_index = date.year * 12 + date.month - 1 + months
+        return datetime.date(month_index // 12, month_index % 12 + 1, 1)
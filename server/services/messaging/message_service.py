@@ -1,13 +1,14 @@
+import base64
 import re
-import time
 import datetime
+from itertools import groupby
 
-from cachetools import TTLCache, cached
 from typing import List
 from flask import current_app
-from sqlalchemy import text, func
+from sqlalchemy import text, tuple_
+from sqlalchemy.orm import joinedload
 
-from server import create_app, db
+from server import db
 from server.models.dtos.message_dto import MessageDTO, MessagesDTO
 from server.models.dtos.stats_dto import Pagination
 from server.models.postgis.message import Message, MessageType, NotFound
@@ -15,12 +16,18 @@ from server.models.postgis.notification import Notification
 from server.models.postgis.project_info import ProjectInfo
 from server.models.postgis.task import TaskStatus
 from server.services.messaging.smtp_service import SMTPService
-from server.services.messaging.template_service import get_template, get_profile_url
+from server.services.messaging.template_service import (
+    render_template,
+    get_profile_url,
+)
 from server.services.users.user_service import UserService, User
-from server.services.project_service import Project
 
 
-message_cache = TTLCache(maxsize=512, ttl=30)
+# Most recent contributors listed for each project of a digest
+DIGEST_MAX_CONTRIBUTORS = 15
+
+# Digests written per insert
+DIGEST_BATCH_SIZE = 1000
 
 
 class MessageServiceError(Exception):
@@ -35,11 +42,10 @@ class MessageService:
     @staticmethod
     def send_welcome_message(user: User):
         """ Sends welcome message to all new users at Sign up"""
-        text_template = get_template("welcome_message_en.txt")
-
-        text_template = text_template.replace("[USERNAME]", user.username)
-        text_template = text_template.replace(
-            "[PROFILE_LINK]", get_profile_url(user.username)
+        text_template = render_template(
+            "welcome_message.txt",
+            username=user.username,
+            profile_url=get_profile_url(user.username),
         )
 
         welcome_message = Message()
@@ -63,18 +69,17 @@ class MessageService:
         if user.validation_message is False:
             return  # No need to send validation message
 
-        text_template = get_template(
-            "invalidation_message_en.txt"
-            if status == TaskStatus.INVALIDATED
-            else "validation_message_en.txt"
-        )
         status_text = (
             "marked invalid" if status == TaskStatus.INVALIDATED else "validated"
         )
         task_link = MessageService.get_task_link(project_id, task_id)
-
-        text_template = text_template.replace("[USERNAME]", user.username)
-        text_template = text_template.replace("[TASK_LINK]", task_link)
+        text_template = render_template(
+            "invalidation_message.txt"
+            if status == TaskStatus.INVALIDATED
+            else "validation_message.txt",
+            username=user.username,
+            task_link=task_link,
+        )
 
         validation_message = Message()
         validation_message.message_type = (
@@ -93,91 +98,70 @@ class MessageService:
         SMTPService.send_email_alert(user.email_address, user.username)
 
     @staticmethod
-    def send_message_to_all_contributors(project_id: int, message_dto: MessageDTO):
-        """  Sends supplied message to all contributors on specified project.  Message all contributors can take
-             over a minute to run, so this method is expected to be called on its own thread """
-
-        app = (
-            create_app()
-        )  # Because message-all run on background thread it needs it's own app context
-
-        with app.app_context():
-            contributors = Message.get_all_contributors(project_id)
-
-            project_link = MessageService.get_project_link(project_id)
-
-            message_dto.message = (
-                f"{project_link}<br/><br/>" + message_dto.message
-            )  # Append project link to end of message
-
-            msg_count = 0
-            for contributor in contributors:
-                message = Message.from_dto(contributor[0], message_dto)
-                message.message_type = MessageType.BROADCAST.value
-                message.project_id = project_id
-                message.save()
-                user = UserService.get_user_by_id(contributor[0])
-                SMTPService.send_email_alert(user.email_address, user.username)
-                msg_count += 1
-                if msg_count == 10:
-                    time.sleep(
-                        0.5
-                    )  # Sleep for 0.5 seconds to avoid hitting AWS rate limits every 10 messages
-                    msg_count = 0
+    def send_message_to_all_contributors(
+        project_id: int, message_dto: MessageDTO
+    ) -> int:
+        """
+        Sends supplied message to all contributors on specified project. Messages are inserted
+        with a single statement and the email alerts are queued for the mail worker, whose rate
+        limit keeps within the limits of the SMTP relay
+        :returns: Number of contributors messaged
+        """
+        project_link = MessageService.get_project_link(project_id)
+
+        message_dto.message = (
+            f"{project_link}<br/><br/>" + message_dto.message
+        )  # Append project link to end of message
+
+        contributor_ids = Message.broadcast_to_contributors(project_id, message_dto)
+        SMTPService.send_email_alerts(contributor_ids)
+        db.session.commit()
+
+        return len(contributor_ids)
 
     @staticmethod
     def send_message_after_comment(
         comment_from: int, comment: str, task_id: int, project_id: int
     ):
-        """ Will send a canned message to anyone @'d in a comment """
-        usernames = MessageService._parse_message_for_username(comment)
+        """
+        Will send a canned message to anyone @'d in a comment, and to the users who worked on the
+        task. Recipients are resolved, messaged and emailed with a query each however many there are
+        """
+        usernames = sorted(set(MessageService._parse_message_for_username(comment)))
         if len(usernames) == 0:
             return  # Nobody @'d so return
 
-        if len(usernames) != 0:
-            task_link = MessageService.get_task_link(project_id, task_id)
-            # project_title = ProjectService.get_project_title(project_id)
-            for username in usernames:
-
-                try:
-                    user = UserService.get_user_by_username(username)
-                except NotFound:
-                    continue  # If we can't find the user, keep going no need to fail
-
-                message = Message()
-                message.message_type = MessageType.MENTION_NOTIFICATION.value
-                message.project_id = project_id
-                message.task_id = task_id
-                message.from_user_id = comment_from
-                message.to_user_id = user.id
-                message.subject = f"You were mentioned in a comment in Project {project_id} on {task_link}"
-                message.message = comment
-                message.add_message()
-                SMTPService.send_email_alert(user.email_address, user.username)
+        recipients = Message.get_task_comment_recipients(
+            project_id, task_id, comment_from, usernames
+        )
+        if len(recipients) == 0:
+            return
 
-        query = """ select user_id from task_history where project_id = :project_id and task_id = :task_id
-                    and action = 'STATE_CHANGE'"""
-        result = db.engine.execute(text(query), project_id=project_id, task_id=task_id)
-        contributed_users = [r[0] for r in result]
+        task_link = MessageService.get_task_link(project_id, task_id)
+        messages = []
+        for user_id, mentioned in recipients:
+            message = dict(
+                project_id=project_id,
+                task_id=task_id,
+                to_user_id=user_id,
+                message=comment,
+            )
+            if mentioned:
+                message.update(
+                    message_type=MessageType.MENTION_NOTIFICATION.value,
+                    from_user_id=comment_from,
+                    subject=f"You were mentioned in a comment in Project {project_id} on {task_link}",
+                )
+            else:
+                message.update(
+                    message_type=MessageType.TASK_COMMENT_NOTIFICATION.value,
+                    from_user_id=None,
+                    subject=f"{comment_from} left a comment in Project {project_id} on {task_link}",
+                )
+            messages.append(message)
 
-        if len(contributed_users) != 0:
-            task_link = MessageService.get_task_link(project_id, task_id)
-            # project_title = ProjectService.get_project_title(project_id)
-            for user_id in contributed_users:
-                try:
-                    user = UserService.get_user_dto_by_id(user_id)
-                except NotFound:
-                    continue  # If we can't find the user, keep going no need to fail
-
-                message = Message()
-                message.message_type = MessageType.TASK_COMMENT_NOTIFICATION.value
-                message.project_id = project_id
-                message.task_id = task_id
-                message.to_user_id = user.id
-                message.subject = f"{comment_from} left a comment in Project {project_id} on {task_link}"
-                message.message = comment
-                message.add_message()
-                SMTPService.send_email_alert(user.email_address, user.username)
+        Message.add_messages(messages)
+        SMTPService.send_email_alerts([user_id for user_id, _ in recipients])
 
     @staticmethod
     def send_request_to_join_team(
@@ -300,57 +284,70 @@ class MessageService:
                 SMTPService.send_email_alert(user.email_address, user.username)
 
     @staticmethod
-    def send_favorite_project_activities(user_id: int):
-        current_app.logger.debug("Sending Favorite Project Activities")
-        favorited_projects = UserService.get_projects_favorited(user_id)
-        contributed_projects = UserService.get_projects_mapped(user_id)
-        if contributed_projects is None:
-            contributed_projects = []
-
-        for favorited_project in favorited_projects.favorited_projects:
-            contributed_projects.append(favorited_project.project_id)
-
-        recently_updated_projects = (
-            Project.query.with_entities(
-                Project.id, func.DATE(Project.last_updated).label("last_updated")
-            )
-            .filter(Project.id.in_(contributed_projects))
-            .filter(
-                func.DATE(Project.last_updated)
-                > datetime.date.today() - datetime.timedelta(days=300)
-            )
-        )
-        user = UserService.get_user_dto_by_id(user_id)
-        for project in recently_updated_projects:
-            activity_message = []
-            query_last_active_users = """ select distinct(user_id) from
-                                        (select user_id from task_history where project_id = :project_id
-                                        order by action_date desc limit 15 ) t """
-            last_active_users = db.engine.execute(
-                text(query_last_active_users), project_id=project.id
-            )
-
-            for recent_user_id in last_active_users:
-                recent_user_details = UserService.get_user_by_id(recent_user_id)
-                user_profile_link = MessageService.get_user_profile_link(
-                    recent_user_details.username
+    def send_activity_digests(since: datetime.datetime) -> int:
+        """
+        Sends every user one message summarising the activity on the projects they mapped,
+        validated or favorited since the given date, and queues one email alert each.
+        Meant to run nightly, see manage.py send_activity_digests
+        :returns: Number of users messaged
+        """
+        base_url = current_app.config["APP_BASE_URL"]
+        rows = Message.get_activity_digests(since, DIGEST_MAX_CONTRIBUTORS)
+
+        digests_sent = 0
+        messages = []
+        for user_id, projects in groupby(rows, key=lambda row: row.user_id):
+            activities = []
+            for project in projects:
+                contributor_links = [
+                    MessageService.get_user_profile_link(username, base_url)
+                    for contributor_id, username in zip(
+                        project.user_ids, project.usernames
+                    )
+                    if contributor_id != user_id
+                ]
+                if not contributor_links:
+                    continue  # Nobody but the user worked on the project
+
+                project_link = MessageService.get_project_link(
+                    project.project_id, base_url
+                )
+                activities.append(
+                    f"{', '.join(contributor_links)} contributed to Project {project_link} recently"
                 )
-                activity_message.append(user_profile_link)
 
-            activity_message = str(activity_message)[1:-1]
-            project_link = MessageService.get_project_link(project.id)
-            message = Message()
-            message.message_type = MessageType.PROJECT_ACTIVITY_NOTIFICATION.value
-            message.project_id = project.id
-            message.to_user_id = user.id
-            message.subject = (
-                "Recent activities from your contributed/favorited Projects"
-            )
-            message.message = (
-                f"{activity_message} contributed to Project {project_link} recently"
+            if not activities:
+                continue
+
+            messages.append(
+                dict(
+                    message_type=MessageType.PROJECT_ACTIVITY_NOTIFICATION.value,
+                    from_user_id=None,
+                    to_user_id=user_id,
+                    project_id=None,
+                    task_id=None,
+                    subject="Recent activities from your contributed/favorited Projects",
+                    message="<br/>".join(activities),
+                )
             )
-            message.add_message()
-            SMTPService.send_email_alert(user.email_address, user.username)
+            if len(messages) == DIGEST_BATCH_SIZE:
+                MessageService._send_digest_batch(messages)
+                digests_sent += len(messages)
+                messages = []
+
+        MessageService._send_digest_batch(messages)
+        digests_sent += len(messages)
+        db.session.commit()
+
+        return digests_sent
+
+    @staticmethod
+    def _send_digest_batch(messages: list):
+        if not messages:
+            return
+
+        Message.add_messages(messages)
+        SMTPService.send_email_alerts([message["to_user_id"] for message in messages])
 
     @staticmethod
     def resend_email_validation(user_id: int):
@@ -374,7 +371,6 @@ class MessageService:
         return usernames
 
     @staticmethod
-    @cached(message_cache)
     def has_user_new_messages(user_id: int) -> dict:
         """ Determines if the user has any unread messages """
         count = Notification.get_unread_message_count(user_id)
@@ -397,14 +393,16 @@ class MessageService:
         from_username=None,
         project=None,
         task_id=None,
+        cursor=None,
     ):
-        """ Get all messages for user """
+        """
+        Get all messages for user. With a cursor, the page after it is read from the inbox index
+        without counting or skipping the messages before it; an empty cursor gets the first page
+        """
         sort_column = Message.__table__.columns.get(sort_by)
         if sort_column is None:
             sort_column = Message.date
-        sort_column = (
-            sort_column.asc() if sort_direction.lower() == "asc" else sort_column.desc()
-        )
+        descending = sort_direction is None or sort_direction.lower() != "asc"
         query = Message.query
 
         if project is not None:
@@ -427,30 +425,86 @@ class MessageService:
                 User.username.ilike(from_username + "%")
             )
 
-        results = (
-            query.filter(Message.to_user_id == user_id)
-            .order_by(sort_column)
-            .paginate(page, page_size, True)
+        query = query.filter(Message.to_user_id == user_id).options(
+            joinedload(Message.from_user)
         )
-        # if results.total == 0:
-        #     raise NotFound()
 
         messages_dto = MessagesDTO()
-        for item in results.items:
-            message_dto = None
+        if cursor is None:
+            order = sort_column.desc() if descending else sort_column.asc()
+            results = query.order_by(order).paginate(page, page_size, True)
+            items = results.items
+            messages_dto.pagination = Pagination(results)
+        else:
+            if sort_column.key != "date":
+                raise MessageServiceError("Cursors are only supported sorting by date")
+
+            items, next_cursor = MessageService._get_page_after(
+                query, cursor, page_size, descending
+            )
+            messages_dto.pagination = Pagination()
+            messages_dto.pagination.has_next = next_cursor is not None
+            messages_dto.pagination.next_cursor = next_cursor
+            messages_dto.pagination.per_page = page_size
+
+        project_ids = [
+            item.project_id
+            for item in items
+            if not isinstance(item, tuple) and item.project_id is not None
+        ]
+        project_titles = ProjectInfo.get_titles(project_ids, locale)
+        for item in items:
             if isinstance(item, tuple):
                 message_dto = item[0].as_dto()
                 message_dto.project_title = item[1].name
             else:
                 message_dto = item.as_dto()
                 if item.project_id is not None:
-                    message_dto.project_title = item.project.get_project_title(locale)
+                    message_dto.project_title = project_titles.get(item.project_id)
 
             messages_dto.user_messages.append(message_dto)
 
-        messages_dto.pagination = Pagination(results)
         return messages_dto
 
+    @staticmethod
+    def _get_page_after(query, cursor: str, page_size: int, descending: bool):
+        """ Gets the messages following the cursor by date and id, and the cursor of the next page """
+        order = (
+            [Message.date.desc(), Message.id.desc()]
+            if descending
+            else [Message.date.asc(), Message.id.asc()]
+        )
+        if cursor:
+            after = tuple_(Message.date, Message.id)
+            position = tuple_(*MessageService.decode_cursor(cursor))
+            query = query.filter(after < position if descending else after > position)
+
+        # One extra row tells whether there is a next page
+        items = query.order_by(*order).limit(page_size + 1).all()
+        if len(items) <= page_size:
+            return items, None
+
+        items = items[:page_size]
+        last = items[-1][0] if isinstance(items[-1], tuple) else items[-1]
+        return items, MessageService.encode_cursor(last.date, last.id)
+
+    @staticmethod
+    def encode_cursor(date: datetime.datetime, message_id: int) -> str:
+        """ Opaque position of a message in the inbox """
+        position = f"{date.isoformat()}|{message_id}"
+        return base64.urlsafe_b64encode(position.encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor: str):
+        """ Gets the date and id a cursor points at, raises MessageServiceError if malformed """
+        try:
+            date, message_id = (
+                base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+            )
+            return datetime.datetime.fromisoformat(date), int(message_id)
+        except ValueError:
+            raise MessageServiceError(f"Invalid cursor {cursor}")
+
     @staticmethod
     def get_message(message_id: int, user_id: int) -> Message:
         """ Gets the specified message """
@@ -484,6 +538,30 @@ class MessageService:
         """ Deletes the specified messages to the user """
         Message.delete_multiple_messages(message_ids, user_id)
 
+    @staticmethod
+    def mark_all_messages_read(user_id: int, message_type: str = None) -> int:
+        """ Marks the messages to the user as read, optionally of comma separated types only """
+        return Message.mark_all_messages_read(
+            user_id, MessageService._parse_message_types(message_type)
+        )
+
+    @staticmethod
+    def delete_all_messages(user_id: int, message_type: str = None) -> int:
+        """ Deletes the messages to the user, optionally of comma separated types only """
+        return Message.delete_all_messages(
+            user_id, MessageService._parse_message_types(message_type)
+        )
+
+    @staticmethod
+    def _parse_message_types(message_type: str) -> list:
+        if not message_type:
+            return None
+
+        try:
+            return [int(value) for value in message_type.split(",")]
+        except ValueError:
+            raise MessageServiceError(f"Invalid message types {message_type}")
+
     @staticmethod
     def get_task_link(project_id: int, task_id: int, base_url=None) -> str:
         """ Helper method that generates a link to the task """
@@ -508,5 +586,5 @@ class MessageService:
         if not base_url:
             base_url = current_app.config["APP_BASE_URL"]
 
-        link = f'<a href="{base_url}/users/{user_name}>{user_name}</a>'
+        link = f'<a href="{base_url}/users/{user_name}">{user_name}</a>'
         return link
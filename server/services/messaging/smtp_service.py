@@ -1,11 +1,8 @@
-import logging
-import smtplib
 import urllib.parse
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
 from itsdangerous import URLSafeTimedSerializer
 from flask import current_app
-from server.services.messaging.template_service import get_template
+from server.models.postgis.email_outbox import EmailOutbox
+from server.services.messaging.template_service import render_template
 
 
 class SMTPService:
@@ -13,19 +10,12 @@ class SMTPService:
     def send_verification_email(to_address: str, username: str):
         """ Sends a verification email with a unique token so we can verify user owns this email address """
 
-        # TODO these could be localised if needed, in the future
-        html_template = get_template("email_verification_en.html")
-        text_template = get_template("email_verification_en.txt")
-
         verification_url = SMTPService._generate_email_verification_url(
             to_address, username
         )
-
-        html_template = html_template.replace("[USERNAME]", username)
-        html_template = html_template.replace("[VEFIFICATION_LINK]", verification_url)
-
-        text_template = text_template.replace("[USERNAME]", username)
-        text_template = text_template.replace("[VEFIFICATION_LINK]", verification_url)
+        values = dict(username=username, verification_url=verification_url)
+        html_template = render_template("email_verification.html", **values)
+        text_template = render_template("email_verification.txt", **values)
 
         subject = "HOT Tasking Manager - Email Verification"
         SMTPService._send_message(to_address, subject, html_template, text_template)
@@ -39,59 +29,46 @@ class SMTPService:
         if not to_address:
             return False  # Many users will not have supplied email address so return
 
-        # TODO these could be localised if needed, in the future
-        html_template = get_template("message_alert_en.html")
-        text_template = get_template("message_alert_en.txt")
         inbox_url = f"{current_app.config['APP_BASE_URL']}/inbox"
-
-        html_template = html_template.replace("[USERNAME]", username)
-        html_template = html_template.replace("[PROFILE_LINK]", inbox_url)
-
-        text_template = text_template.replace("[USERNAME]", username)
-        text_template = text_template.replace("[PROFILE_LINK]", inbox_url)
+        values = dict(username=username, profile_url=inbox_url)
+        html_template = render_template("message_alert.html", **values)
+        text_template = render_template("message_alert.txt", **values)
 
         subject = "You have a new message on the HOT Tasking Manager"
         SMTPService._send_message(to_address, subject, html_template, text_template)
 
         return True
 
+    @staticmethod
+    def send_email_alerts(user_ids: list) -> int:
+        """
+        Queues the new message alert for many users at once, transaction will be saved by the caller
+        :returns: Number of alerts queued, users without an email address are skipped
+        """
+        inbox_url = f"{current_app.config['APP_BASE_URL']}/inbox"
+
+        # The username placeholder is filled in for each user as the emails are queued
+        values = dict(username="[USERNAME]", profile_url=inbox_url)
+        subject = "You have a new message on the HOT Tasking Manager"
+        return EmailOutbox.enqueue_for_users(
+            user_ids,
+            subject,
+            render_template("message_alert.html", **values),
+            render_template("message_alert.txt", **values),
+        )
+
     @staticmethod
     def _send_message(
         to_address: str, subject: str, html_message: str, text_message: str
     ):
-        """ Helper sends SMTP message """
-        from_address = current_app.config["EMAIL_FROM_ADDRESS"]
-
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = subject
-        msg["From"] = from_address
-        msg["To"] = to_address
-
-        # Record the MIME types of both parts - text/plain and text/html.
-        part1 = MIMEText(text_message, "plain")
-        part2 = MIMEText(html_message, "html")
-        msg.attach(part1)
-        msg.attach(part2)
-
-        current_app.logger.debug(f"Sending email via SMTP {to_address}")
-
-        if current_app.config["LOG_LEVEL"] == logging.DEBUG:
-            current_app.logger.debug(msg.as_string())
-        else:
-            sender = SMTPService._init_smtp_client()
-            sender.sendmail(from_address, to_address, msg.as_string())
-            sender.quit()
-        current_app.logger.debug(f"Email sent {to_address}")
-
-    @staticmethod
-    def _init_smtp_client():
-        """ Initialise SMTP client from app settings """
-        smtp_settings = current_app.config["SMTP_SETTINGS"]
-        sender = smtplib.SMTP(smtp_settings["host"], port=smtp_settings["smtp_port"])
-        sender.starttls()
-        sender.login(smtp_settings["smtp_user"], smtp_settings["smtp_password"])
-
-        return sender
+        """ Helper queues SMTP message, the mail worker delivers it """
+        EmailOutbox(
+            to_address=to_address,
+            subject=subject,
+            html_message=html_message,
+            text_message=text_message,
+        ).create()
+        current_app.logger.debug(f"Email queued {to_address}")
 
     @staticmethod
     def _generate_email_verification_url(email_address: str, user_name: str):
@@ -1,23 +1,102 @@
 import os
+import re
+import threading
 import urllib.parse
+from typing import List
+
 from flask import current_app
+from jinja2 import Environment, FileSystemLoader, StrictUndefined, select_autoescape
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(__file__), "templates")
+
+# Locale every template exists in, the last resort of each fallback chain
+DEFAULT_LOCALE = "en"
+
+# Template files are named <name>_<locale>.<extension>, as message_alert_pt-BR.html
+TEMPLATE_FILE_PATTERN = re.compile(
+    r"^(?P<name>.+)_(?P<locale>[a-z]{2,3}(?:-[A-Za-z0-9]+)?)\.(?P<extension>\w+)$"
+)
+
+_registry = None
+_registry_lock = threading.Lock()
 
 
-def get_template(template_name: str) -> str:
+class TemplateRegistry:
     """
-    Helper function to read the template from disk and return as a string to be manipulated
-    :param template_name: The template we want to load
-    :return: Template as a string
+    Message templates compiled once per process, keyed by template name and locale. A template
+    missing in the requested locale falls back to the language, then to the default locale
     """
-    try:
-        template_location = os.path.join(
-            os.path.dirname(__file__), "templates/{0}".format(template_name)
+
+    def __init__(self, templates_dir: str = TEMPLATES_DIR):
+        self.environment = Environment(
+            loader=FileSystemLoader(templates_dir),
+            autoescape=select_autoescape(["html"]),
+            undefined=StrictUndefined,
+            keep_trailing_newline=True,
         )
-        with open(template_location, mode="r", encoding="utf-8") as template:
-            return template.read()
-    except FileNotFoundError:
-        current_app.logger.error("Unable open file {0}".format(template_location))
-        raise ValueError("Unable open file {0}".format(template_location))
+        self._templates = {}
+        for file_name in os.listdir(templates_dir):
+            match = TEMPLATE_FILE_PATTERN.match(file_name)
+            if match is None:
+                continue
+
+            template_name = f"{match.group('name')}.{match.group('extension')}"
+            self._templates[
+                (template_name, match.group("locale"))
+            ] = self.environment.get_template(file_name)
+
+    def render(self, template_name: str, locale: str = None, **values) -> str:
+        """
+        Renders a template in the best locale available
+        :param template_name: The template we want, as message_alert.html
+        :param locale: Locale or Accept-Language header of the recipient
+        :raises: ValueError if the template doesn't exist in any locale of the chain
+        """
+        for candidate in self.get_locale_chain(locale):
+            template = self._templates.get((template_name, candidate))
+            if template is not None:
+                return template.render(**values)
+
+        raise ValueError(f"Unknown template {template_name}")
+
+    @staticmethod
+    def get_locale_chain(locale: str) -> List[str]:
+        """ Locales tried in order for the requested one, as pt-BR, pt, en """
+        chain = []
+        if locale:
+            # Only the preferred language of an Accept-Language header is used
+            preferred = locale.split(",")[0].split(";")[0].strip().replace("_", "-")
+            if preferred and preferred != "*":
+                chain.append(preferred)
+                language = preferred.split("-")[0].lower()
+                if language != preferred:
+                    chain.append(language)
+
+        if DEFAULT_LOCALE not in chain:
+            chain.append(DEFAULT_LOCALE)
+        return chain
+
+
+def get_registry() -> TemplateRegistry:
+    """ Gets the registry of the process, templates are compiled on first use """
+    global _registry
+
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = TemplateRegistry()
+
+    return _registry
+
+
+def render_template(template_name: str, locale: str = None, **values) -> str:
+    """
+    Helper renders a message template with the supplied values
+    :param template_name: The template we want, as message_alert.html
+    :param locale: Locale or Accept-Language header of the recipient, English if not available
+    :return: Rendered template as a string
+    """
+    return get_registry().render(template_name, locale, **values)
 
 
 def get_profile_url(username: str):
@@ -1,17 +1,148 @@
-import datetime
+import json
+import queue
+import select
+import threading
+import time
+
+from flask import current_app
+
+from server import db
 from server.models.postgis.notification import Notification
 
+# Channel the triggers on the messages table publish changed counters on, as user_id:unread_count
+UNREAD_COUNTS_CHANNEL = "tm_unread_counts"
+
+# A comment is sent on idle streams this often so proxies don't close them
+STREAM_HEARTBEAT_SECONDS = 15
+
+# Streams end after a while and browsers reconnect after STREAM_RETRY_MS, so workers are freed
+STREAM_MAX_SECONDS = 600
+STREAM_RETRY_MS = 3000
+
+# Seconds before the listener reconnects when its database connection is lost
+LISTENER_RECONNECT_DELAY = 5
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+class UnreadCountListener:
+    """
+    Listens for counter changes on one database connection per process, and hands each change
+    to the open streams of the user it belongs to
+    """
+
+    def __init__(self, engine, logger):
+        self.engine = engine
+        self.logger = logger
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def subscribe(self, user_id: int) -> queue.Queue:
+        """ Gets a queue receiving the new unread counts of the user """
+        updates = queue.Queue()
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(updates)
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._listen, daemon=True)
+                self._thread.start()
+
+        return updates
+
+    def unsubscribe(self, user_id: int, updates: queue.Queue):
+        with self._lock:
+            user_subscribers = self._subscribers.get(user_id, set())
+            user_subscribers.discard(updates)
+            if not user_subscribers:
+                self._subscribers.pop(user_id, None)
+
+    def dispatch(self, payload: str):
+        """ Hands a user_id:unread_count notification to the streams of the user """
+        user_id, unread_count = payload.split(":")
+        with self._lock:
+            user_subscribers = list(self._subscribers.get(int(user_id), []))
+
+        for updates in user_subscribers:
+            updates.put(int(unread_count))
+
+    def _listen(self):
+        while True:
+            try:
+                # The connection is taken out of the pool, as it keeps listening until it is lost
+                connection = self.engine.raw_connection()
+                connection.detach()
+                try:
+                    self._receive(connection.connection)
+                finally:
+                    connection.close()
+            except Exception as e:
+                self.logger.error(f"Unread count listener disconnected: {str(e)}")
+
+            time.sleep(LISTENER_RECONNECT_DELAY)
+
+    def _receive(self, connection):
+        connection.autocommit = True
+        connection.cursor().execute(f"LISTEN {UNREAD_COUNTS_CHANNEL}")
+        while True:
+            if select.select([connection], [], [], STREAM_HEARTBEAT_SECONDS)[0]:
+                connection.poll()
+                while connection.notifies:
+                    self.dispatch(connection.notifies.pop(0).payload)
+
 
 class NotificationService:
     @staticmethod
-    def update_notification_count(user_id: int):
-        current_unread_count = Notification.get_unread_message_count(user_id)
-        new_notification = Notification()
-        new_notification.user_id = user_id
-        new_notification.unread_count = current_unread_count + 1
-        new_notification.date = datetime.now()
+    def get_unread_message_count(user_id: int) -> int:
+        return Notification.get_unread_message_count(user_id)
 
     @staticmethod
-    def get_unread_message_count(user_id: int):
-        print("get_unread_message_count: ", user_id)
-        return Notification.get_unread_message_count(user_id)
+    def get_listener() -> UnreadCountListener:
+        """ Gets the listener of the process, created on first use """
+        global _listener
+
+        if _listener is None:
+            with _listener_lock:
+                if _listener is None:
+                    _listener = UnreadCountListener(db.engine, current_app.logger)
+
+        return _listener
+
+    @staticmethod
+    def stream_unread_count(user_id: int):
+        """
+        Server sent events with the unread count of the user, the current count first and then
+        each change as the triggers on the messages table publish it
+        """
+        listener = NotificationService.get_listener()
+
+        # Subscribed before reading the count, so no change can slip in between
+        updates = listener.subscribe(user_id)
+        unread_count = Notification.get_unread_message_count(user_id)
+
+        # Release the database connection, streams stay open for minutes
+        db.session.close()
+
+        def events():
+            try:
+                yield f"retry: {STREAM_RETRY_MS}\n\n"
+                yield NotificationService._unread_count_event(unread_count)
+
+                closes_at = time.monotonic() + STREAM_MAX_SECONDS
+                while time.monotonic() < closes_at:
+                    try:
+                        count = updates.get(timeout=STREAM_HEARTBEAT_SECONDS)
+                    except queue.Empty:
+                        yield ": keep-alive\n\n"
+                        continue
+
+                    yield NotificationService._unread_count_event(count)
+            finally:
+                listener.unsubscribe(user_id, updates)
+
+        return events()
+
+    @staticmethod
+    def _unread_count_event(unread_count: int) -> str:
+        data = json.dumps(dict(newMessages=unread_count > 0, unread=unread_count))
+        return f"event: unread\ndata: {data}\n\n"
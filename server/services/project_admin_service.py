@@ -1,6 +1,3 @@
-import json
-
-import geojson
 from flask import current_app
 
 from server.models.dtos.project_dto import (
@@ -12,11 +9,10 @@ from server.models.dtos.project_dto import (
 from server.models.postgis.project import Project, Task, ProjectStatus
 from server.models.postgis.statuses import TaskCreationMode, UserRole
 from server.models.postgis.task import TaskHistory, TaskStatus, TaskAction
-from server.models.postgis.utils import NotFound, InvalidData, InvalidGeoJson
+from server.models.postgis.utils import NotFound
 from server.services.grid.grid_service import GridService
 from server.services.license_service import LicenseService
 from server.services.users.user_service import UserService
-from server.services.project_search_service import ProjectSearchService
 
 
 class ProjectAdminServiceError(Exception):
@@ -41,7 +37,7 @@ class ProjectAdminService:
         """
         Validates and then persists draft projects in the DB
         :param draft_project_dto: Draft Project DTO with data from API
-        :raises InvalidGeoJson
+        :raises InvalidGeoJson, GridServiceError
         :returns ID of new draft project
         """
         # First things first, we need to validate that the author_id is a PM. issue #1715
@@ -63,12 +59,19 @@ class ProjectAdminService:
 
         draft_project.set_project_aoi(draft_project_dto)
 
-        # if arbitrary_tasks requested, create tasks from aoi otherwise use tasks in DTO
+        # if arbitrary_tasks requested, create tasks from aoi otherwise use tasks in DTO, or
+        # generate the task grid when only its zoom level was sent
         if draft_project_dto.has_arbitrary_tasks:
             tasks = GridService.tasks_from_aoi_features(
                 draft_project_dto.area_of_interest
             )
             draft_project.task_creation_mode = TaskCreationMode.ARBITRARY.value
+        elif draft_project_dto.tasks is None and draft_project_dto.zoom:
+            tasks = GridService.generate_tasks(
+                draft_project_dto.area_of_interest,
+                draft_project_dto.zoom,
+                draft_project_dto.clip_to_aoi,
+            )
         else:
             tasks = draft_project_dto.tasks
         ProjectAdminService._attach_tasks_to_project(draft_project, tasks)
@@ -101,7 +104,10 @@ class ProjectAdminService:
     @staticmethod
     def get_project_dto_for_admin(project_id: int) -> ProjectDTO:
         """ Get the project as DTO for project managers """
-        project = ProjectAdminService._get_project_by_id(project_id)
+        project = Project.get_for_dto(project_id)
+        if project is None:
+            raise NotFound()
+
         return project.as_dto_for_admin(project_id)
 
     @staticmethod
@@ -225,34 +231,13 @@ class ProjectAdminService:
     @staticmethod
     def _attach_tasks_to_project(draft_project: Project, tasks_geojson):
         """
-        Validates then iterates over the array of tasks and attach them to the draft project
+        Validates the tasks then bulk loads them into the draft project
         :param draft_project: Draft project in scope
         :param tasks_geojson: GeoJSON feature collection of mapping tasks
         :raises InvalidGeoJson, InvalidData
         """
-        tasks = geojson.loads(json.dumps(tasks_geojson))
-
-        if type(tasks) is not geojson.FeatureCollection:
-            raise InvalidGeoJson("Tasks: Invalid GeoJson must be FeatureCollection")
-
-        is_valid_geojson = geojson.is_valid(tasks)
-        if is_valid_geojson["valid"] == "no":
-            raise InvalidGeoJson(
-                f"Tasks: Invalid FeatureCollection - {is_valid_geojson['message']}"
-            )
-
-        task_count = 1
-        for feature in tasks["features"]:
-            try:
-                task = Task.from_geojson_feature(task_count, feature)
-            except (InvalidData, InvalidGeoJson) as e:
-                raise e
-
-            draft_project.tasks.append(task)
-            task_count += 1
-
-        task_count -= 1  # Remove last increment before falling out loop
-        draft_project.total_tasks = task_count
+        task_rows = Task.rows_from_feature_collection(tasks_geojson)
+        draft_project.create_tasks(task_rows)
 
     @staticmethod
     def _validate_default_locale(default_locale, project_info_locales):
@@ -290,7 +275,6 @@ class ProjectAdminService:
         admin_id: int, preferred_locale: str, search_dto: ProjectSearchDTO
     ):
         """ Get all projects for provided admin """
-        ProjectSearchService.create_search_query()
         return Project.get_projects_for_admin(admin_id, preferred_locale, search_dto)
 
     @staticmethod
@@ -1,5 +1,6 @@
 import geojson
-from cachetools import TTLCache, cached
+import hashlib
+import re
 from shapely.geometry import Polygon, box
 from server.models.dtos.project_dto import (
     ProjectSearchDTO,
@@ -7,36 +8,57 @@ from server.models.dtos.project_dto import (
     ListSearchResultDTO,
     Pagination,
     ProjectSearchBBoxDTO,
+    ProjectAutocompleteDTO,
+    ProjectSuggestionDTO,
 )
-from server.models.postgis.project import Project, ProjectInfo, ProjectTeams
+from server.models.postgis.project import Project, ProjectTeams
+from server.models.postgis.project_country import ProjectCountry
+from server.models.postgis.project_search_index import ProjectSearchIndex
 from server.models.postgis.statuses import (
     ProjectStatus,
     MappingLevel,
     MappingTypes,
     ProjectPriority,
 )
-from server.models.postgis.campaign import Campaign
-from server.models.postgis.organisation import Organisation
-from server.models.postgis.task import TaskHistory
+from server.models.postgis.campaign import Campaign, campaign_projects
 from server.models.postgis.utils import (
     NotFound,
     ST_Intersects,
     ST_MakeEnvelope,
-    ST_Transform,
-    ST_Area,
 )
 
 from server.models.postgis.interests import projects_interests
+from server.services.cache_service import CacheService
+from server.services.geometry_service import GeometryService
 from server.services.users.user_service import UserService
 
 from server import db
 from flask import current_app
-from geoalchemy2 import shape
-from sqlalchemy import func, distinct, desc
+from flask_sqlalchemy import Pagination as FlaskPagination
+from sqlalchemy import func, desc, exists, and_, or_, cast, select, Text
+from sqlalchemy.orm import aliased
 import math
 
 
-search_cache = TTLCache(maxsize=128, ttl=300)
+# Cached searches are invalidated on project changes, the ttl only bounds the memory they use
+SEARCH_CACHE_TTL = 300
+
+SEARCH_PAGE_SIZE = 14
+
+# Map clusters are computed on a grid of cells of this many pixels at the requested zoom
+CLUSTER_CELL_SIZE = 64
+MAX_CLUSTER_ZOOM = 22
+
+MAX_AUTOCOMPLETE_SIZE = 20
+
+SEARCH_ORDER_BY_COLUMNS = {
+    "id": ProjectSearchIndex.project_id,
+    "mapper_level": ProjectSearchIndex.mapper_level,
+    "priority": ProjectSearchIndex.priority,
+    "status": ProjectSearchIndex.status,
+    "last_updated": ProjectSearchIndex.last_updated,
+    "due_date": ProjectSearchIndex.due_date,
+}
 
 # max area allowed for passed in bbox, calculation shown to help future maintenance
 # client resolution (mpp)* arbitrary large map size on a large screen in pixels * 50% buffer, all squared
@@ -61,63 +83,42 @@ class BBoxTooBigError(Exception):
 
 class ProjectSearchService:
     @staticmethod
-    def create_search_query():
-        query = (
-            db.session.query(
-                Project.id.label("id"),
-                Project.mapper_level,
-                Project.priority,
-                Project.default_locale,
-                Project.centroid.ST_AsGeoJSON().label("centroid"),
-                Project.organisation_id,
-                Project.tasks_bad_imagery,
-                Project.tasks_mapped,
-                Project.tasks_validated,
-                Project.status,
-                Project.total_tasks,
-                Project.last_updated,
-                Project.due_date,
-                Project.country,
-                Organisation.name.label("organisation_name"),
-                Organisation.logo.label("organisation_logo"),
+    def create_search_query(preferred_locale: str):
+        """
+        Selects one search index row per project, in the preferred locale when the project
+        has been translated to it and in the default locale of the project otherwise
+        """
+        translated = aliased(ProjectSearchIndex)
+        has_translation = exists().where(
+            and_(
+                translated.project_id == ProjectSearchIndex.project_id,
+                translated.locale == preferred_locale,
+            )
+        )
+        query = db.session.query(ProjectSearchIndex).filter(
+            or_(
+                ProjectSearchIndex.locale == preferred_locale,
+                and_(ProjectSearchIndex.is_default_locale, ~has_translation),
             )
-            .filter(Project.private is not True)
-            .outerjoin(Organisation, Organisation.id == Project.organisation_id)
-            .group_by(Organisation.id, Project.id)
         )
         return query
 
     @staticmethod
-    def create_result_dto(project, preferred_locale, total_contributors):
-        project_info_dto = ProjectInfo.get_dto_for_locale(
-            project.id, preferred_locale, project.default_locale
-        )
+    def create_result_dto(project: ProjectSearchIndex) -> ListSearchResultDTO:
         list_dto = ListSearchResultDTO()
-        list_dto.project_id = project.id
-        list_dto.locale = project_info_dto.locale
-        list_dto.name = project_info_dto.name
+        list_dto.project_id = project.project_id
+        list_dto.locale = project.locale
+        list_dto.name = project.name
         list_dto.priority = ProjectPriority(project.priority).name
         list_dto.mapper_level = MappingLevel(project.mapper_level).name
-        list_dto.short_description = project_info_dto.short_description
+        list_dto.short_description = project.short_description
         list_dto.last_updated = project.last_updated
         list_dto.due_date = project.due_date
-        list_dto.percent_mapped = Project.calculate_tasks_percent(
-            "mapped",
-            project.total_tasks,
-            project.tasks_mapped,
-            project.tasks_validated,
-            project.tasks_bad_imagery,
-        )
-        list_dto.percent_validated = Project.calculate_tasks_percent(
-            "validated",
-            project.total_tasks,
-            project.tasks_mapped,
-            project.tasks_validated,
-            project.tasks_bad_imagery,
-        )
+        list_dto.percent_mapped = project.percent_mapped
+        list_dto.percent_validated = project.percent_validated
         list_dto.status = ProjectStatus(project.status).name
-        list_dto.active_mappers = Project.get_active_mappers(project.id)
-        list_dto.total_contributors = total_contributors
+        list_dto.active_mappers = project.active_mappers
+        list_dto.total_contributors = project.total_contributors
         list_dto.country = project.country
         list_dto.organisation_name = project.organisation_name
         list_dto.organisation_logo = project.organisation_logo
@@ -125,71 +126,138 @@ class ProjectSearchService:
         return list_dto
 
     @staticmethod
-    def get_total_contributions(paginated_results):
-        paginated_projects_ids = [p.id for p in paginated_results]
-
-        # We need to make a join to return projects without contributors.
-        project_contributors_count = (
-            Project.query.with_entities(
-                Project.id, func.count(distinct(TaskHistory.user_id)).label("total")
-            )
-            .filter(Project.id.in_(paginated_projects_ids))
-            .outerjoin(TaskHistory, TaskHistory.project_id == Project.id)
-            .group_by(Project.id)
-            .all()
-        )
-
-        return [p.total for p in project_contributors_count]
+    def get_search_cache_key(search_dto: ProjectSearchDTO) -> str:
+        """ Key of the cached results of a search, changes whenever any searched project changes """
+        criteria = hashlib.sha1(repr(search_dto.get_cache_key()).encode()).hexdigest()
+        return f"project-search:{CacheService.get_search_version()}:{criteria}"
 
     @staticmethod
-    @cached(search_cache)
-    def search_projects(search_dto: ProjectSearchDTO) -> ProjectSearchResultsDTO:
-        """ Searches all projects for matches to the criteria provided by the user """
-        all_results, paginated_results = ProjectSearchService._filter_projects(
-            search_dto
+    def search_projects(search_dto: ProjectSearchDTO) -> dict:
+        """
+        Searches all projects for matches to the criteria provided by the user, results are
+        shared by all workers until a project is published, updated or changes progress
+        :raises NotFound
+        """
+        results = CacheService.get_or_set(
+            ProjectSearchService.get_search_cache_key(search_dto),
+            lambda: ProjectSearchService._search_projects(search_dto).to_primitive(),
+            SEARCH_CACHE_TTL,
         )
 
-        if paginated_results.total == 0:
+        if not results.get("results"):
             raise NotFound()
 
-        features = []
-        for project in all_results:
-            # This loop creates a geojson feature collection so you can see all active projects on the map
-            properties = {
-                "projectId": project.id,
-                "priority": ProjectPriority(project.priority).name,
-            }
-            # centroid = project.centroid
-            feature = geojson.Feature(
-                geometry=geojson.loads(project.centroid), properties=properties
-            )
-            features.append(feature)
-        feature_collection = geojson.FeatureCollection(features)
-        dto = ProjectSearchResultsDTO()
-        dto.map_results = feature_collection
+        return results
 
-        # Get all total contributions for each paginated project.
-        contrib_counts = ProjectSearchService.get_total_contributions(
-            paginated_results.items
+    @staticmethod
+    def _search_projects(search_dto: ProjectSearchDTO) -> ProjectSearchResultsDTO:
+        """ Searches all projects for matches to the criteria provided by the user """
+        query = ProjectSearchService._filter_projects(search_dto)
+
+        # The total number of matches is computed by the same query as the page itself
+        page_results = (
+            query.add_columns(func.count().over().label("total"))
+            .offset((search_dto.page - 1) * SEARCH_PAGE_SIZE)
+            .limit(SEARCH_PAGE_SIZE)
+            .all()
         )
 
-        zip_items = zip(paginated_results.items, contrib_counts)
+        if len(page_results) == 0:
+            # Empty results are cached too, the caller reports them as not found
+            return ProjectSearchResultsDTO()
+
+        total = page_results[0].total
+        paginated_results = FlaskPagination(
+            None,
+            search_dto.page,
+            SEARCH_PAGE_SIZE,
+            total,
+            [row.ProjectSearchIndex for row in page_results],
+        )
 
+        dto = ProjectSearchResultsDTO()
         dto.results = [
-            ProjectSearchService.create_result_dto(p, search_dto.preferred_locale, t)
-            for p, t in zip_items
+            ProjectSearchService.create_result_dto(p) for p in paginated_results.items
         ]
         dto.pagination = Pagination(paginated_results)
 
         return dto
 
+    @staticmethod
+    def get_map_clusters(
+        search_dto: ProjectSearchDTO, zoom: int, bbox: list
+    ) -> geojson.FeatureCollection:
+        """
+        Counts the projects matching the search criteria on a grid suited to the zoom level, so
+        the map gets one point per cluster instead of the centroid of every project
+        :param search_dto: Search criteria, the page is ignored
+        :param zoom: Web map zoom level the clusters are displayed at
+        :param bbox: xmin, ymin, xmax, ymax of the displayed area in EPSG:4326
+        :raises ProjectSearchServiceError
+        """
+        if zoom < 0 or zoom > MAX_CLUSTER_ZOOM:
+            raise ProjectSearchServiceError(
+                f"Zoom must be between 0 and {MAX_CLUSTER_ZOOM}"
+            )
+        if len(bbox) != 4 or bbox[0] > bbox[2] or bbox[1] > bbox[3]:
+            raise ProjectSearchServiceError("Invalid bounding box")
+
+        # Rounding lets nearby viewports share the cached clusters
+        bbox = [round(coordinate, 2) for coordinate in bbox]
+        criteria = hashlib.sha1(
+            repr((search_dto.get_cache_key(with_page=False), zoom, bbox)).encode()
+        ).hexdigest()
+        key = f"project-map-clusters:{CacheService.get_search_version()}:{criteria}"
+
+        return CacheService.get_or_set(
+            key,
+            lambda: ProjectSearchService._get_map_clusters(search_dto, zoom, bbox),
+            SEARCH_CACHE_TTL,
+        )
+
+    @staticmethod
+    def _get_map_clusters(
+        search_dto: ProjectSearchDTO, zoom: int, bbox: list
+    ) -> geojson.FeatureCollection:
+        # Size in degrees of the grid cells, so that each cell covers CLUSTER_CELL_SIZE pixels
+        cell_size = 360 / (256 * 2 ** zoom) * CLUSTER_CELL_SIZE
+        cell = func.ST_SnapToGrid(ProjectSearchIndex.centroid, cell_size)
+
+        query = (
+            ProjectSearchService._filter_projects(search_dto)
+            .order_by(None)
+            .filter(
+                ST_Intersects(
+                    ProjectSearchIndex.centroid,
+                    ST_MakeEnvelope(bbox[0], bbox[1], bbox[2], bbox[3], 4326),
+                )
+            )
+            .with_entities(
+                func.count().label("count"),
+                func.min(ProjectSearchIndex.project_id).label("project_id"),
+                func.ST_AsGeoJSON(
+                    func.ST_Centroid(func.ST_Collect(ProjectSearchIndex.centroid))
+                ).label("centroid"),
+            )
+            .group_by(cell)
+        )
+
+        features = []
+        for cluster in query.all():
+            properties = {"count": cluster.count}
+            if cluster.count == 1:
+                properties["projectId"] = cluster.project_id
+            feature = geojson.Feature(
+                geometry=geojson.loads(cluster.centroid), properties=properties
+            )
+            features.append(feature)
+
+        return geojson.FeatureCollection(features)
+
     @staticmethod
     def _filter_projects(search_dto: ProjectSearchDTO):
         """ Filters all projects based on criteria provided by user"""
-        query = ProjectSearchService.create_search_query()
-        query = query.join(ProjectInfo).filter(
-            ProjectInfo.locale.in_([search_dto.preferred_locale, "en"])
-        )
+        query = ProjectSearchService.create_search_query(search_dto.preferred_locale)
 
         project_status_array = [ProjectStatus.PUBLISHED.value]
 
@@ -203,49 +271,72 @@ class ProjectSearchService:
             )
 
         if search_dto.interests:
-            query = query.join(
-                projects_interests, projects_interests.c.project_id == Project.id
-            ).filter(projects_interests.c.interest_id.in_(search_dto.interests))
+            query = query.filter(
+                exists().where(
+                    and_(
+                        projects_interests.c.project_id
+                        == ProjectSearchIndex.project_id,
+                        projects_interests.c.interest_id.in_(search_dto.interests),
+                    )
+                )
+            )
 
-        query = query.filter(Project.status.in_(project_status_array))
+        query = query.filter(ProjectSearchIndex.status.in_(project_status_array))
 
         if search_dto.created_by:
-            query = query.filter(Project.author_id == search_dto.created_by)
+            query = query.filter(ProjectSearchIndex.author_id == search_dto.created_by)
 
         if search_dto.mapped_by:
             projects_mapped = UserService.get_projects_mapped(search_dto.mapped_by)
             if projects_mapped:
-                query = query.filter(Project.id.in_(projects_mapped))
+                query = query.filter(ProjectSearchIndex.project_id.in_(projects_mapped))
 
         if search_dto.favorited_by:
             user = UserService.get_user_by_id(search_dto.favorited_by)
             projects_favorited = user.favorites
             if projects_favorited:
                 query = query.filter(
-                    Project.id.in_([project.id for project in projects_favorited])
+                    ProjectSearchIndex.project_id.in_(
+                        [project.id for project in projects_favorited]
+                    )
                 )
 
         if search_dto.mapper_level and search_dto.mapper_level.upper() != "ALL":
             query = query.filter(
-                Project.mapper_level == MappingLevel[search_dto.mapper_level].value
+                ProjectSearchIndex.mapper_level
+                == MappingLevel[search_dto.mapper_level].value
             )
 
         if search_dto.organisation_name:
-            query = query.filter(Organisation.name == search_dto.organisation_name)
+            query = query.filter(
+                ProjectSearchIndex.organisation_name == search_dto.organisation_name
+            )
 
         if search_dto.organisation_id:
-            query = query.filter(Organisation.id == search_dto.organisation_id)
+            query = query.filter(
+                ProjectSearchIndex.organisation_id == search_dto.organisation_id
+            )
 
         if search_dto.team_id:
-            query = query.join(
-                ProjectTeams, ProjectTeams.project_id == Project.id
-            ).filter(ProjectTeams.team_id == search_dto.team_id)
+            query = query.filter(
+                exists().where(
+                    and_(
+                        ProjectTeams.project_id == ProjectSearchIndex.project_id,
+                        ProjectTeams.team_id == search_dto.team_id,
+                    )
+                )
+            )
 
         if search_dto.campaign:
-            query = query.join(Campaign, Project.campaign).group_by(
-                Project.id, Campaign.name
+            query = query.filter(
+                exists().where(
+                    and_(
+                        campaign_projects.c.project_id == ProjectSearchIndex.project_id,
+                        campaign_projects.c.campaign_id == Campaign.id,
+                        Campaign.name == search_dto.campaign,
+                    )
+                )
             )
-            query = query.filter(Campaign.name == search_dto.campaign)
 
         if search_dto.mapping_types:
             # Construct array of mapping types for query
@@ -253,35 +344,139 @@ class ProjectSearchService:
             for mapping_type in search_dto.mapping_types:
                 mapping_type_array.append(MappingTypes[mapping_type].value)
 
-            query = query.filter(Project.mapping_types.contains(mapping_type_array))
-
-        if search_dto.text_search:
-            # We construct an OR search, so any projects that contain or more of the search terms should be returned
-            or_search = search_dto.text_search.replace(" ", " | ")
             query = query.filter(
-                ProjectInfo.text_searchable.match(
-                    or_search, postgresql_regconfig="english"
-                )
+                ProjectSearchIndex.mapping_types.contains(mapping_type_array)
+            )
+
+        # Projects match when their translation in the preferred locale, in english or in their
+        # default locale does, each translation being searched with the config of its locale
+        searched = aliased(ProjectSearchIndex)
+        text_query = ProjectSearchService._make_text_query(
+            search_dto.text_search, searched.locale
+        )
+        if text_query is not None:
+            matched = and_(
+                searched.project_id == ProjectSearchIndex.project_id,
+                or_(
+                    searched.locale.in_([search_dto.preferred_locale, "en"]),
+                    searched.is_default_locale,
+                ),
+                searched.text_searchable.op("@@")(text_query),
             )
+            query = query.filter(exists().where(matched))
 
         if search_dto.country:
-            # Unnest country column array.
-            sq = Project.query.with_entities(
-                Project.id, func.unnest(Project.country).label("country")
-            ).subquery()
+            country = search_dto.country.strip()
             query = query.filter(
-                sq.c.country.ilike("%{}%".format(search_dto.country))
-            ).filter(Project.id == sq.c.id)
+                exists().where(
+                    and_(
+                        ProjectCountry.project_id == ProjectSearchIndex.project_id,
+                        or_(
+                            ProjectCountry.country_name.ilike("%{}%".format(country)),
+                            ProjectCountry.country_code == country.upper(),
+                        ),
+                    )
+                )
+            )
 
-        order_by = search_dto.order_by
+        order_by = SEARCH_ORDER_BY_COLUMNS.get(
+            search_dto.order_by, ProjectSearchIndex.priority
+        )
         if search_dto.order_by_type == "DESC":
-            order_by = desc(search_dto.order_by)
+            order_by = desc(order_by)
+
+        if text_query is not None:
+            # Best matches come first, ranked on the translations that matched rather than the
+            # one displayed. The requested order breaks ties
+            rank = (
+                select([func.max(func.ts_rank(searched.text_searchable, text_query))])
+                .where(matched)
+                .correlate(ProjectSearchIndex)
+                .as_scalar()
+            )
+            query = query.order_by(desc(rank))
 
-        query = query.order_by(order_by).group_by(Project.id)
-        all_results = query.all()
-        paginated_results = query.paginate(search_dto.page, 14, True)
+        return query.order_by(order_by, ProjectSearchIndex.project_id)
 
-        return all_results, paginated_results
+    @staticmethod
+    def _make_text_query(text_search: str, locale):
+        """
+        Makes an OR tsquery of the searched words, so any projects that contain one or more of them
+        are returned. Words are stemmed for the locale and also matched as they are, for words
+        the stemmer of the locale doesn't know
+        :param locale: Locale name, or the locale column of the searched rows
+        """
+        if not text_search:
+            return None
+
+        words = re.findall(r"\w+", text_search)
+        if not words:
+            return None
+
+        or_search = " | ".join(words)
+        return func.to_tsquery(func.tm_locale_regconfig(locale), or_search).op("||")(
+            func.to_tsquery("simple", or_search)
+        )
+
+    @staticmethod
+    def autocomplete(term: str, preferred_locale: str, limit: int = 10) -> dict:
+        """
+        Suggests published projects whose name contains the typed text, or whose id starts with it,
+        using the trigram and prefix indexes of the search index rather than a full search
+        :raises ProjectSearchServiceError
+        """
+        term = " ".join(term.lower().split()).lstrip("#") if term else ""
+        if len(term) == 0:
+            raise ProjectSearchServiceError("Text to autocomplete not provided")
+        if limit < 1 or limit > MAX_AUTOCOMPLETE_SIZE:
+            raise ProjectSearchServiceError(
+                f"Limit must be between 1 and {MAX_AUTOCOMPLETE_SIZE}"
+            )
+
+        criteria = hashlib.sha1(
+            repr((preferred_locale, term, limit)).encode()
+        ).hexdigest()
+        key = f"project-autocomplete:{CacheService.get_search_version()}:{criteria}"
+
+        return CacheService.get_or_set(
+            key,
+            lambda: ProjectSearchService._autocomplete(
+                term, preferred_locale, limit
+            ).to_primitive(),
+            SEARCH_CACHE_TTL,
+        )
+
+    @staticmethod
+    def _autocomplete(
+        term: str, preferred_locale: str, limit: int
+    ) -> ProjectAutocompleteDTO:
+        query = (
+            ProjectSearchService.create_search_query(preferred_locale)
+            .filter(ProjectSearchIndex.status == ProjectStatus.PUBLISHED.value)
+            .with_entities(ProjectSearchIndex.project_id, ProjectSearchIndex.name)
+        )
+
+        pattern = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        if term.isdigit():
+            query = query.filter(
+                cast(ProjectSearchIndex.project_id, Text).like(f"{pattern}%")
+            ).order_by(ProjectSearchIndex.project_id)
+        else:
+            name = func.lower(ProjectSearchIndex.name)
+            query = query.filter(name.like(f"%{pattern}%")).order_by(
+                desc(name.like(f"{pattern}%")),
+                desc(func.similarity(name, term)),
+                ProjectSearchIndex.project_id,
+            )
+
+        dto = ProjectAutocompleteDTO()
+        for project_id, name in query.limit(limit).all():
+            suggestion = ProjectSuggestionDTO()
+            suggestion.project_id = project_id
+            suggestion.name = name
+            dto.results.append(suggestion)
+
+        return dto
 
     @staticmethod
     def get_projects_geojson(
@@ -301,24 +496,29 @@ class ProjectSearchService:
 
         # get projects intersecting the polygon for created by the author_id
         intersecting_projects = ProjectSearchService._get_intersecting_projects(
-            polygon, search_bbox_dto.project_author
+            polygon, search_bbox_dto.project_author, search_bbox_dto.geometry_mode
+        )
+
+        # Localized names of all the projects are loaded at once
+        project_names = dict(
+            ProjectSearchService.create_search_query(search_bbox_dto.preferred_locale)
+            .filter(
+                ProjectSearchIndex.project_id.in_(
+                    [project.id for project in intersecting_projects]
+                )
+            )
+            .with_entities(ProjectSearchIndex.project_id, ProjectSearchIndex.name)
+            .all()
         )
 
         # allow an empty feature collection to be returned if no intersecting features found, since this is primarily
         # for returning data to show on a map
         features = []
         for project in intersecting_projects:
-            try:
-                localDTO = ProjectInfo.get_dto_for_locale(
-                    project.id, search_bbox_dto.preferred_locale, project.default_locale
-                )
-            except Exception:
-                pass
-
             properties = {
                 "projectId": project.id,
                 "projectStatus": ProjectStatus(project.status).name,
-                "projectName": localDTO.name,
+                "projectName": project_names.get(project.id),
             }
             feature = geojson.Feature(
                 geometry=geojson.loads(project.geometry), properties=properties
@@ -328,14 +528,28 @@ class ProjectSearchService:
         return geojson.FeatureCollection(features)
 
     @staticmethod
-    def _get_intersecting_projects(search_polygon: Polygon, author_id: int):
-        """ executes a database query to get the intersecting projects created by the author if provided """
+    def _get_intersecting_projects(
+        search_polygon: Polygon, author_id: int, geometry_mode: str = "full"
+    ):
+        """
+        executes a database query to get the intersecting projects created by the author if provided
+        :param geometry_mode: full for the AOI as is, simplified for an AOI simplified to the detail
+        visible in the bounding box, or centroid
+        """
+        if geometry_mode == "centroid":
+            geometry = Project.centroid
+        elif geometry_mode == "simplified":
+            # Details smaller than a thousandth of the bounding box width are not visible on a map
+            tolerance = (search_polygon.bounds[2] - search_polygon.bounds[0]) / 1000
+            geometry = func.ST_SimplifyPreserveTopology(Project.geometry, tolerance)
+        else:
+            geometry = Project.geometry
 
         query = db.session.query(
             Project.id,
             Project.status,
             Project.default_locale,
-            Project.geometry.ST_AsGeoJSON().label("geometry"),
+            func.ST_AsGeoJSON(geometry).label("geometry"),
         ).filter(
             ST_Intersects(
                 Project.geometry,
@@ -359,10 +573,7 @@ class ProjectSearchService:
         """ make a shapely Polygon in SRID 4326 from bbox and srid"""
         try:
             polygon = box(bbox[0], bbox[1], bbox[2], bbox[3])
-            if not srid == 4326:
-                geometry = shape.from_shape(polygon, srid)
-                geom_4326 = db.engine.execute(ST_Transform(geometry, 4326)).scalar()
-                polygon = shape.to_shape(geom_4326)
+            polygon = GeometryService.transform_geometry(polygon, srid, 4326)
         except Exception as e:
             raise ProjectSearchServiceError(f"error making polygon: {e}")
         return polygon
@@ -370,9 +581,7 @@ class ProjectSearchService:
     @staticmethod
     def _get_area_sqm(polygon: Polygon) -> float:
         """ get the area of the polygon in square metres """
-        return db.engine.execute(
-            ST_Area(ST_Transform(shape.from_shape(polygon, 4326), 3857))
-        ).scalar()
+        return GeometryService.get_web_mercator_area(polygon)
 
     @staticmethod
     def validate_bbox_area(polygon: Polygon) -> bool:
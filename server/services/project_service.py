@@ -14,6 +14,7 @@ from server.models.dtos.project_dto import (
 
 from server.models.postgis.organisation import Organisation
 from server.models.postgis.project import Project, ProjectStatus, MappingLevel
+from server.models.postgis.project_search_index import ProjectSearchIndex
 from server.models.postgis.statuses import MappingNotAllowed, ValidatingNotAllowed
 from server.models.postgis.task import Task, TaskHistory, TaskAction
 from server.models.postgis.utils import NotFound
@@ -124,7 +125,10 @@ class ProjectService:
         :param locale: Locale the mapper has requested
         :raises ProjectServiceError, NotFound
         """
-        project = ProjectService.get_project_by_id(project_id)
+        project = Project.get_for_dto(project_id)
+        if project is None:
+            raise NotFound()
+
         return project.as_dto_for_mapping(locale, abbrev)
 
     @staticmethod
@@ -297,18 +301,15 @@ class ProjectService:
     @staticmethod
     def get_featured_projects(preferred_locale):
         """ Sets project as featured """
-        query = ProjectSearchService.create_search_query()
-        projects = query.filter(Project.featured == true()).group_by(Project.id).all()
-
-        # Get total contributors.
-        contrib_counts = ProjectSearchService.get_total_contributions(projects)
-        zip_items = zip(projects, contrib_counts)
+        query = ProjectSearchService.create_search_query(preferred_locale)
+        projects = (
+            query.join(Project, Project.id == ProjectSearchIndex.project_id)
+            .filter(Project.featured == true())
+            .all()
+        )
 
         dto = ProjectSearchResultsDTO()
-        dto.results = [
-            ProjectSearchService.create_result_dto(p, preferred_locale, t)
-            for p, t in zip_items
-        ]
+        dto.results = [ProjectSearchService.create_result_dto(p) for p in projects]
 
         return dto
 
@@ -363,3 +364,21 @@ class ProjectService:
             raise NotFound()
 
         return project.organisation
+
+    @staticmethod
+    def refresh_project_countries() -> int:
+        """
+        Looks the countries of every project up again, so that projects created before the
+        bundled world boundaries were used are filed under the same country names as new ones
+        :returns: Number of projects refreshed
+        """
+        project_ids = [
+            row.id
+            for row in Project.query.with_entities(Project.id).order_by(Project.id)
+        ]
+        for count, project_id in enumerate(project_ids, 1):
+            Project.get(project_id).set_country_info()
+            if count % 100 == 0:
+                current_app.logger.info(f"Countries of {count} projects refreshed")
+
+        return len(project_ids)
@@ -1,4 +1,8 @@
+import csv
+import io
+import json
 from cachetools import TTLCache, cached
+from dateutil.parser import parse as date_parse
 
 from sqlalchemy import func, text, desc, cast, extract, or_
 from sqlalchemy.types import Time
@@ -14,20 +18,41 @@ from server.models.dtos.stats_dto import (
     HomePageStatsDTO,
     OrganizationStatsDTO,
     CampaignStatsDTO,
+    CountryStatsDTO,
+    CountriesStatsDTO,
 )
 
 from server.models.dtos.project_dto import ProjectSearchResultsDTO
+from server.models.postgis.contribution_stats import ContributionStats
 from server.models.postgis.project import Project
-from server.models.postgis.statuses import TaskStatus
+from server.models.postgis.project_country import ProjectCountry
+from server.models.postgis.project_search_index import ProjectSearchIndex
+from server.models.postgis.statuses import TaskStatus, ProjectStatus
 from server.models.postgis.task import TaskHistory, User, Task, TaskAction
+from server.models.postgis.user_recommendations import UserRecommendations
 from server.models.postgis.utils import timestamp, NotFound
+from server.services.cache_service import CacheService
 from server.services.project_service import ProjectService
 from server.services.project_search_service import ProjectSearchService
 from server.services.users.user_service import UserService
 
-from datetime import date, timedelta
+from datetime import date, datetime, timedelta
 
 homepage_stats_cache = TTLCache(maxsize=4, ttl=30)
+country_stats_cache = TTLCache(maxsize=1, ttl=300)
+
+# Number of task history rows fetched from the server side cursor at a time when exporting
+HISTORY_EXPORT_BATCH_SIZE = 5000
+HISTORY_EXPORT_FIELDS = [
+    "id",
+    "project_id",
+    "task_id",
+    "action",
+    "action_text",
+    "action_date",
+    "user_id",
+    "username",
+]
 
 
 class StatsService:
@@ -38,9 +63,17 @@ class StatsService:
         last_state: TaskStatus,
         new_state: TaskStatus,
         action="change",
+        task_id: int = None,
     ):
         """ Update stats when a task has had a state change """
 
+        if task_id and action == "undo" and new_state != last_state:
+            # Undoing a mapping goes back to READY, which the counters below skip, but the
+            # leaderboard totals are still reverted
+            StatsService._revert_contribution_stats(
+                project_id, task_id, user_id, last_state
+            )
+
         if new_state in [
             TaskStatus.READY,
             TaskStatus.LOCKED_FOR_VALIDATION,
@@ -54,12 +87,37 @@ class StatsService:
         project, user = StatsService._update_tasks_stats(
             project, user, last_state, new_state, action
         )
-        UserService.upsert_mapped_projects(user_id, project_id)
+        if UserService.upsert_mapped_projects(user_id, project_id):
+            # The project is no longer a candidate and its campaigns now count
+            UserRecommendations.mark_stale(user_id)
         project.last_updated = timestamp()
 
+        if task_id and action == "change" and new_state != last_state:
+            # Keep leaderboard totals in line with the user counters
+            ContributionStats.record_task_state_change(
+                project_id, task_id, user_id, new_state
+            )
+
         # Transaction will be saved when task is saved
         return project, user
 
+    @staticmethod
+    def _revert_contribution_stats(
+        project_id: int, task_id: int, user_id: int, undone_state: TaskStatus
+    ):
+        """ Reverts the leaderboard totals of the day the undone state was set, not today's """
+        undone_change = TaskHistory.get_last_action_of_type(
+            project_id, task_id, [TaskAction.STATE_CHANGE.name]
+        )
+        ContributionStats.record_task_state_change(
+            project_id,
+            task_id,
+            user_id,
+            undone_state,
+            -1,
+            undone_change.action_date.date() if undone_change else None,
+        )
+
     @staticmethod
     def _update_tasks_stats(
         project: Project,
@@ -147,6 +205,111 @@ class StatsService:
         activity_dto.pagination = Pagination(results)
         return activity_dto
 
+    @staticmethod
+    def parse_history_date(value: str):
+        """
+        Parses a date bounding a task history export, as given to the API or manage.py
+        :raises ValueError
+        :return: The date when no time is given, so an end date covers the whole day, else the
+                 datetime. None when no value is given
+        """
+        if not value:
+            return None
+
+        parsed = date_parse(value)
+        return parsed if ":" in value else parsed.date()
+
+    @staticmethod
+    def export_task_history(
+        project_id: int, export_format: str = "csv", start_date=None, end_date=None
+    ):
+        """
+        Exports the whole task history of a project, streamed in constant memory
+        :param project_id: Project in scope
+        :param export_format: Either csv or ndjson
+        :param start_date: Optional, only export actions on or after this date
+        :param end_date: Optional, only export actions on or before this date, or the whole of
+                         it when no time is given
+        :raises NotFound, ValueError
+        :return: Generator of text chunks
+        """
+        if export_format not in ["csv", "ndjson"]:
+            raise ValueError(f"Unsupported export format {export_format}")
+
+        # Validate that project exists before we start streaming.
+        ProjectService.get_project_by_id(project_id)
+
+        query = (
+            db.session.query(
+                TaskHistory.id,
+                TaskHistory.project_id,
+                TaskHistory.task_id,
+                TaskHistory.action,
+                TaskHistory.action_text,
+                TaskHistory.action_date,
+                TaskHistory.user_id,
+                User.username,
+            )
+            .join(User, User.id == TaskHistory.user_id)
+            .filter(TaskHistory.project_id == project_id)
+        )
+        if start_date:
+            query = query.filter(TaskHistory.action_date >= start_date)
+        if isinstance(end_date, datetime):
+            query = query.filter(TaskHistory.action_date <= end_date)
+        elif end_date:
+            # A date without a time covers the whole of that day
+            query = query.filter(TaskHistory.action_date < end_date + timedelta(days=1))
+
+        # yield_per makes SQLAlchemy use a server side cursor, so rows are never all held in memory
+        rows = query.order_by(TaskHistory.id).yield_per(HISTORY_EXPORT_BATCH_SIZE)
+
+        if export_format == "csv":
+            return StatsService._stream_history_as_csv(rows)
+
+        return StatsService._stream_history_as_ndjson(rows)
+
+    @staticmethod
+    def _stream_history_as_csv(rows):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(HISTORY_EXPORT_FIELDS)
+
+        for count, row in enumerate(rows, start=1):
+            writer.writerow(
+                [
+                    row.id,
+                    row.project_id,
+                    row.task_id,
+                    row.action,
+                    row.action_text,
+                    row.action_date.isoformat(),
+                    row.user_id,
+                    row.username,
+                ]
+            )
+            if count % HISTORY_EXPORT_BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate(0)
+
+        yield buffer.getvalue()
+
+    @staticmethod
+    def _stream_history_as_ndjson(rows):
+        lines = []
+        for row in rows:
+            entry = dict(zip(HISTORY_EXPORT_FIELDS, row))
+            entry["action_date"] = row.action_date.isoformat()
+            lines.append(json.dumps(entry))
+
+            if len(lines) == HISTORY_EXPORT_BATCH_SIZE:
+                yield "\n".join(lines) + "\n"
+                lines = []
+
+        if lines:
+            yield "\n".join(lines) + "\n"
+
     @staticmethod
     def get_popular_projects() -> ProjectSearchResultsDTO:
         """ Get all projects ordered by task_history """
@@ -176,17 +339,11 @@ class StatsService:
             .limit(10)
             .subquery()
         )
-        projects_query = ProjectSearchService.create_search_query()
-        projects = projects_query.filter(Project.id == sq.c.id)
-
-        # Get total contributors.
-        contrib_counts = ProjectSearchService.get_total_contributions(projects)
-        zip_items = zip(projects, contrib_counts)
+        projects_query = ProjectSearchService.create_search_query("en")
+        projects = projects_query.filter(ProjectSearchIndex.project_id == sq.c.id)
 
         dto = ProjectSearchResultsDTO()
-        dto.results = [
-            ProjectSearchService.create_result_dto(p, "en", t) for p, t in zip_items
-        ]
+        dto.results = [ProjectSearchService.create_result_dto(p) for p in projects]
 
         return dto
 
@@ -254,8 +411,15 @@ class StatsService:
                                        ON m.mapped_by = v.validated_by
         """
 
-        results = db.engine.execute(text(contrib_query), project_id=project_id)
-        if results.rowcount == 0:
+        results = CacheService.get_or_set_for_project(
+            "user-contributions",
+            project_id,
+            lambda: [
+                tuple(row)
+                for row in db.engine.execute(text(contrib_query), project_id=project_id)
+            ],
+        )
+        if len(results) == 0:
             raise NotFound()
 
         contrib_dto = ProjectContributionsDTO()
@@ -270,6 +434,43 @@ class StatsService:
             contrib_dto.user_contributions.append(user_contrib)
         return contrib_dto
 
+    @staticmethod
+    @cached(country_stats_cache)
+    def get_country_stats() -> CountriesStatsDTO:
+        """ Gets the project and task totals of each country from the project countries table """
+        query = (
+            db.session.query(
+                ProjectCountry.country_name,
+                func.max(ProjectCountry.country_code).label("country_code"),
+                func.count(Project.id).label("total_projects"),
+                func.count(Project.id)
+                .filter(Project.status == ProjectStatus.PUBLISHED.value)
+                .label("published_projects"),
+                func.coalesce(func.sum(Project.total_tasks), 0).label("total_tasks"),
+                func.coalesce(func.sum(Project.tasks_mapped), 0).label("tasks_mapped"),
+                func.coalesce(func.sum(Project.tasks_validated), 0).label(
+                    "tasks_validated"
+                ),
+            )
+            .join(Project, Project.id == ProjectCountry.project_id)
+            .group_by(ProjectCountry.country_name)
+            .order_by(ProjectCountry.country_name)
+        )
+
+        countries_dto = CountriesStatsDTO()
+        for row in query.all():
+            country_dto = CountryStatsDTO()
+            country_dto.country_name = row.country_name
+            country_dto.country_code = row.country_code
+            country_dto.total_projects = row.total_projects
+            country_dto.published_projects = row.published_projects
+            country_dto.total_tasks = row.total_tasks
+            country_dto.tasks_mapped = row.tasks_mapped
+            country_dto.tasks_validated = row.tasks_validated
+            countries_dto.countries.append(country_dto)
+
+        return countries_dto
+
     @staticmethod
     @cached(homepage_stats_cache)
     def get_homepage_stats() -> HomePageStatsDTO:
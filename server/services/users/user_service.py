@@ -21,21 +21,28 @@ from server.models.dtos.user_dto import (
 from server.models.dtos.interests_dto import InterestsDTO, InterestDTO
 from server.models.postgis.interests import Interest, projects_interests
 from server.models.postgis.message import Message
-from server.models.postgis.project import Project, ProjectInfo
+from server.models.postgis.project import Project
+from server.models.postgis.project_search_index import ProjectSearchIndex
 from server.models.postgis.user import User, UserRole, MappingLevel, UserEmail
+from server.models.postgis.user_recommendations import UserRecommendations
 from server.models.postgis.task import TaskHistory, TaskAction, Task
 from server.models.dtos.user_dto import UserTaskDTOs
 from server.models.dtos.stats_dto import Pagination
 from server.models.postgis.statuses import TaskStatus, ProjectStatus
-from server.models.postgis.utils import NotFound
+from server.models.postgis.utils import NotFound, timestamp
 from server.services.users.osm_service import OSMService, OSMServiceError
 from server.services.messaging.smtp_service import SMTPService
-from server.services.messaging.template_service import get_template
+from server.services.messaging.template_service import render_template
 
 
 user_filter_cache = TTLCache(maxsize=1024, ttl=600)
 user_all_cache = TTLCache(maxsize=1024, ttl=600)
 
+# Users whose recommendations are recomputed in each statement of the nightly refresh
+RECOMMENDATIONS_BATCH_SIZE = 500
+# Stale recommendations are served as they are, and recomputed on view at most this often
+RECOMMENDATIONS_REFRESH_INTERVAL = datetime.timedelta(minutes=15)
+
 
 class UserServiceError(Exception):
     """ Custom Exception to notify callers an error occurred when in the User Service """
@@ -490,9 +497,12 @@ class UserService:
         return countries_dto
 
     @staticmethod
-    def upsert_mapped_projects(user_id: int, project_id: int):
-        """ Add project to mapped projects if it doesn't exist, otherwise return """
-        User.upsert_mapped_projects(user_id, project_id)
+    def upsert_mapped_projects(user_id: int, project_id: int) -> bool:
+        """
+        Add project to mapped projects if it doesn't exist, otherwise return
+        :returns: True if the user had not contributed to the project before
+        """
+        return User.upsert_mapped_projects(user_id, project_id)
 
     @staticmethod
     def get_mapped_projects(user_name: str, preferred_locale: str):
@@ -502,54 +512,53 @@ class UserService:
 
     @staticmethod
     def get_recommended_projects(user_name: str, preferred_locale: str):
-        """ Gets all projects a user has mapped or validated on """
-        limit = 20
+        """ Gets the projects precomputed as recommendations for the user """
         user = (
-            User.query.with_entities(User.id, User.mapping_level)
+            User.query.with_entities(User.id)
             .filter(User.username == user_name)
             .one_or_none()
         )
         if user is None:
             raise NotFound()
 
-        # Get all projects that the user has contributed
-        sq = (
-            TaskHistory.query.with_entities(TaskHistory.project_id.label("project_id"))
-            .distinct(TaskHistory.project_id)
-            .filter(TaskHistory.user_id == user.id)
-            .subquery()
-        )
-        # Get all campaigns for all contributed projects.
-        campaign_tags = (
-            Project.query.with_entities(Project.campaign.label("tag"))
-            .filter(or_(Project.author_id == user.id, Project.id == sq.c.project_id))
-            .subquery()
-        )
-        # Get projects with given campaign tags but without user contributions.
-        query = (
-            Project.query.with_entities(
-                Project.id,
-                ProjectInfo.name,
-                Project.centroid.ST_AsGeoJSON().label("centroid"),
-                Project.tasks_mapped,
-                Project.tasks_validated,
-                Project.status,
-                Project.total_tasks,
+        recommendations = UserRecommendations.get(user.id)
+        if recommendations is None or (
+            recommendations.is_stale
+            and recommendations.updated_date
+            < timestamp() - RECOMMENDATIONS_REFRESH_INTERVAL
+        ):
+            # New or active users get their recommendations on view rather than waiting for the
+            # nightly job, throttled so busy mappers don't recompute them on every view
+            UserRecommendations.refresh([user.id])
+            db.session.commit()
+            recommendations = UserRecommendations.get(user.id)
+
+        projects = {}
+        if recommendations.project_ids:
+            query = (
+                db.session.query(
+                    Project.id,
+                    ProjectSearchIndex.name,
+                    ProjectSearchIndex.locale,
+                    Project.centroid.ST_AsGeoJSON().label("centroid"),
+                    Project.tasks_mapped,
+                    Project.tasks_validated,
+                    Project.status,
+                )
+                .join(ProjectSearchIndex, ProjectSearchIndex.project_id == Project.id)
+                .filter(Project.id.in_(recommendations.project_ids))
+                .filter(Project.status == ProjectStatus.PUBLISHED.value)
+                .filter(
+                    or_(
+                        ProjectSearchIndex.locale == preferred_locale,
+                        ProjectSearchIndex.is_default_locale,
+                    )
+                )
             )
-            .join(ProjectInfo)
-            .filter(Project.private is not True)
-            .filter(Project.id != sq.c.project_id)
-            .filter(Project.mapper_level <= user.mapping_level)
-        )
-        projs = (
-            query.filter(Project.campaign.any(campaign_tags.c.tag)).limit(limit).all()
-        )
-
-        # Get only user mapping level projects.
-        len_projs = len(projs)
-        if len_projs < limit:
-            remaining_projs = query.limit(limit - len_projs).all()
-            projs.extend(remaining_projs)
+            for r in query.all():
+                # Prefer the name in the requested locale over the default one
+                if r.id not in projects or r.locale == preferred_locale:
+                    projects[r.id] = r
 
         proj_dto = UserRecommendedProjectsDTO()
         proj_dto.recommended_projects = [
@@ -563,11 +572,38 @@ class UserService:
                     centroid=r.centroid,
                 )
             )
-            for r in projs
+            for r in (projects.get(i) for i in recommendations.project_ids)
+            if r is not None
         ]
 
         return proj_dto
 
+    @staticmethod
+    def refresh_recommendations() -> int:
+        """ Recomputes the recommended projects of every user, in batches """
+        users_updated = 0
+        last_user_id = 0
+
+        while True:
+            user_ids = [
+                r.id
+                for r in User.query.with_entities(User.id)
+                .filter(User.id > last_user_id)
+                .order_by(User.id)
+                .limit(RECOMMENDATIONS_BATCH_SIZE)
+            ]
+            if not user_ids:
+                break
+
+            UserRecommendations.refresh(user_ids)
+            db.session.commit()
+
+            users_updated += len(user_ids)
+            last_user_id = user_ids[-1]
+            current_app.logger.info(f"{users_updated} user recommendations updated")
+
+        return users_updated
+
     @staticmethod
     def add_role_to_user(admin_user_id: int, username: str, role: str):
         """
@@ -689,12 +725,9 @@ class UserService:
 
     @staticmethod
     def notify_level_upgrade(user_id: int, username: str, level: str):
-        text_template = get_template("level_upgrade_message_en.txt")
-
-        if username is not None:
-            text_template = text_template.replace("[USERNAME]", username)
-
-        text_template = text_template.replace("[LEVEL]", level)
+        text_template = render_template(
+            "level_upgrade_message.txt", username=username or "", level=level
+        )
         level_upgrade_message = Message()
         level_upgrade_message.to_user_id = user_id
         level_upgrade_message.subject = "Mapper Level Upgrade "
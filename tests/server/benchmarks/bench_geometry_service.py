@@ -0,0 +1,56 @@
+"""
+Microbenchmarks of the in process geometry helpers, not collected by the test runner.
+Run with: python -m tests.server.benchmarks.bench_geometry_service
+"""
+import timeit
+
+from pyproj import Transformer
+from shapely.geometry import Point
+from shapely.ops import transform
+
+from server.services.geometry_service import GeometryService
+
+REPEAT = 5
+NUMBER = 200
+
+# A detailed project AOI, roughly 6 km across with 1024 vertices
+AOI = Point(32.5, -12.6).buffer(0.05, resolution=256)
+
+
+def bench_transformer_created_per_call():
+    transformer = Transformer.from_crs("EPSG:4326", "EPSG:3857", always_xy=True)
+    transform(transformer.transform, AOI)
+
+
+def bench_cached_transformer():
+    GeometryService.transform_geometry(AOI, 4326, 3857)
+
+
+def bench_point_by_point_transform():
+    transformer = GeometryService.get_transformer(4326, 3857)
+    [transformer.transform(x, y) for x, y in AOI.exterior.coords]
+
+
+def bench_vectorized_transform():
+    xs, ys = AOI.exterior.xy
+    GeometryService.transform_coordinates(xs, ys, 4326, 3857)
+
+
+def bench_geodesic_area():
+    GeometryService.get_geodesic_area(AOI)
+
+
+def main():
+    for name, bench in [
+        ("transformer created per call", bench_transformer_created_per_call),
+        ("cached transformer", bench_cached_transformer),
+        ("point by point transform", bench_point_by_point_transform),
+        ("vectorized transform", bench_vectorized_transform),
+        ("geodesic area", bench_geodesic_area),
+    ]:
+        best = min(timeit.repeat(bench, repeat=REPEAT, number=NUMBER)) / NUMBER
+        print(f"{name:<32}{best * 1000000:>10.1f} us")
+
+
+if __name__ == "__main__":
+    main()
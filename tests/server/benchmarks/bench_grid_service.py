@@ -0,0 +1,82 @@
+"""
+Benchmark of trimming a 100k square task grid to a detailed AOI, not collected by the test runner.
+Run with: python -m tests.server.benchmarks.bench_grid_service
+"""
+import time
+
+import shapely.geometry
+from shapely.geometry import Point, box, mapping
+
+from server.models.dtos.grid_dto import GridDTO
+from server.services.grid.grid_service import GridService
+
+GRID_SIDE = 317  # Squares per side, just over 100k squares
+SQUARE_SIZE = 0.001  # Degrees, roughly a zoom 18 task square
+
+
+def make_grid_dto(clip_to_aoi: bool) -> GridDTO:
+    # AOI is a detailed disc inscribed in the grid, with a country scale number of vertices,
+    # so the grid has inside, outside and boundary squares
+    radius = GRID_SIDE * SQUARE_SIZE / 2
+    aoi = Point(radius, radius).buffer(radius, resolution=8192)
+    features = [
+        {
+            "type": "Feature",
+            "geometry": mapping(
+                box(
+                    x * SQUARE_SIZE,
+                    y * SQUARE_SIZE,
+                    (x + 1) * SQUARE_SIZE,
+                    (y + 1) * SQUARE_SIZE,
+                )
+            ),
+            "properties": {"x": x, "y": y, "zoom": 18, "isSquare": True},
+        }
+        for x in range(GRID_SIDE)
+        for y in range(GRID_SIDE)
+    ]
+
+    grid_dto = GridDTO()
+    grid_dto.area_of_interest = {
+        "type": "FeatureCollection",
+        "features": [{"type": "Feature", "geometry": mapping(aoi), "properties": {}}],
+    }
+    grid_dto.grid = {"type": "FeatureCollection", "features": features}
+    grid_dto.clip_to_aoi = clip_to_aoi
+    return grid_dto
+
+
+def trim_sequentially_unprepared(grid_dto: GridDTO) -> int:
+    """ Trimming as done before the index, kept as the baseline """
+    aoi = shapely.geometry.shape(
+        GridService.merge_to_multi_polygon(grid_dto.area_of_interest, dissolve=True)
+    )
+    kept = 0
+    for feature in grid_dto.grid["features"]:
+        tile = shapely.geometry.shape(feature["geometry"])
+        if aoi.contains(tile) or not aoi.intersection(tile).is_empty:
+            kept += 1
+    return kept
+
+
+def main():
+    for clip_to_aoi in [False, True]:
+        grid_dto = make_grid_dto(clip_to_aoi)
+        squares = len(grid_dto.grid["features"])
+
+        start = time.perf_counter()
+        baseline_kept = trim_sequentially_unprepared(grid_dto)
+        baseline = time.perf_counter() - start
+
+        start = time.perf_counter()
+        kept = len(GridService.trim_grid_to_aoi(grid_dto)["features"])
+        indexed = time.perf_counter() - start
+
+        print(
+            f"{squares} squares, clip {clip_to_aoi}: kept {kept} (baseline {baseline_kept}), "
+            f"baseline {baseline:.2f}s, indexed {indexed:.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Times rendering the new message alert for 10k notifications: reading and replacing into the
+template files for each notification as was done before, rendering the compiled templates for
+each notification, and rendering them once for the batch with the username filled in per user as
+SMTPService.send_email_alerts queues them.
+Run with python -m tests.server.benchmarks.bench_templates
+"""
+import os
+import time
+
+from server.services.messaging.template_service import TEMPLATES_DIR, TemplateRegistry
+
+NOTIFICATIONS = 10000
+INBOX_URL = "https://tasks.hotosm.org/inbox"
+
+
+def render_from_disk(username: str) -> tuple:
+    """ Reads both parts of the alert from disk and replaces the values, for every notification """
+    parts = []
+    for file_name in ("message_alert_en.html", "message_alert_en.txt"):
+        with open(os.path.join(TEMPLATES_DIR, file_name), encoding="utf-8") as template:
+            part = template.read()
+        part = part.replace("{{ username }}", username)
+        part = part.replace("{{ profile_url }}", INBOX_URL)
+        parts.append(part)
+
+    return tuple(parts)
+
+
+def render_from_registry(registry: TemplateRegistry, username: str) -> tuple:
+    values = dict(username=username, profile_url=INBOX_URL)
+    return (
+        registry.render("message_alert.html", "en-GB,en;q=0.9", **values),
+        registry.render("message_alert.txt", "en-GB,en;q=0.9", **values),
+    )
+
+
+def render_batch(registry: TemplateRegistry, usernames: list) -> list:
+    html, text = render_from_registry(registry, "[USERNAME]")
+    return [
+        (html.replace("[USERNAME]", username), text.replace("[USERNAME]", username))
+        for username in usernames
+    ]
+
+
+def bench(name: str, render) -> float:
+    started = time.perf_counter()
+    for i in range(NOTIFICATIONS):
+        render(f"mapper{i}")
+    elapsed = time.perf_counter() - started
+
+    report(name, elapsed)
+
+
+def report(name: str, elapsed: float):
+    print(
+        f"{name:<10} {elapsed * 1000:8.1f} ms for {NOTIFICATIONS} notifications, "
+        f"{elapsed / NOTIFICATIONS * 1000000:6.1f} µs each"
+    )
+
+
+def main():
+    started = time.perf_counter()
+    registry = TemplateRegistry()
+    print(f"Compiled templates in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    bench("disk", render_from_disk)
+    bench("registry", lambda username: render_from_registry(registry, username))
+
+    started = time.perf_counter()
+    render_batch(registry, [f"mapper{i}" for i in range(NOTIFICATIONS)])
+    report("batch", time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import os
+import unittest
+
+from server import create_app, db
+from server.models.postgis.email_outbox import EmailOutbox
+from server.services.messaging.smtp_service import SMTPService
+from tests.server.helpers.test_helpers import create_canned_user
+
+
+class TestEmailOutbox(unittest.TestCase):
+    skip_tests = False
+    test_user = None
+
+    @classmethod
+    def setUpClass(cls):
+        env = os.getenv("CI", "false")
+
+        # Firewall rules mean we can't hit Postgres from CI so we have to skip them in the CI build
+        if env == "true":
+            cls.skip_tests = True
+
+    def setUp(self):
+        """
+        Setup test context so we can connect to database
+        """
+        self.app = create_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+        if self.skip_tests:
+            return
+
+        self.test_user = create_canned_user()
+        self.test_user.username = "<b>Tom & Jerry</b>"
+        self.test_user.email_address = "hot-test@mailinator.com"
+        db.session.commit()
+
+    def tearDown(self):
+        if self.skip_tests:
+            return
+
+        EmailOutbox.query.filter_by(to_address="hot-test@mailinator.com").delete()
+        db.session.commit()
+        self.test_user.delete()
+        self.ctx.pop()
+
+    def test_username_is_escaped_in_html_of_bulk_alerts(self):
+        if self.skip_tests:
+            return
+
+        # Act
+        queued = SMTPService.send_email_alerts([self.test_user.id])
+        db.session.commit()
+
+        # Assert
+        email = EmailOutbox.query.filter_by(to_address="hot-test@mailinator.com").one()
+        self.assertEqual(queued, 1)
+        self.assertIn("&lt;b&gt;Tom &amp; Jerry&lt;/b&gt;", email.html_message)
+        self.assertNotIn("<b>Tom", email.html_message)
+        self.assertIn("<b>Tom & Jerry</b>", email.text_message)
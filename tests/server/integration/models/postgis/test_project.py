@@ -2,15 +2,21 @@ import copy
 import os
 import unittest
 import geojson
-from server import create_app
+from sqlalchemy import event
+from server import create_app, db
+from server.models.postgis.organisation import Organisation
 from server.models.postgis.project import (
     Task,
     ProjectDTO,
     ProjectStatus,
     ProjectPriority,
     Project,
+    ProjectTeams,
 )
 from server.models.postgis.project_info import ProjectInfoDTO
+from server.models.postgis.statuses import TaskStatus, TeamRoles
+from server.models.postgis.team import Team
+from server.models.postgis.user import User
 from tests.server.helpers.test_helpers import create_canned_project
 
 
@@ -159,7 +165,102 @@ class TestProject(unittest.TestCase):
         )  # SQLAlchemy is hanging on to a ref to the old project
         original_project.delete()
 
-    def update_project_with_info(self):
+    def test_project_dto_query_count_does_not_grow_with_priority_areas(self):
+        if self.skip_tests:
+            return
+
+        # Arrange
+        self.update_project_with_info()
+        one_area_count = self.count_dto_queries()
+        self.update_project_with_info(priority_area_count=5)
+
+        # Act
+        five_areas_count = self.count_dto_queries()
+
+        # Assert
+        self.assertEqual(one_area_count, five_areas_count)
+
+    def test_project_dto_query_count_does_not_grow_with_teams_or_active_mappers(self):
+        if self.skip_tests:
+            return
+
+        # Arrange
+        self.update_project_with_info()
+        no_teams_count = self.count_dto_queries()
+        organisation, mapper = self.add_teams_and_active_mappers(team_count=3)
+
+        # Act
+        three_teams_count = self.count_dto_queries()
+        project_dto = Project.get_for_dto(self.test_project.id).as_dto_for_mapping(
+            "en", False
+        )
+
+        # Tidy Up
+        for project_team in ProjectTeams.query.filter_by(
+            project_id=self.test_project.id
+        ):
+            db.session.delete(project_team.team)
+        for task in self.test_project.tasks:
+            task.task_status = TaskStatus.READY.value
+            task.locked_by = None
+        db.session.commit()
+        organisation.delete()
+        mapper.delete()
+
+        # Assert
+        self.assertEqual(no_teams_count, three_teams_count)
+        self.assertEqual(len(project_dto.project_teams), 3)
+        self.assertEqual(project_dto.active_mappers, 2)
+
+    def add_teams_and_active_mappers(self, team_count: int):
+        """ Adds teams to the project and locks each of its tasks by a different mapper """
+        organisation = Organisation()
+        organisation.name = "Thinkwhere Test Organisation"
+        organisation.create()
+
+        for i in range(team_count):
+            team = Team()
+            team.name = f"Thinkwhere Test Team {i}"
+            team.organisation = organisation
+            project_team = ProjectTeams()
+            project_team.team = team
+            project_team.project = self.test_project
+            project_team.role = TeamRoles.MAPPER.value
+            db.session.add(project_team)
+
+        mapper = User()
+        mapper.id = self.test_user.id + 1
+        mapper.username = "Thinkwhere MAPPER"
+        mapper.mapping_level = 1
+        db.session.add(mapper)
+        db.session.flush()
+
+        for task, user_id in zip(
+            self.test_project.tasks, [self.test_user.id, mapper.id]
+        ):
+            task.task_status = TaskStatus.LOCKED_FOR_MAPPING.value
+            task.locked_by = user_id
+        db.session.commit()
+
+        return organisation, mapper
+
+    def count_dto_queries(self):
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        db.session.expire_all()
+        event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+        try:
+            project = Project.get_for_dto(self.test_project.id)
+            project.as_dto_for_mapping("en", False)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+        return len(statements)
+
+    def update_project_with_info(self, priority_area_count=1):
 
         locales = []
         test_info = ProjectInfoDTO()
@@ -179,4 +280,11 @@ class TestProject(unittest.TestCase):
         test_dto.mapping_types = ["ROADS"]
         test_dto.mapping_editors = ["JOSM", "ID"]
         test_dto.validation_editors = ["JOSM"]
+        test_dto.priority_areas = [
+            {
+                "type": "Polygon",
+                "coordinates": [[[i, 0], [i + 1, 0], [i + 1, 1], [i, 1], [i, 0]]],
+            }
+            for i in range(priority_area_count)
+        ]
         self.test_project.update(test_dto)
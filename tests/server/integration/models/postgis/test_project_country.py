@@ -0,0 +1,116 @@
+import os
+import unittest
+
+from server import create_app, db
+from server.models.dtos.project_dto import ProjectSearchDTO
+from server.models.postgis.project_country import ProjectCountry
+from server.services.project_search_service import ProjectSearchService
+from tests.server.helpers.test_helpers import create_canned_project
+
+
+class TestProjectCountry(unittest.TestCase):
+    skip_tests = False
+    test_project = None
+    test_user = None
+
+    @classmethod
+    def setUpClass(cls):
+        env = os.getenv("CI", "false")
+
+        # Firewall rules mean we can't hit Postgres from CI so we have to skip them in the CI build
+        if env == "true":
+            cls.skip_tests = True
+
+    def setUp(self):
+        """
+        Setup test context so we can connect to database
+        """
+        self.app = create_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+        if self.skip_tests:
+            return
+
+        self.test_project, self.test_user = create_canned_project()
+
+    def tearDown(self):
+        if self.skip_tests:
+            return
+
+        self.test_project.delete()
+        self.test_user.delete()
+        self.ctx.pop()
+
+    def get_countries(self) -> dict:
+        rows = ProjectCountry.query.filter_by(project_id=self.test_project.id).all()
+        return {row.country_name: row.country_code for row in rows}
+
+    def search_country(self, country: str) -> list:
+        search_dto = ProjectSearchDTO()
+        search_dto.preferred_locale = "en"
+        search_dto.is_project_manager = True
+        search_dto.project_statuses = ["DRAFT"]
+        search_dto.country = country
+
+        query = ProjectSearchService._filter_projects(search_dto)
+        return [row.project_id for row in query.all()]
+
+    def test_sync_replaces_countries_of_project(self):
+        if self.skip_tests:
+            return
+
+        # Arrange
+        ProjectCountry.sync(
+            self.test_project.id, ["Kenya", "Uganda"], {"Kenya": "ke", "Uganda": "UG"}
+        )
+        db.session.commit()
+
+        # Act
+        ProjectCountry.sync(self.test_project.id, ["Kenya", "Tanzania", ""])
+        db.session.commit()
+
+        # Assert
+        self.assertEqual(self.get_countries(), {"Kenya": "KE", "Tanzania": None})
+
+    def test_sync_without_countries_removes_all_rows(self):
+        if self.skip_tests:
+            return
+
+        # Arrange
+        ProjectCountry.sync(self.test_project.id, ["Kenya"], {"Kenya": "KE"})
+        db.session.commit()
+
+        # Act
+        ProjectCountry.sync(self.test_project.id, None)
+        db.session.commit()
+
+        # Assert
+        self.assertEqual(self.get_countries(), {})
+
+    def test_country_filter_matches_partial_name_or_code(self):
+        if self.skip_tests:
+            return
+
+        # Arrange
+        ProjectCountry.sync(self.test_project.id, ["Kenya"], {"Kenya": "KE"})
+        db.session.commit()
+
+        # Act / Assert
+        self.assertIn(self.test_project.id, self.search_country("keny"))
+        self.assertIn(self.test_project.id, self.search_country(" ke "))
+        self.assertNotIn(self.test_project.id, self.search_country("Uganda"))
+
+    def test_country_filter_returns_project_once_for_many_matching_countries(self):
+        if self.skip_tests:
+            return
+
+        # Arrange
+        ProjectCountry.sync(self.test_project.id, ["Guinea", "Guinea-Bissau"])
+        db.session.commit()
+
+        # Act
+        project_ids = self.search_country("Guinea")
+
+        # Assert
+        self.assertEqual(project_ids.count(self.test_project.id), 1)
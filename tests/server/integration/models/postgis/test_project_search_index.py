@@ -0,0 +1,77 @@
+import os
+import unittest
+
+from server import create_app
+from server.models.postgis.project_search_index import ProjectSearchIndex
+from tests.server.helpers.test_helpers import create_canned_project
+
+
+class TestProjectSearchIndex(unittest.TestCase):
+    skip_tests = False
+    test_project = None
+    test_user = None
+
+    @classmethod
+    def setUpClass(cls):
+        env = os.getenv("CI", "false")
+
+        # Firewall rules mean we can't hit Postgres from CI so we have to skip them in the CI build
+        if env == "true":
+            cls.skip_tests = True
+
+    def setUp(self):
+        """
+        Setup test context so we can connect to database
+        """
+        self.app = create_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+        if self.skip_tests:
+            return
+
+        self.test_project, self.test_user = create_canned_project()
+
+    def tearDown(self):
+        if self.skip_tests:
+            return
+
+        self.test_project.delete()
+        self.test_user.delete()
+        self.ctx.pop()
+
+    def get_index_row(self) -> ProjectSearchIndex:
+        return ProjectSearchIndex.query.filter_by(
+            project_id=self.test_project.id, locale="en"
+        ).one()
+
+    def test_index_row_is_built_when_project_is_saved(self):
+        if self.skip_tests:
+            return
+
+        # Act
+        self.test_project.tasks_mapped = 1
+        self.test_project.save()
+
+        # Assert
+        row = self.get_index_row()
+        self.assertEqual(row.name, "Test")
+        self.assertTrue(row.is_default_locale)
+        self.assertEqual(row.percent_mapped, 50)
+
+    def test_task_changes_refresh_progress_at_end_of_request(self):
+        if self.skip_tests:
+            return
+
+        # Arrange
+        task = self.test_project.tasks[1]
+
+        with self.app.test_request_context():
+            # Act
+            task.lock_task_for_mapping(self.test_user.id)
+            active_mappers_during_request = self.get_index_row().active_mappers
+            ProjectSearchIndex.refresh_scheduled_progress()
+
+        # Assert
+        self.assertEqual(active_mappers_during_request, 0)
+        self.assertEqual(self.get_index_row().active_mappers, 1)
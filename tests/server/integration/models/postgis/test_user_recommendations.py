@@ -0,0 +1,113 @@
+import os
+import unittest
+
+from server import create_app, db
+from server.models.postgis.statuses import MappingLevel, ProjectStatus
+from server.models.postgis.user import User
+from server.models.postgis.user_recommendations import UserRecommendations
+from tests.server.helpers.test_helpers import create_canned_project
+
+
+class TestUserRecommendations(unittest.TestCase):
+    skip_tests = False
+    test_project = None
+    test_user = None
+    mapper = None
+
+    @classmethod
+    def setUpClass(cls):
+        env = os.getenv("CI", "false")
+
+        # Firewall rules mean we can't hit Postgres from CI so we have to skip them in the CI build
+        if env == "true":
+            cls.skip_tests = True
+
+    def setUp(self):
+        """
+        Setup test context so we can connect to database
+        """
+        self.app = create_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+        if self.skip_tests:
+            return
+
+        self.test_project, self.test_user = create_canned_project()
+        self.test_project.status = ProjectStatus.PUBLISHED.value
+        self.test_project.mapper_level = MappingLevel.BEGINNER.value
+        self.test_project.save()
+
+        # The author of the canned project never gets it recommended
+        self.mapper = User()
+        self.mapper.id = 1235
+        self.mapper.username = "Thinkwhere MAPPER"
+        self.mapper.mapping_level = MappingLevel.BEGINNER.value
+        self.mapper.create()
+
+    def tearDown(self):
+        if self.skip_tests:
+            return
+
+        self.test_project.delete()
+        self.test_user.delete()
+        self.mapper.delete()
+        self.ctx.pop()
+
+    def get_recommended_ids(self, user_id: int) -> list:
+        UserRecommendations.refresh([user_id])
+        db.session.commit()
+        return UserRecommendations.get(user_id).project_ids
+
+    def test_published_project_is_recommended_to_mapper(self):
+        if self.skip_tests:
+            return
+
+        # Act / Assert
+        self.assertIn(self.test_project.id, self.get_recommended_ids(self.mapper.id))
+
+    def test_authored_project_is_not_recommended(self):
+        if self.skip_tests:
+            return
+
+        # Act / Assert
+        self.assertNotIn(
+            self.test_project.id, self.get_recommended_ids(self.test_user.id)
+        )
+
+    def test_contributed_project_is_not_recommended(self):
+        if self.skip_tests:
+            return
+
+        # Arrange
+        User.upsert_mapped_projects(self.mapper.id, self.test_project.id)
+
+        # Act / Assert
+        self.assertNotIn(self.test_project.id, self.get_recommended_ids(self.mapper.id))
+
+    def test_project_above_mapper_level_is_not_recommended(self):
+        if self.skip_tests:
+            return
+
+        # Arrange
+        self.test_project.mapper_level = MappingLevel.ADVANCED.value
+        self.test_project.save()
+
+        # Act / Assert
+        self.assertNotIn(self.test_project.id, self.get_recommended_ids(self.mapper.id))
+
+    def test_refresh_clears_stale_flag(self):
+        if self.skip_tests:
+            return
+
+        # Arrange
+        self.get_recommended_ids(self.mapper.id)
+        UserRecommendations.mark_stale(self.mapper.id)
+        db.session.commit()
+        self.assertTrue(UserRecommendations.get(self.mapper.id).is_stale)
+
+        # Act
+        self.get_recommended_ids(self.mapper.id)
+
+        # Assert
+        self.assertFalse(UserRecommendations.get(self.mapper.id).is_stale)
@@ -1,10 +1,16 @@
 import os
 import unittest
 
-from server import create_app
+from server import create_app, db
 
+from server.models.dtos.message_dto import MessageDTO
+from server.models.postgis.message import Message
+from server.models.postgis.notification import Notification
 from server.services.messaging.message_service import MessageService
-from tests.server.helpers.test_helpers import create_canned_user
+from tests.server.helpers.test_helpers import (
+    create_canned_project,
+    create_canned_user,
+)
 
 
 class TestMessageService(unittest.TestCase):
@@ -49,3 +55,57 @@ class TestMessageService(unittest.TestCase):
 
         # Tidyup
         MessageService.delete_message(message_id, self.test_user.id)
+
+
+class TestBroadcastMessage(unittest.TestCase):
+    skip_tests = False
+
+    @classmethod
+    def setUpClass(cls):
+        env = os.getenv("CI", "false")
+
+        # Firewall rules mean we can't hit Postgres from CI so we have to skip them in the CI build
+        if env == "true":
+            cls.skip_tests = True
+
+    def setUp(self):
+        if self.skip_tests:
+            return
+
+        self.app = create_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+        self.test_project, self.test_user = create_canned_project()
+
+    def tearDown(self):
+        if self.skip_tests:
+            return
+
+        Message.query.filter_by(project_id=self.test_project.id).delete()
+        Notification.query.filter_by(user_id=self.test_user.id).delete()
+        db.session.commit()
+        self.test_project.delete()
+        self.test_user.delete()
+        self.ctx.pop()
+
+    def test_message_is_sent_to_contributors(self):
+        if self.skip_tests:
+            return
+
+        # Arrange
+        message_dto = MessageDTO()
+        message_dto.subject = "Thanks"
+        message_dto.message = "Thanks for your contribution"
+        message_dto.from_user_id = self.test_user.id
+
+        # Act
+        contributors = MessageService.send_message_to_all_contributors(
+            self.test_project.id, message_dto
+        )
+
+        # Assert
+        self.assertEqual(contributors, 1)
+        message = Message.query.filter_by(project_id=self.test_project.id).one()
+        self.assertEqual(message.to_user_id, self.test_user.id)
+        self.assertEqual(Notification.get_unread_message_count(self.test_user.id), 1)
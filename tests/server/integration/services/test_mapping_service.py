@@ -1,10 +1,10 @@
 import datetime
-import hashlib
 import os
 import unittest
+import xml.etree.ElementTree as ET
 from unittest.mock import patch
 from server import create_app
-from server.services.mapping_service import MappingService, Task
+from server.services.mapping_service import MappingService, NotFound, Task
 from tests.server.helpers.test_helpers import create_canned_project
 
 
@@ -40,83 +40,102 @@ class TestMappingService(unittest.TestCase):
         self.test_user.delete()
         self.ctx.pop()
 
-    @patch.object(Task, "get_tasks")
-    def test_gpx_xml_file_generated_correctly(self, mock_task):
+    def test_gpx_xml_file_generated_correctly(self):
         if self.skip_tests:
             return
 
         # Arrange
-        task = Task.get(1, self.test_project.id)
-        mock_task.return_value = [task]
         timestamp = datetime.date(2017, 4, 13)
 
         # Act
-        gpx_xml = MappingService.generate_gpx(1, "1,2", timestamp)
-
-        # Covert XML into a hash that should be identical every time
-        gpx_xml_str = gpx_xml.decode("utf-8")
-        gpx_hash = hashlib.md5(gpx_xml_str.encode("utf-8")).hexdigest()
+        gpx_xml = b"".join(
+            MappingService.generate_gpx(self.test_project.id, "1", timestamp)
+        )
 
         # Assert
-        self.assertEqual(gpx_hash, "b91f7361cc1d6d9433cf393609103272")
-
-    @patch.object(Task, "get_all_tasks")
-    def test_gpx_xml_file_generated_correctly_all_tasks(self, mock_task):
+        gpx = ET.fromstring(gpx_xml)
+        namespace = {"gpx": "http://www.topografix.com/GPX/1/1"}
+        self.assertEqual(
+            gpx.find("gpx:metadata/gpx:time", namespace).text, "2017-04-13"
+        )
+        track_points = gpx.findall("gpx:trk/gpx:trkseg/gpx:trkpt", namespace)
+        self.assertEqual(len(track_points), 5)
+        self.assertEqual(len(gpx.findall("gpx:wpt", namespace)), 5)
+        self.assertEqual(track_points[0].get("lon"), "-2.4609374995591673")
+        self.assertEqual(track_points[0].get("lat"), "54.8766066473153")
+
+    def test_gpx_xml_file_generated_correctly_all_tasks(self):
         if self.skip_tests:
             return
 
         # Arrange
-        task = Task.get(1, self.test_project.id)
-        mock_task.return_value = [task]
         timestamp = datetime.date(2017, 4, 13)
 
         # Act
-        gpx_xml = MappingService.generate_gpx(1, None, timestamp)
-
-        # Convert XML into a hash that should be identical every time
-        gpx_xml_str = gpx_xml.decode("utf-8")
-        gpx_hash = hashlib.md5(gpx_xml_str.encode("utf-8")).hexdigest()
+        gpx_xml = b"".join(
+            MappingService.generate_gpx(self.test_project.id, None, timestamp)
+        )
 
         # Assert
-        self.assertEqual(gpx_hash, "b91f7361cc1d6d9433cf393609103272")
+        gpx = ET.fromstring(gpx_xml)
+        namespace = {"gpx": "http://www.topografix.com/GPX/1/1"}
+        self.assertEqual(len(gpx.findall("gpx:trk/gpx:trkseg", namespace)), 2)
 
-    @patch.object(Task, "get_tasks")
-    def test_osm_xml_file_generated_correctly(self, mock_task):
+    def test_osm_xml_file_generated_correctly(self):
         if self.skip_tests:
             return
 
-        # Arrange
-        task = Task.get(1, self.test_project.id)
-        mock_task.return_value = [task]
-
         # Act
-        osm_xml = MappingService.generate_osm_xml(1, "1,2")
+        osm_xml = b"".join(MappingService.generate_osm_xml(self.test_project.id, "1"))
 
-        # Covert XML into a hash that should be identical every time
-        osm_xml_str = osm_xml.decode("utf-8")
-        osm_hash = hashlib.md5(osm_xml_str.encode("utf-8")).hexdigest()
+        # Assert
+        osm = ET.fromstring(osm_xml)
+        self.assertEqual(osm.get("upload"), "never")
+        way = osm.find("way")
+        self.assertEqual(way.get("id"), "-1")
+        node_ids = [node.get("id") for node in osm.findall("node")]
+        self.assertEqual(node_ids, ["-1", "-2", "-3", "-4", "-5"])
+        self.assertEqual([nd.get("ref") for nd in way.findall("nd")], node_ids)
+
+    def test_osm_xml_file_generated_correctly_all_tasks(self):
+        if self.skip_tests:
+            return
+
+        # Act
+        osm_xml = b"".join(MappingService.generate_osm_xml(self.test_project.id, None))
 
         # Assert
-        self.assertEqual(osm_hash, "eafd0760a0d372e2ab139e25a2d300f1")
+        osm = ET.fromstring(osm_xml)
+        self.assertEqual([way.get("id") for way in osm.findall("way")], ["-1", "-2"])
+        node_ids = [int(node.get("id")) for node in osm.findall("node")]
+        self.assertEqual(node_ids, list(range(-1, -len(node_ids) - 1, -1)))
 
-    @patch.object(Task, "get_all_tasks")
-    def test_osm_xml_file_generated_correctly_all_tasks(self, mock_task):
+    def test_export_is_cached_until_project_version_changes(self):
         if self.skip_tests:
             return
 
         # Arrange
-        task = Task.get(1, self.test_project.id)
-        mock_task.return_value = [task]
+        first_export = b"".join(
+            MappingService.generate_osm_xml(self.test_project.id, "1")
+        )
 
         # Act
-        osm_xml = MappingService.generate_osm_xml(1, None)
-
-        # Convert XML into a hash that should be identical every time
-        osm_xml_str = osm_xml.decode("utf-8")
-        osm_hash = hashlib.md5(osm_xml_str.encode("utf-8")).hexdigest()
+        with patch.object(Task, "get_exterior_points") as mock_points:
+            cached_export = b"".join(
+                MappingService.generate_osm_xml(self.test_project.id, "1")
+            )
 
         # Assert
-        self.assertEqual(osm_hash, "eafd0760a0d372e2ab139e25a2d300f1")
+        mock_points.assert_not_called()
+        self.assertEqual(first_export, cached_export)
+
+    def test_export_raises_not_found_before_streaming(self):
+        if self.skip_tests:
+            return
+
+        # Act / Assert
+        with self.assertRaises(NotFound):
+            MappingService.generate_gpx(self.test_project.id, "999")
 
     def test_map_all_sets_counters_correctly(self):
         if self.skip_tests:
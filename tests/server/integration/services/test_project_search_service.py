@@ -147,4 +147,4 @@ class TestProjectSearchService(unittest.TestCase):
         expected = ProjectSearchService._get_area_sqm(polygon)
 
         # assert
-        self.assertEqual(expected, 28276407740.2797)
+        self.assertAlmostEqual(expected, 28276407740.2797, delta=1)
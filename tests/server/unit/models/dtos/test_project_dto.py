@@ -1,6 +1,6 @@
 import unittest
 from schematics.exceptions import DataError
-from server.models.dtos.project_dto import ProjectDTO
+from server.models.dtos.project_dto import ProjectDTO, ProjectSearchDTO
 
 
 class TestProjectDTO(unittest.TestCase):
@@ -12,3 +12,32 @@ class TestProjectDTO(unittest.TestCase):
         # Act / Assert
         with self.assertRaises(DataError):
             project_dto.validate()
+
+    def test_equivalent_searches_share_cache_key(self):
+        # Arrange
+        first_search = ProjectSearchDTO()
+        first_search.page = 1
+        first_search.mapping_types = ["ROADS", "BUILDINGS"]
+        first_search.text_search = "Flood  Response"
+        first_search.mapper_level = "ALL"
+
+        second_search = ProjectSearchDTO()
+        second_search.page = 1
+        second_search.mapping_types = ["BUILDINGS", "ROADS"]
+        second_search.text_search = "flood response"
+
+        # Act / Assert
+        self.assertEqual(first_search.get_cache_key(), second_search.get_cache_key())
+
+    def test_searches_with_different_filters_have_different_cache_keys(self):
+        # Arrange
+        first_search = ProjectSearchDTO()
+        first_search.page = 1
+        first_search.country = "Nepal"
+
+        second_search = ProjectSearchDTO()
+        second_search.page = 1
+        second_search.country = "Peru"
+
+        # Act / Assert
+        self.assertNotEqual(first_search.get_cache_key(), second_search.get_cache_key())
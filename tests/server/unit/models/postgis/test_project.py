@@ -0,0 +1,55 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from server import create_app
+from server.models.postgis.project import Project
+
+
+@patch("server.models.postgis.project.sleep")
+@patch("server.models.postgis.project.requests.get")
+@patch("server.models.postgis.project.db")
+class TestProject(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+    def tearDown(self):
+        self.ctx.pop()
+
+    def get_nominatim_country(self, mock_db, mock_get, address: dict):
+        mock_db.session.query.return_value.filter.return_value.one.return_value = (
+            "5.3",
+            "-4.0",
+        )
+        mock_get.return_value = MagicMock(json=MagicMock(return_value=address))
+        return Project()._get_nominatim_country()
+
+    def test_nominatim_country_is_named_as_bundled_boundaries(
+        self, mock_db, mock_get, mock_sleep
+    ):
+        # Act
+        countries, codes = self.get_nominatim_country(
+            mock_db,
+            mock_get,
+            {"address": {"country": "Côte d’Ivoire", "country_code": "ci"}},
+        )
+
+        # Assert
+        self.assertIn("accept-language=en", mock_get.call_args[0][0])
+        self.assertEqual(countries, ["Côte d'Ivoire"])
+        self.assertEqual(codes, {"Côte d'Ivoire": "ci"})
+
+    def test_nominatim_country_outside_bundled_boundaries_keeps_its_name(
+        self, mock_db, mock_get, mock_sleep
+    ):
+        # Act
+        countries, codes = self.get_nominatim_country(
+            mock_db,
+            mock_get,
+            {"address": {"country": "United States", "country_code": "us"}},
+        )
+
+        # Assert
+        self.assertEqual(countries, ["United States"])
+        self.assertEqual(codes, {"United States": "us"})
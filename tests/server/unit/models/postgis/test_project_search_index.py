@@ -0,0 +1,66 @@
+import unittest
+from unittest.mock import patch
+
+from server import create_app
+from server.models.postgis.project_search_index import ProjectSearchIndex
+
+
+@patch("server.models.postgis.project_search_index.CacheService")
+@patch("server.models.postgis.project_search_index.db")
+@patch.object(ProjectSearchIndex, "refresh_progress", return_value=False)
+class TestProjectSearchIndex(unittest.TestCase):
+    def setUp(self):
+        self.app = create_app()
+        self.ctx = self.app.app_context()
+        self.ctx.push()
+
+    def tearDown(self):
+        self.ctx.pop()
+
+    def test_progress_is_refreshed_once_per_request(
+        self, mock_refresh, mock_db, mock_cache
+    ):
+        with self.app.test_request_context():
+            # Arrange
+            for project_id in (2, 1, 2, 2):
+                ProjectSearchIndex.schedule_progress_refresh(project_id)
+            mock_refresh.assert_not_called()
+
+            # Act
+            refreshed = ProjectSearchIndex.refresh_scheduled_progress()
+
+            # Assert
+            self.assertEqual(refreshed, [1, 2])
+            self.assertEqual(mock_refresh.call_count, 2)
+            mock_db.session.commit.assert_called_once()
+            mock_cache.bump_search_version.assert_not_called()
+            self.assertEqual(ProjectSearchIndex.refresh_scheduled_progress(), [])
+
+    def test_searches_are_invalidated_when_progress_bucket_changes(
+        self, mock_refresh, mock_db, mock_cache
+    ):
+        # Arrange
+        mock_refresh.side_effect = [False, True]
+
+        with self.app.test_request_context():
+            ProjectSearchIndex.schedule_progress_refresh(1)
+            ProjectSearchIndex.schedule_progress_refresh(2)
+
+            # Act
+            ProjectSearchIndex.refresh_scheduled_progress()
+
+        # Assert
+        mock_cache.bump_search_version.assert_called_once()
+
+    def test_progress_is_refreshed_right_away_outside_requests(
+        self, mock_refresh, mock_db, mock_cache
+    ):
+        # Arrange
+        mock_refresh.return_value = True
+
+        # Act
+        search_changed = ProjectSearchIndex.schedule_progress_refresh(1)
+
+        # Assert
+        mock_refresh.assert_called_once_with(1)
+        self.assertTrue(search_changed)
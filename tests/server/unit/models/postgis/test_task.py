@@ -1,3 +1,4 @@
+import json
 import geojson
 import unittest
 from server import create_app
@@ -74,6 +75,49 @@ class TestTask(unittest.TestCase):
         with self.assertRaises(InvalidData):
             Task.from_geojson_feature(1, invalid_properties)
 
+    def test_task_rows_report_each_invalid_feature(self):
+        # Arrange
+        feature_collection = json.loads(
+            '{"type": "FeatureCollection", "features": ['
+            '{"geometry": {"coordinates": [[[[-4.0237, 56.0904], [-3.9111, 56.1715],'
+            '[-3.8122, 56.098], [-4.0237, 56.0904]]]], "type": "MultiPolygon"},'
+            '"properties": {"x": 2402, "y": 1736, "zoom": 12, "isSquare": true}, "type": "Feature"},'
+            '{"geometry": {"coordinates": [[[[-4.0237, 56.0904], [-3.9111, 56.1715],'
+            '[-3.8122, 56.098], [-4.0237]]]], "type": "MultiPolygon"},'
+            '"properties": {"x": 2402, "y": 1736, "zoom": 12, "isSquare": true}, "type": "Feature"},'
+            '{"geometry": {"coordinates": [[[[-4.0237, 56.0904], [-3.9111, 56.1715],'
+            '[-3.8122, 56.098], [-4.0237, 56.0904]]]], "type": "MultiPolygon"},'
+            '"properties": {"x": 2402, "y": 1736}, "type": "Feature"}]}'
+        )
+
+        # Act / Assert
+        with self.assertRaises(InvalidGeoJson) as context:
+            Task.rows_from_feature_collection(feature_collection)
+
+        error = str(context.exception)
+        self.assertIn("2 invalid features", error)
+        self.assertIn("Task 2: Invalid MultiPolygon", error)
+        self.assertIn("Task 3: Expected property not found: 'zoom'", error)
+
+    def test_task_rows_hold_properties_and_wkb_geometry(self):
+        # Arrange
+        feature_collection = json.loads(
+            '{"type": "FeatureCollection", "features": ['
+            '{"geometry": {"coordinates": [[[[-4.0237, 56.0904], [-3.9111, 56.1715],'
+            '[-3.8122, 56.098], [-4.0237, 56.0904]]]], "type": "MultiPolygon"},'
+            '"properties": {"x": null, "y": null, "zoom": null, "isSquare": false,'
+            '"extra_properties": {"name": "Task"}}, "type": "Feature"}]}'
+        )
+
+        # Act
+        task_rows = Task.rows_from_feature_collection(feature_collection)
+
+        # Assert
+        task_id, x, y, zoom, is_square, extra_properties, geometry = task_rows[0]
+        self.assertEqual((1, None, None, None, False), (task_id, x, y, zoom, is_square))
+        self.assertEqual(json.loads(extra_properties), {"name": "Task"})
+        self.assertTrue(geometry.startswith("0106000000"))  # little endian MultiPolygon
+
     def test_lock_task_for_mapping_adds_locked_history(self):
         # Arrange
         test_task = Task()
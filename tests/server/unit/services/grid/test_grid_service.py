@@ -6,7 +6,7 @@ import geojson
 from server.models.dtos.grid_dto import GridDTO
 from server.models.dtos.project_dto import DraftProjectDTO
 from server.models.postgis.utils import InvalidGeoJson
-from server.services.grid.grid_service import GridService
+from server.services.grid.grid_service import GridService, GridServiceError
 from tests.server.helpers.test_helpers import get_canned_json
 
 
@@ -72,6 +72,46 @@ class TestGridService(unittest.TestCase):
         # assert
         self.assertEqual(str(expected), str(result))
 
+    def test_generate_grid_covers_aoi_with_osm_tiles(self):
+        # arrange
+        aoi_geojson = get_canned_json("test_aoi.json")
+        split_square = get_canned_json("split_task.json")[0]["geometry"]
+
+        # act
+        result = json.loads("".join(GridService.generate_grid(aoi_geojson, 12, False)))
+
+        # assert
+        self.assertEqual(len(result["features"]), 7)
+        self.assertEqual(
+            result["features"][0]["properties"],
+            {"x": 2002, "y": 2822, "zoom": 12, "isSquare": True},
+        )
+        # squares share the OSM tile grid used when splitting tasks
+        square_ring = result["features"][0]["geometry"]["coordinates"][0][0]
+        split_ring = split_square["coordinates"][0][0]
+        self.assertAlmostEqual(
+            square_ring[1][0] - square_ring[0][0], split_ring[1][0] - split_ring[0][0]
+        )
+
+    def test_generated_tasks_match_generated_grid(self):
+        # arrange
+        aoi_geojson = get_canned_json("test_aoi.json")
+        grid = json.loads("".join(GridService.generate_grid(aoi_geojson, 12, True)))
+
+        # act
+        tasks = GridService.generate_tasks(aoi_geojson, 12, True)
+
+        # assert
+        self.assertEqual(json.loads(geojson.dumps(tasks)), grid)
+
+    def test_generate_grid_raises_error_when_grid_too_large(self):
+        # arrange
+        aoi_geojson = get_canned_json("test_aoi.json")
+
+        # act / assert
+        with self.assertRaises(GridServiceError):
+            GridService.generate_grid(aoi_geojson, 22, False)
+
     def test_tasks_from_aoi_features(self):
         # arrange
         grid_json = get_canned_json("test_arbitrary.json")
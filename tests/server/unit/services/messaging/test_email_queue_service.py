@@ -0,0 +1,224 @@
+import datetime
+import smtplib
+import socketserver
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from server.services.messaging.email_queue_service import (
+    EmailQueueService,
+    SMTPConnectionPool,
+    TokenBucket,
+)
+
+
+class StandInSMTPHandler(socketserver.StreamRequestHandler):
+    """ Speaks just enough SMTP for smtplib, recording the connections and messages it gets """
+
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+
+        self.reply("220 stand-in ready")
+        recipients = []
+        while True:
+            line = self.rfile.readline().decode().strip()
+            if not line:
+                return
+
+            command = line.split(" ")[0].upper()
+            if command in ("EHLO", "HELO"):
+                self.reply("250 stand-in")
+            elif command == "MAIL":
+                recipients = []
+                self.reply("250 OK")
+            elif command == "RCPT":
+                address = line.split(":", 1)[1].strip("<> ")
+                if address in server.rejected:
+                    self.reply(f"{server.rejected[address]} rejected")
+                else:
+                    recipients.append(address)
+                    self.reply("250 OK")
+            elif command == "DATA":
+                self.reply("354 go ahead")
+                while self.rfile.readline().decode().rstrip("\r\n") != ".":
+                    pass
+                with server.lock:
+                    server.messages.extend(recipients)
+                self.reply("250 queued")
+                if server.drop_after_message:
+                    return
+            elif command == "RSET" or command == "NOOP":
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 bye")
+                return
+            else:
+                self.reply("502 not implemented")
+
+    def reply(self, text: str):
+        self.wfile.write(f"{text}\r\n".encode())
+
+
+class StandInSMTPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, drop_after_message=False, rejected=None):
+        super().__init__(("127.0.0.1", 0), StandInSMTPHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = []
+        self.drop_after_message = drop_after_message
+        self.rejected = rejected or {}
+
+
+class TestSMTPConnectionPool(unittest.TestCase):
+    def start_server(self, **kwargs) -> SMTPConnectionPool:
+        self.server = StandInSMTPServer(**kwargs)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.pool = SMTPConnectionPool(
+            {
+                "host": "127.0.0.1",
+                "smtp_port": self.server.server_address[1],
+                "smtp_user": None,
+                "smtp_password": None,
+            }
+        )
+        return self.pool
+
+    def tearDown(self):
+        self.pool.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_pool_reuses_connection_for_messages(self):
+        # Arrange
+        pool = self.start_server()
+
+        # Act
+        for i in range(5):
+            pool.send("tm@test.com", f"user{i}@test.com", "Subject: test\r\n\r\nbody")
+
+        # Assert
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(len(self.server.messages), 5)
+
+    def test_pool_opens_a_connection_per_thread(self):
+        # Arrange
+        pool = self.start_server()
+        addresses = [f"user{i}@test.com" for i in range(20)]
+
+        # Act
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(
+                executor.map(
+                    lambda address: pool.send("tm@test.com", address, "body"),
+                    addresses,
+                )
+            )
+
+        # Assert
+        self.assertLessEqual(self.server.connections, 4)
+        self.assertEqual(sorted(self.server.messages), sorted(addresses))
+
+    def test_pool_reconnects_when_relay_drops_connection(self):
+        # Arrange
+        pool = self.start_server(drop_after_message=True)
+
+        # Act
+        pool.send("tm@test.com", "first@test.com", "body")
+        pool.send("tm@test.com", "second@test.com", "body")
+
+        # Assert
+        self.assertEqual(self.server.connections, 2)
+        self.assertEqual(self.server.messages, ["first@test.com", "second@test.com"])
+
+    def test_rejected_recipient_keeps_connection(self):
+        # Arrange
+        pool = self.start_server(rejected={"bounce@test.com": 550})
+
+        # Act
+        with self.assertRaises(smtplib.SMTPRecipientsRefused):
+            pool.send("tm@test.com", "bounce@test.com", "body")
+        pool.send("tm@test.com", "user@test.com", "body")
+
+        # Assert
+        self.assertEqual(self.server.connections, 1)
+        self.assertEqual(self.server.messages, ["user@test.com"])
+
+
+class TestEmailRetries(unittest.TestCase):
+    def test_temporary_failures_are_retried_with_backoff(self):
+        # Arrange
+        now = datetime.datetime(2020, 1, 1)
+        error = smtplib.SMTPRecipientsRefused({"user@test.com": (451, b"try later")})
+
+        # Act
+        delays = [
+            EmailQueueService.get_retry_date(attempts, 20, error, now) - now
+            for attempts in (1, 2, 3, 12)
+        ]
+
+        # Assert
+        self.assertEqual(
+            [delay.total_seconds() for delay in delays], [30, 60, 120, 6 * 60 * 60]
+        )
+
+    def test_permanent_failures_are_not_retried(self):
+        # Arrange
+        error = smtplib.SMTPRecipientsRefused({"bounce@test.com": (550, b"unknown")})
+
+        # Act
+        retry_at = EmailQueueService.get_retry_date(1, 10, error)
+
+        # Assert
+        self.assertIsNone(retry_at)
+
+    def test_failures_are_not_retried_after_max_attempts(self):
+        # Act
+        retry_at = EmailQueueService.get_retry_date(
+            10, 10, smtplib.SMTPServerDisconnected("gone")
+        )
+
+        # Assert
+        self.assertIsNone(retry_at)
+
+
+class TestClaimLease(unittest.TestCase):
+    def test_lease_outlasts_worst_case_batch(self):
+        # Act
+        lease = EmailQueueService.get_claim_lease(100, 4, 14)
+
+        # Assert - 25 emails per connection, each running into three 30s timeouts
+        self.assertGreater(lease, 25 * 3 * 30 + 100 / 14)
+
+    def test_lease_grows_with_batch_size(self):
+        # Act / Assert
+        self.assertGreater(
+            EmailQueueService.get_claim_lease(400, 4, 0),
+            EmailQueueService.get_claim_lease(100, 4, 0),
+        )
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_bucket_allows_burst_then_limits_rate(self):
+        # Arrange
+        clock = [0.0]
+
+        def sleep(seconds):
+            clock[0] += seconds
+
+        bucket = TokenBucket(5, clock=lambda: clock[0])
+
+        # Act
+        for _ in range(5):
+            bucket.acquire(sleep)
+        burst_time = clock[0]
+        for _ in range(10):
+            bucket.acquire(sleep)
+
+        # Assert
+        self.assertEqual(burst_time, 0)
+        self.assertAlmostEqual(clock[0], 2.0)
@@ -0,0 +1,113 @@
+import datetime
+import unittest
+from unittest.mock import patch
+
+from server.models.postgis.message import Message, MessageType
+from server.services.messaging.message_retention_service import (
+    MessageRetentionService,
+    MessageRetentionServiceError,
+)
+
+
+@patch("server.services.messaging.message_retention_service.db")
+@patch("server.services.messaging.message_retention_service.current_app")
+class TestMessageRetentionService(unittest.TestCase):
+    @patch.object(Message, "is_partitioned", return_value=False)
+    @patch.object(Message, "purge_batch")
+    def test_expired_messages_are_purged_in_batches(
+        self, mock_purge, mock_partitioned, mock_app, mock_db
+    ):
+        # Arrange
+        mock_app.config = {"MESSAGE_RETENTION_DAYS": "PROJECT_ACTIVITY_NOTIFICATION:90"}
+        mock_purge.side_effect = [100, 100, 42]
+
+        # Act
+        purged = MessageRetentionService.purge_expired_messages(batch_size=100)
+
+        # Assert
+        self.assertEqual(purged, 242)
+        self.assertEqual(mock_purge.call_count, 3)
+        self.assertEqual(mock_db.session.commit.call_count, 3)
+        message_type, before, batch_size = mock_purge.call_args[0]
+        self.assertEqual(message_type, MessageType.PROJECT_ACTIVITY_NOTIFICATION.value)
+        self.assertLess(
+            before, datetime.datetime.utcnow() - datetime.timedelta(days=89)
+        )
+
+    def test_retention_policies_are_parsed_from_config(self, mock_app, mock_db):
+        # Arrange
+        mock_app.config = {
+            "MESSAGE_RETENTION_DAYS": " SYSTEM:30, PROJECT_ACTIVITY_NOTIFICATION:90,"
+        }
+
+        # Act
+        policies = MessageRetentionService.get_retention_policies()
+
+        # Assert
+        self.assertEqual(
+            policies,
+            {MessageType.SYSTEM: 30, MessageType.PROJECT_ACTIVITY_NOTIFICATION: 90},
+        )
+
+    def test_invalid_policy_raises_error(self, mock_app, mock_db):
+        for policy in ["NOT_A_TYPE:30", "SYSTEM", "SYSTEM:ninety", "SYSTEM:0"]:
+            # Arrange
+            mock_app.config = {"MESSAGE_RETENTION_DAYS": policy}
+
+            # Act / Assert
+            with self.subTest(policy=policy), self.assertRaises(
+                MessageRetentionServiceError
+            ):
+                MessageRetentionService.get_retention_policies()
+
+    @patch.object(Message, "drop_partition_if_empty", return_value=True)
+    @patch.object(Message, "get_monthly_partitions")
+    def test_only_past_monthly_partitions_are_dropped(
+        self, mock_partitions, mock_drop, mock_app, mock_db
+    ):
+        # Arrange
+        mock_partitions.return_value = [
+            "messages_y2019m11",
+            "messages_y2019m12",
+            "messages_y2020m01",
+            "messages_y2020m02",
+        ]
+
+        # Act
+        dropped = MessageRetentionService.drop_empty_partitions(
+            datetime.datetime(2020, 1, 15)
+        )
+
+        # Assert
+        self.assertEqual(dropped, ["messages_y2019m11", "messages_y2019m12"])
+
+    @patch.object(Message, "create_monthly_partition")
+    @patch.object(Message, "get_monthly_partitions", return_value=["messages_y2020m02"])
+    @patch.object(Message, "partition_by_month")
+    @patch.object(Message, "is_partitioned", return_value=True)
+    @patch("server.services.messaging.message_retention_service.timestamp")
+    def test_missing_partitions_of_coming_months_are_created(
+        self,
+        mock_timestamp,
+        mock_partitioned,
+        mock_partition_by_month,
+        mock_partitions,
+        mock_create,
+        mock_app,
+        mock_db,
+    ):
+        # Arrange
+        mock_timestamp.return_value = datetime.datetime(2019, 12, 20)
+
+        # Act
+        created = MessageRetentionService.partition_messages(months_ahead=3)
+
+        # Assert
+        mock_partition_by_month.assert_not_called()
+        self.assertEqual(created, ["messages_y2020m01", "messages_y2020m03"])
+        mock_create.assert_any_call(
+            "messages_y2020m01", datetime.date(2020, 1, 1), datetime.date(2020, 2, 1)
+        )
+        mock_create.assert_any_call(
+            "messages_y2020m03", datetime.date(2020, 3, 1), datetime.date(2020, 4, 1)
+        )
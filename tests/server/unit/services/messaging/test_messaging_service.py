@@ -1,6 +1,14 @@
+import datetime
 import unittest
+from collections import namedtuple
+from unittest.mock import patch
 
-from server.services.messaging.message_service import MessageService
+from server.models.postgis.message import Message, MessageType
+from server.services.messaging.message_service import (
+    MessageService,
+    MessageServiceError,
+)
+from server.services.messaging.smtp_service import SMTPService
 
 
 class TestMessagingService(unittest.TestCase):
@@ -31,3 +39,79 @@ class TestMessagingService(unittest.TestCase):
             link,
             '<a href="http://test.com/projects/1#questionsAndComments">Project 1</a>',
         )
+
+    @patch.object(SMTPService, "send_email_alerts")
+    @patch.object(Message, "add_messages")
+    @patch.object(Message, "get_task_comment_recipients")
+    @patch.object(MessageService, "get_task_link", return_value="Task 1")
+    def test_comment_recipients_are_resolved_and_messaged_at_once(
+        self, mock_link, mock_recipients, mock_add, mock_emails
+    ):
+        # Arrange
+        mock_recipients.return_value = [(2, True), (3, False)]
+
+        # Act
+        MessageService.send_message_after_comment(
+            1, "Thanks @[Iain Hunter] and @[Iain Hunter]", 1, 1
+        )
+
+        # Assert
+        mock_recipients.assert_called_once_with(1, 1, 1, ["Iain Hunter"])
+        messages = mock_add.call_args[0][0]
+        self.assertEqual(
+            [(m["to_user_id"], m["message_type"]) for m in messages],
+            [
+                (2, MessageType.MENTION_NOTIFICATION.value),
+                (3, MessageType.TASK_COMMENT_NOTIFICATION.value),
+            ],
+        )
+        mock_emails.assert_called_once_with([2, 3])
+
+    @patch("server.services.messaging.message_service.db")
+    @patch("server.services.messaging.message_service.current_app")
+    @patch.object(SMTPService, "send_email_alerts")
+    @patch.object(Message, "add_messages")
+    @patch.object(Message, "get_activity_digests")
+    def test_activity_digest_is_one_message_per_user(
+        self, mock_digests, mock_add, mock_emails, mock_app, mock_db
+    ):
+        # Arrange
+        mock_app.config = {"APP_BASE_URL": "http://test.com"}
+        Row = namedtuple("Row", ["user_id", "project_id", "user_ids", "usernames"])
+        mock_digests.return_value = [
+            Row(1, 10, [2, 1], ["mapper", "me"]),
+            Row(1, 11, [3], ["validator"]),
+            Row(2, 12, [2], ["mapper"]),
+        ]
+
+        # Act
+        digests_sent = MessageService.send_activity_digests(
+            datetime.datetime(2020, 1, 1)
+        )
+
+        # Assert
+        self.assertEqual(digests_sent, 1)
+        messages = mock_add.call_args[0][0]
+        self.assertEqual(len(messages), 1)
+        self.assertEqual(messages[0]["to_user_id"], 1)
+        self.assertIn("/projects/10", messages[0]["message"])
+        self.assertIn("/projects/11", messages[0]["message"])
+        self.assertNotIn("/users/me", messages[0]["message"])
+        mock_emails.assert_called_once_with([1])
+
+    def test_inbox_cursor_points_at_message(self):
+        # Arrange
+        date = datetime.datetime(2020, 1, 1, 12, 30, 5, 250)
+
+        # Act
+        cursor = MessageService.encode_cursor(date, 42)
+
+        # Assert
+        self.assertEqual(MessageService.decode_cursor(cursor), (date, 42))
+
+    @patch("server.services.messaging.message_service.current_app")
+    def test_malformed_inbox_cursor_raises_error(self, mock_app):
+        # Act / Assert
+        for cursor in ("not a cursor", "MjAyMC0wMS0wMQ=="):
+            with self.assertRaises(MessageServiceError):
+                MessageService.decode_cursor(cursor)
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+
+from server.services.messaging.template_service import TemplateRegistry
+
+
+class TestTemplateRegistry(unittest.TestCase):
+    def setUp(self):
+        self.templates_dir = tempfile.TemporaryDirectory()
+        templates = {
+            "greeting_en.txt": "Hi {{ username }}",
+            "greeting_pt.txt": "Olá {{ username }}",
+            "greeting_pt-BR.txt": "Oi {{ username }}",
+            "greeting_en.html": "<p>Hi {{ username }}</p>",
+            "README.md": "Not a template",
+        }
+        for file_name, source in templates.items():
+            with open(os.path.join(self.templates_dir.name, file_name), "w") as f:
+                f.write(source)
+
+        self.registry = TemplateRegistry(self.templates_dir.name)
+
+    def tearDown(self):
+        self.templates_dir.cleanup()
+
+    def test_locale_chain_falls_back_to_language_then_default(self):
+        # Act / Assert
+        self.assertEqual(
+            TemplateRegistry.get_locale_chain("pt-BR,pt;q=0.9,en;q=0.8"),
+            ["pt-BR", "pt", "en"],
+        )
+        self.assertEqual(
+            TemplateRegistry.get_locale_chain("de_AT"), ["de-AT", "de", "en"]
+        )
+        self.assertEqual(TemplateRegistry.get_locale_chain(None), ["en"])
+        self.assertEqual(TemplateRegistry.get_locale_chain("*"), ["en"])
+
+    def test_template_is_rendered_in_best_available_locale(self):
+        # Act / Assert
+        self.assertEqual(
+            self.registry.render("greeting.txt", "pt-BR", username="a"), "Oi a"
+        )
+        self.assertEqual(
+            self.registry.render("greeting.txt", "pt-PT", username="a"), "Olá a"
+        )
+        self.assertEqual(
+            self.registry.render("greeting.txt", "fr", username="a"), "Hi a"
+        )
+        self.assertEqual(self.registry.render("greeting.txt", username="a"), "Hi a")
+
+    def test_values_are_escaped_in_html_templates_only(self):
+        # Act
+        html = self.registry.render("greeting.html", username="<b>")
+        text = self.registry.render("greeting.txt", username="<b>")
+
+        # Assert
+        self.assertEqual(html, "<p>Hi &lt;b&gt;</p>")
+        self.assertEqual(text, "Hi <b>")
+
+    def test_unknown_template_raises_error(self):
+        # Act / Assert
+        with self.assertRaises(ValueError):
+            self.registry.render("README.md")
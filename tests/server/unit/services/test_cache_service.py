@@ -0,0 +1,56 @@
+import unittest
+from unittest.mock import MagicMock
+from server.services.cache_service import CacheService, MemoryCacheBackend
+
+
+class TestCacheService(unittest.TestCase):
+    def setUp(self):
+        CacheService.set_backend(MemoryCacheBackend())
+
+    def tearDown(self):
+        CacheService.set_backend(None)
+
+    def test_cached_value_is_reused_for_same_project_version(self):
+        # Arrange
+        creator = MagicMock(return_value=[("test_user", 3)])
+
+        # Act
+        first = CacheService.get_or_set_for_project("contributions", 1, creator)
+        second = CacheService.get_or_set_for_project("contributions", 1, creator)
+
+        # Assert
+        self.assertEqual(first, second)
+        self.assertEqual(creator.call_count, 1)
+
+    def test_bumping_project_version_invalidates_cached_value(self):
+        # Arrange
+        creator = MagicMock(side_effect=[[("test_user", 3)], [("test_user", 4)]])
+        CacheService.get_or_set_for_project("contributions", 1, creator)
+
+        # Act
+        CacheService.bump_project_version(1)
+        value = CacheService.get_or_set_for_project("contributions", 1, creator)
+
+        # Assert
+        self.assertEqual(value, [("test_user", 4)])
+        self.assertEqual(CacheService.get_project_version(1), 1)
+
+    def test_bumping_project_version_does_not_affect_other_projects(self):
+        # Arrange
+        creator = MagicMock(return_value=[])
+        CacheService.get_or_set_for_project("contributions", 2, creator)
+
+        # Act
+        CacheService.bump_project_version(1)
+        CacheService.get_or_set_for_project("contributions", 2, creator)
+
+        # Assert
+        self.assertEqual(creator.call_count, 1)
+        self.assertEqual(CacheService.get_project_version(2), 0)
+
+    def test_bumping_project_version_keeps_cached_searches(self):
+        # Act
+        CacheService.bump_project_version(1)
+
+        # Assert
+        self.assertEqual(CacheService.get_search_version(), 0)
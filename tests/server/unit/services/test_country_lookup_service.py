@@ -0,0 +1,73 @@
+import unittest
+from shapely.geometry import Point, box
+from server.services.country_lookup_service import CountryLookupService
+
+
+class TestCountryLookupService(unittest.TestCase):
+    def test_country_at_point(self):
+        # Act
+        country = CountryLookupService.get_country_at(Point(35.0, -6.0))
+
+        # Assert
+        self.assertEqual(country.name, "Tanzania")
+        self.assertEqual(country.code, "tz")
+
+    def test_point_at_sea_has_no_country(self):
+        # Act
+        country = CountryLookupService.get_country_at(Point(0.0, 0.0))
+
+        # Assert
+        self.assertIsNone(country)
+
+    def test_aoi_within_a_country(self):
+        # Arrange
+        aoi = box(-75.0, -12.0, -74.5, -11.5)
+
+        # Act
+        countries = CountryLookupService.get_countries(aoi)
+
+        # Assert
+        self.assertEqual([country.name for country in countries], ["Peru"])
+
+    def test_aoi_across_borders_starts_with_country_of_centroid(self):
+        # Arrange
+        aoi = box(29.0, -2.0, 31.5, 0.0)
+        centroid_country = CountryLookupService.get_country_at(aoi.centroid)
+
+        # Act
+        countries = CountryLookupService.get_countries(aoi)
+
+        # Assert
+        self.assertGreater(len(countries), 1)
+        self.assertIs(countries[0], centroid_country)
+        self.assertIn("Rwanda", [country.name for country in countries])
+
+    def test_aoi_at_sea_has_no_countries(self):
+        # Act
+        countries = CountryLookupService.get_countries(box(-30.0, 10.0, -29.0, 11.0))
+
+        # Assert
+        self.assertEqual(countries, [])
+
+    def test_every_country_has_a_code(self):
+        # Act
+        countries = CountryLookupService.get_index().countries
+
+        # Assert
+        self.assertNotIn(None, countries)
+        self.assertEqual(len(countries), 207)
+
+    def test_country_spanning_two_continents_is_one_country(self):
+        # Act
+        european = CountryLookupService.get_country_at(Point(37.6, 55.7))
+        asian = CountryLookupService.get_country_at(Point(82.9, 55.0))
+
+        # Assert
+        self.assertIs(european, asian)
+        self.assertEqual(european.name, "Russia")
+
+    def test_country_name_by_code(self):
+        # Act / Assert
+        self.assertEqual(CountryLookupService.get_country_name("VN"), "Vietnam")
+        self.assertEqual(CountryLookupService.get_country_name("ir"), "Iran")
+        self.assertIsNone(CountryLookupService.get_country_name("us"))
@@ -0,0 +1,90 @@
+import unittest
+from shapely.geometry import Polygon, box
+from server.services.geometry_service import GeometryService
+
+
+class TestGeometryService(unittest.TestCase):
+    def test_transformers_are_reused(self):
+        # Act
+        first = GeometryService.get_transformer(3857, 4326)
+        second = GeometryService.get_transformer(3857, 4326)
+
+        # Assert
+        self.assertIs(first, second)
+
+    def test_web_mercator_bbox_is_transformed_to_4326(self):
+        # Arrange
+        polygon = box(
+            3618104.193026841,
+            -1413969.7644834695,
+            3861479.691086842,
+            -1297785.4814900015,
+        )
+
+        # Act
+        bounds = GeometryService.transform_geometry(polygon, 3857, 4326).bounds
+
+        # Assert
+        expected = (
+            32.50198296132938,
+            -12.59912449955007,
+            34.68826225820438,
+            -11.57858317689196,
+        )
+        for actual_value, expected_value in zip(bounds, expected):
+            self.assertAlmostEqual(actual_value, expected_value, places=4)
+
+    def test_web_mercator_area_of_4326_polygon(self):
+        # Arrange
+        polygon = box(
+            32.50198296132938, -12.59912449955007, 34.68826225820438, -11.57858317689196
+        )
+
+        # Act
+        area = GeometryService.get_web_mercator_area(polygon)
+
+        # Assert
+        self.assertAlmostEqual(area, 28276407740.2797, delta=1)
+
+    def test_coordinates_are_transformed_in_one_call(self):
+        # Act
+        xs, ys = GeometryService.transform_coordinates([0, 180], [0, 0], 4326, 3857)
+
+        # Assert
+        self.assertAlmostEqual(xs[0], 0)
+        self.assertAlmostEqual(xs[1], 20037508.342789244, places=4)
+        self.assertAlmostEqual(ys[1], 0)
+
+    def test_geodesic_area_does_not_depend_on_ring_orientation(self):
+        # Arrange
+        counter_clockwise = box(0, 0, 1, 1)
+        clockwise = Polygon([(0, 0), (0, 1), (1, 1), (1, 0)])
+
+        # Act
+        counter_clockwise_area = GeometryService.get_geodesic_area(counter_clockwise)
+        clockwise_area = GeometryService.get_geodesic_area(clockwise)
+
+        # Assert
+        self.assertAlmostEqual(counter_clockwise_area, 12308778361.4695, delta=1)
+        self.assertAlmostEqual(clockwise_area, counter_clockwise_area)
+
+    def test_geodesic_area_excludes_holes(self):
+        # Arrange
+        polygon_with_hole = box(0, 0, 2, 2).difference(box(0.5, 0.5, 1.5, 1.5))
+
+        # Act
+        area = GeometryService.get_geodesic_area(polygon_with_hole)
+
+        # Assert
+        self.assertAlmostEqual(area, 36924174572.7558, delta=1)
+
+    def test_z_dimension_is_stripped(self):
+        # Arrange
+        polygon = Polygon([(0, 0, 1), (1, 0, 1), (1, 1, 1)])
+
+        # Act
+        polygon_2d = GeometryService.strip_z(polygon)
+
+        # Assert
+        self.assertFalse(polygon_2d.has_z)
+        self.assertEqual(polygon_2d.wkt, "POLYGON ((0 0, 1 0, 1 1, 0 0))")
@@ -0,0 +1,28 @@
+import unittest
+
+from server.services.leaderboard_service import (
+    LeaderboardService,
+    LeaderboardServiceError,
+    MAX_LEADERBOARD_SIZE,
+)
+
+
+class TestLeaderboardService(unittest.TestCase):
+    def test_unknown_metric_raises_error(self):
+        # Act / Assert
+        with self.assertRaises(LeaderboardServiceError):
+            LeaderboardService.get_leaderboard("project", 1, metric="comments")
+
+    def test_unknown_period_raises_error(self):
+        # Act / Assert
+        with self.assertRaises(LeaderboardServiceError):
+            LeaderboardService.get_leaderboard("project", 1, period="decade")
+
+    def test_limit_out_of_range_raises_error(self):
+        # Act / Assert
+        with self.assertRaises(LeaderboardServiceError):
+            LeaderboardService.get_leaderboard("project", 1, limit=0)
+        with self.assertRaises(LeaderboardServiceError):
+            LeaderboardService.get_leaderboard(
+                "project", 1, limit=MAX_LEADERBOARD_SIZE + 1
+            )
@@ -0,0 +1,60 @@
+import unittest
+from unittest.mock import MagicMock, patch
+
+from server.models.postgis.notification import Notification
+from server.services.notification_service import (
+    NotificationService,
+    UnreadCountListener,
+)
+
+
+@patch.object(UnreadCountListener, "_listen")
+class TestNotificationService(unittest.TestCase):
+    def test_counts_are_dispatched_to_streams_of_user(self, mock_listen):
+        # Arrange
+        listener = UnreadCountListener(MagicMock(), MagicMock())
+        user_updates = listener.subscribe(1)
+        other_updates = listener.subscribe(2)
+
+        # Act
+        listener.dispatch("1:5")
+
+        # Assert
+        self.assertEqual(user_updates.get_nowait(), 5)
+        self.assertTrue(other_updates.empty())
+
+    def test_closed_streams_are_unsubscribed(self, mock_listen):
+        # Arrange
+        listener = UnreadCountListener(MagicMock(), MagicMock())
+        updates = listener.subscribe(1)
+
+        # Act
+        listener.unsubscribe(1, updates)
+        listener.dispatch("1:5")
+
+        # Assert
+        self.assertTrue(updates.empty())
+
+    @patch("server.services.notification_service.db")
+    @patch.object(Notification, "get_unread_message_count", return_value=2)
+    @patch.object(NotificationService, "get_listener")
+    def test_stream_sends_current_count_then_changes(
+        self, mock_get_listener, mock_count, mock_db, mock_listen
+    ):
+        # Arrange
+        listener = UnreadCountListener(MagicMock(), MagicMock())
+        mock_get_listener.return_value = listener
+
+        # Act
+        events = NotificationService.stream_unread_count(1)
+        retry = next(events)
+        first = next(events)
+        listener.dispatch("1:0")
+        second = next(events)
+        events.close()
+
+        # Assert
+        self.assertTrue(retry.startswith("retry:"))
+        self.assertIn('"unread": 2', first)
+        self.assertIn('"newMessages": false', second)
+        self.assertNotIn(1, listener._subscribers)
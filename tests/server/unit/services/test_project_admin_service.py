@@ -3,20 +3,22 @@ import unittest
 from unittest.mock import MagicMock, patch
 from server.services.project_admin_service import (
     ProjectAdminService,
-    InvalidGeoJson,
     Project,
     ProjectAdminServiceError,
     ProjectDTO,
     ProjectStatus,
     NotFound,
     LicenseService,
+    UserService,
 )
 
 from server.models.postgis.statuses import ProjectPriority, MappingLevel
-from server.models.dtos.project_dto import ProjectInfoDTO
+from server.models.postgis.utils import InvalidGeoJson
+from server.models.dtos.project_dto import DraftProjectDTO, ProjectInfoDTO
 from server.models.postgis.task import Task
 from server.models.postgis.user import User, UserRole
 from server import create_app
+from tests.server.helpers.test_helpers import get_canned_json
 
 
 class TestProjectAdminService(unittest.TestCase):
@@ -39,7 +41,8 @@ class TestProjectAdminService(unittest.TestCase):
         with self.assertRaises(InvalidGeoJson):
             ProjectAdminService._attach_tasks_to_project(MagicMock(), invalid_feature)
 
-    def test_valid_geo_json_attaches_task_to_project(self):
+    @patch.object(Project, "create_tasks")
+    def test_valid_geo_json_attaches_task_to_project(self, mock_create_tasks):
         # Arrange
         valid_feature_collection = json.loads(
             '{"features": [{"geometry": {"coordinates": [[[[-4.0237, 56.0904],'
@@ -56,11 +59,46 @@ class TestProjectAdminService(unittest.TestCase):
         )
 
         # Assert
+        task_rows = mock_create_tasks.call_args[0][0]
         self.assertEqual(
-            1,
-            test_project.tasks.count(),
-            "One task should have been attached to project",
+            1, len(task_rows), "One task should have been attached to project",
         )
+        self.assertEqual((1, 2402, 1736, 12, True, None), task_rows[0][:6])
+
+    @patch.object(ProjectAdminService, "_attach_tasks_to_project")
+    @patch.object(Project, "set_country_info")
+    @patch.object(Project, "set_default_changeset_comment")
+    @patch.object(Project, "create")
+    @patch.object(Project, "set_project_aoi")
+    @patch.object(Project, "create_draft_project")
+    @patch.object(UserService, "is_user_a_project_manager", return_value=True)
+    def test_task_grid_is_generated_when_only_zoom_is_sent(
+        self,
+        mock_pm,
+        mock_draft,
+        mock_aoi,
+        mock_create,
+        mock_comment,
+        mock_country,
+        mock_attach,
+    ):
+        # Arrange
+        draft_project_dto = DraftProjectDTO(
+            {
+                "projectName": "Test",
+                "areaOfInterest": get_canned_json("test_aoi.json"),
+                "zoom": 12,
+                "arbitraryTasks": False,
+            }
+        )
+
+        # Act
+        ProjectAdminService.create_draft_project(draft_project_dto)
+
+        # Assert
+        tasks = mock_attach.call_args[0][1]
+        self.assertEqual(len(tasks["features"]), 7)
+        self.assertTrue(tasks["features"][0]["properties"]["isSquare"])
 
     @patch.object(Project, "get")
     def test_get_raises_error_if_not_found(self, mock_project):
@@ -0,0 +1,129 @@
+import unittest
+from unittest.mock import patch
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query
+from server.models.dtos.project_dto import ProjectSearchDTO
+from server.models.postgis.project_search_index import ProjectSearchIndex
+from server.services.cache_service import CacheService
+from server.services.project_search_service import (
+    ProjectSearchService,
+    ProjectSearchServiceError,
+)
+
+
+class TestProjectSearchService(unittest.TestCase):
+    @staticmethod
+    def get_search_sql(text_search: str = None) -> str:
+        search_dto = ProjectSearchDTO()
+        search_dto.preferred_locale = "fr"
+        search_dto.text_search = text_search
+
+        with patch.object(
+            ProjectSearchService,
+            "create_search_query",
+            return_value=Query(ProjectSearchIndex),
+        ):
+            query = ProjectSearchService._filter_projects(search_dto)
+
+        return str(query.statement.compile(dialect=postgresql.dialect()))
+
+    def test_text_search_without_words_does_not_filter(self):
+        # Act
+        text_query = ProjectSearchService._make_text_query(" #!? ", "en")
+
+        # Assert
+        self.assertIsNone(text_query)
+
+    def test_text_search_matches_any_of_the_words(self):
+        # Act
+        text_query = ProjectSearchService._make_text_query("flood  response!", "fr")
+
+        # Assert
+        self.assertIn(
+            "flood | response", text_query.compile().construct_params().values()
+        )
+
+    def test_autocomplete_raises_error_if_text_not_provided(self):
+        # Act / Assert
+        with self.assertRaises(ProjectSearchServiceError):
+            ProjectSearchService.autocomplete("  # ", "en")
+
+    def test_autocomplete_raises_error_if_limit_too_large(self):
+        # Act / Assert
+        with self.assertRaises(ProjectSearchServiceError):
+            ProjectSearchService.autocomplete("flood", "en", 500)
+
+    def test_text_search_matches_preferred_english_and_default_locale_rows(self):
+        # Act
+        sql = self.get_search_sql("flood")
+
+        # Assert
+        self.assertIn(
+            "project_search_index_1.locale IN (%(locale_1)s, %(locale_2)s) "
+            "OR project_search_index_1.is_default_locale",
+            sql,
+        )
+
+    def test_text_search_stems_each_row_with_its_own_locale(self):
+        # Act
+        sql = self.get_search_sql("flood")
+
+        # Assert
+        self.assertIn(
+            "project_search_index_1.text_searchable @@ (to_tsquery("
+            "tm_locale_regconfig(project_search_index_1.locale)",
+            sql,
+        )
+
+    def test_text_search_ranks_projects_on_matched_rows(self):
+        # Act
+        order_by = self.get_search_sql("flood").split("ORDER BY", 1)[1]
+
+        # Assert
+        self.assertIn("max(ts_rank(project_search_index_1.text_searchable", order_by)
+        self.assertIn("OR project_search_index_1.is_default_locale", order_by)
+        self.assertNotIn("ts_rank(project_search_index.text_searchable", order_by)
+
+    def test_search_without_text_is_not_ranked(self):
+        # Act
+        sql = self.get_search_sql()
+
+        # Assert
+        self.assertNotIn("ts_rank", sql)
+        self.assertNotIn("project_search_index_1", sql)
+
+    @patch.object(CacheService, "get_search_version")
+    def test_search_cache_key_changes_with_search_version(self, mock_version):
+        # Arrange
+        search_dto = ProjectSearchDTO()
+        search_dto.text_search = "flood"
+        mock_version.return_value = 1
+        first_key = ProjectSearchService.get_search_cache_key(search_dto)
+
+        # Act
+        mock_version.return_value = 2
+        second_key = ProjectSearchService.get_search_cache_key(search_dto)
+
+        # Assert
+        self.assertNotEqual(first_key, second_key)
+        self.assertTrue(second_key.startswith("project-search:2:"))
+
+    @patch.object(CacheService, "get_or_set")
+    @patch.object(CacheService, "get_search_version")
+    def test_autocomplete_is_cached_under_search_version(
+        self, mock_version, mock_get_or_set
+    ):
+        # Arrange
+        mock_version.return_value = 5
+        mock_get_or_set.return_value = {"results": []}
+
+        # Act
+        results = ProjectSearchService.autocomplete(" Flood  Response", "en")
+        ProjectSearchService.autocomplete("flood response", "en")
+
+        # Assert
+        self.assertEqual(results, {"results": []})
+        first_key = mock_get_or_set.call_args_list[0][0][0]
+        second_key = mock_get_or_set.call_args_list[1][0][0]
+        self.assertTrue(first_key.startswith("project-autocomplete:5:"))
+        self.assertEqual(first_key, second_key)
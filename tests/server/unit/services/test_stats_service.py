@@ -1,6 +1,16 @@
+import datetime
+import json
 import unittest
-from server.services.stats_service import StatsService, TaskStatus
+from collections import namedtuple
+from unittest.mock import patch
+from server.services.stats_service import (
+    StatsService,
+    TaskStatus,
+    HISTORY_EXPORT_FIELDS,
+)
+from server.models.postgis.contribution_stats import ContributionStats
 from server.models.postgis.project import Project
+from server.models.postgis.task import TaskHistory
 from server.models.postgis.user import User
 
 
@@ -202,3 +212,120 @@ class TestStatsService(unittest.TestCase):
         self.assertEqual(test_admin.tasks_mapped, 0)
         self.assertEqual(test_admin.tasks_validated, 0)
         self.assertEqual(test_admin.tasks_invalidated, 0)
+
+    def test_history_export_as_csv_has_header_and_rows(self):
+        # Arrange
+        row_type = namedtuple("HistoryRow", HISTORY_EXPORT_FIELDS)
+        rows = [
+            row_type(
+                1,
+                2,
+                3,
+                "STATE_CHANGE",
+                "MAPPED",
+                datetime.datetime(2020, 1, 1, 12, 0),
+                4,
+                "test_user",
+            )
+        ]
+
+        # Act
+        export = "".join(StatsService._stream_history_as_csv(iter(rows)))
+
+        # Assert
+        lines = export.splitlines()
+        self.assertEqual(lines[0], ",".join(HISTORY_EXPORT_FIELDS))
+        self.assertEqual(
+            lines[1], "1,2,3,STATE_CHANGE,MAPPED,2020-01-01T12:00:00,4,test_user"
+        )
+
+    def test_history_export_as_ndjson_has_one_object_per_line(self):
+        # Arrange
+        row_type = namedtuple("HistoryRow", HISTORY_EXPORT_FIELDS)
+        rows = [
+            row_type(
+                i, 2, 3, "COMMENT", "hi", datetime.datetime(2020, 1, 1), 4, "test_user"
+            )
+            for i in range(3)
+        ]
+
+        # Act
+        export = "".join(StatsService._stream_history_as_ndjson(iter(rows)))
+
+        # Assert
+        entries = [json.loads(line) for line in export.splitlines()]
+        self.assertEqual(len(entries), 3)
+        self.assertEqual(entries[2]["id"], 2)
+        self.assertEqual(entries[0]["action_date"], "2020-01-01T00:00:00")
+
+    def get_history_export_end_filter(self, end_date):
+        with patch("server.services.stats_service.db") as mock_db, patch(
+            "server.services.stats_service.ProjectService.get_project_by_id"
+        ):
+            history_query = (
+                mock_db.session.query.return_value.join.return_value.filter.return_value
+            )
+            history_query.filter.return_value = history_query
+            StatsService.export_task_history(1, end_date=end_date)
+
+        return history_query.filter.call_args[0][0]
+
+    def test_history_export_includes_whole_end_date(self):
+        # Act
+        end_filter = self.get_history_export_end_filter(datetime.date(2020, 1, 31))
+
+        # Assert
+        self.assertEqual(end_filter.operator.__name__, "lt")
+        self.assertEqual(end_filter.right.value, datetime.date(2020, 2, 1))
+
+    def test_history_export_includes_whole_end_date_given_without_time(self):
+        # Arrange
+        end_date = StatsService.parse_history_date("2020-12-31")
+
+        # Act
+        end_filter = self.get_history_export_end_filter(end_date)
+
+        # Assert
+        self.assertEqual(end_filter.operator.__name__, "lt")
+        self.assertEqual(end_filter.right.value, datetime.date(2021, 1, 1))
+
+    def test_history_date_with_time_is_kept(self):
+        # Act / Assert
+        self.assertEqual(
+            StatsService.parse_history_date("2020-12-31T18:30"),
+            datetime.datetime(2020, 12, 31, 18, 30),
+        )
+        self.assertIsNone(StatsService.parse_history_date(None))
+        with self.assertRaises(ValueError):
+            StatsService.parse_history_date("not a date")
+
+    def test_history_export_includes_end_time(self):
+        # Arrange
+        end_date = datetime.datetime(2020, 1, 31, 12, 30)
+
+        # Act
+        end_filter = self.get_history_export_end_filter(end_date)
+
+        # Assert
+        self.assertEqual(end_filter.operator.__name__, "le")
+        self.assertEqual(end_filter.right.value, end_date)
+
+    @patch.object(ContributionStats, "record_task_state_change")
+    @patch.object(TaskHistory, "get_last_action_of_type")
+    def test_undo_reverts_contribution_stats_of_original_day(
+        self, mock_last_action, mock_record
+    ):
+        # Arrange
+        undone_change = TaskHistory(3, 1, 2)
+        undone_change.action_date = datetime.datetime(2020, 1, 1, 23, 59)
+        mock_last_action.return_value = undone_change
+
+        # Act
+        StatsService.update_stats_after_task_state_change(
+            1, 2, TaskStatus.MAPPED, TaskStatus.READY, "undo", task_id=3
+        )
+
+        # Assert
+        mock_record.assert_called_once_with(
+            1, 3, 2, TaskStatus.MAPPED, -1, datetime.date(2020, 1, 1)
+        )
@@ -31,9 +31,9 @@ class TestAuthenticationService(unittest.TestCase):
         with self.assertRaises(AuthServiceError):
             AuthenticationService().login_user(osm_response, None, "wont-find")
 
+    @patch.object(MessageService, "send_activity_digests")
     @patch.object(UserService, "get_user_by_id")
-    @patch.object(MessageService, "send_favorite_project_activities")
-    def test_if_user_get_called_with_osm_id(self, mock_user_get, mock_message_act):
+    def test_if_user_get_called_with_osm_id(self, mock_user_get, mock_digests):
         # Arrange
         osm_response = get_canned_osm_user_details()
 
@@ -42,6 +42,7 @@ class TestAuthenticationService(unittest.TestCase):
 
         # Assert
         mock_user_get.assert_called_with(7777777)
+        mock_digests.assert_not_called()
 
     @patch.object(MessageService, "send_welcome_message")
     @patch.object(UserService, "register_user")
@@ -62,8 +63,7 @@ class TestAuthenticationService(unittest.TestCase):
         )
 
     @patch.object(UserService, "get_user_by_id")
-    @patch.object(MessageService, "send_favorite_project_activities")
-    def test_valid_auth_request_gets_token(self, mock_user_get, mock_message_act):
+    def test_valid_auth_request_gets_token(self, mock_user_get):
         # Arrange
         osm_response = get_canned_osm_user_details()
 
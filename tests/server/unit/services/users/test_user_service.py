@@ -1,6 +1,9 @@
+import datetime
 import unittest
-from unittest.mock import patch
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
 from server.models.postgis.user import User
+from server.models.postgis.user_recommendations import UserRecommendations
 from server.services.users.user_service import UserService, UserServiceError, UserRole
 from server.models.postgis.project import Project
 
@@ -70,3 +73,111 @@ class TestUserService(unittest.TestCase):
         # Act / Assert
         with self.assertRaises(UserServiceError):
             UserService.set_user_mapping_level("test", "TEST")
+
+    def stub_recommendations_query(self, mock_user, mock_db, rows=()):
+        users_query = mock_user.query.with_entities.return_value.filter.return_value
+        users_query.one_or_none.return_value = SimpleNamespace(id=7)
+        projects_query = MagicMock()
+        projects_query.join.return_value = projects_query
+        projects_query.filter.return_value = projects_query
+        projects_query.all.return_value = list(rows)
+        mock_db.session.query.return_value = projects_query
+
+    @patch("server.services.users.user_service.db")
+    @patch("server.services.users.user_service.User")
+    @patch.object(UserRecommendations, "refresh")
+    @patch.object(UserRecommendations, "get")
+    def test_fresh_recommendations_are_read_without_refresh(
+        self, mock_get, mock_refresh, mock_user, mock_db
+    ):
+        # Arrange
+        self.stub_recommendations_query(mock_user, mock_db)
+        mock_get.return_value = UserRecommendations(project_ids=[], is_stale=False)
+
+        # Act
+        dto = UserService.get_recommended_projects("test", "en")
+
+        # Assert
+        mock_get.assert_called_once_with(7)
+        mock_refresh.assert_not_called()
+        self.assertEqual(dto.recommended_projects, [])
+
+    @patch("server.services.users.user_service.db")
+    @patch("server.services.users.user_service.User")
+    @patch.object(UserRecommendations, "refresh")
+    @patch.object(UserRecommendations, "get")
+    def test_missing_or_stale_recommendations_are_refreshed_on_read(
+        self, mock_get, mock_refresh, mock_user, mock_db
+    ):
+        # Arrange
+        self.stub_recommendations_query(mock_user, mock_db)
+        fresh = UserRecommendations(project_ids=[], is_stale=False)
+        stale = UserRecommendations(
+            is_stale=True,
+            updated_date=datetime.datetime.utcnow() - datetime.timedelta(hours=1),
+        )
+
+        for recommendations in (None, stale):
+            mock_refresh.reset_mock()
+            mock_get.side_effect = [recommendations, fresh]
+
+            # Act
+            UserService.get_recommended_projects("test", "en")
+
+            # Assert
+            mock_refresh.assert_called_once_with([7])
+
+    @patch("server.services.users.user_service.db")
+    @patch("server.services.users.user_service.User")
+    @patch.object(UserRecommendations, "refresh")
+    @patch.object(UserRecommendations, "get")
+    def test_recently_refreshed_stale_recommendations_are_served_as_they_are(
+        self, mock_get, mock_refresh, mock_user, mock_db
+    ):
+        # Arrange
+        self.stub_recommendations_query(mock_user, mock_db)
+        mock_get.return_value = UserRecommendations(
+            project_ids=[],
+            is_stale=True,
+            updated_date=datetime.datetime.utcnow() - datetime.timedelta(minutes=5),
+        )
+
+        # Act
+        dto = UserService.get_recommended_projects("test", "en")
+
+        # Assert
+        mock_refresh.assert_not_called()
+        self.assertEqual(dto.recommended_projects, [])
+
+    @patch("server.services.users.user_service.db")
+    @patch("server.services.users.user_service.User")
+    @patch.object(UserRecommendations, "get")
+    def test_recommended_projects_keep_order_and_preferred_locale(
+        self, mock_get, mock_user, mock_db
+    ):
+        # Arrange
+        def row(project_id, name, locale):
+            return SimpleNamespace(
+                id=project_id,
+                name=name,
+                locale=locale,
+                centroid=None,
+                tasks_mapped=0,
+                tasks_validated=0,
+                status=1,
+            )
+
+        rows = [row(1, "One", "en"), row(3, "Tres", "es"), row(3, "Three", "en")]
+        self.stub_recommendations_query(mock_user, mock_db, rows)
+        mock_get.return_value = UserRecommendations(
+            project_ids=[3, 2, 1], is_stale=False
+        )
+
+        # Act
+        dto = UserService.get_recommended_projects("test", "es")
+
+        # Assert
+        self.assertEqual(
+            [(p.project_id, p.name) for p in dto.recommended_projects],
+            [(3, "Tres"), (1, "One")],
+        )